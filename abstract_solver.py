@@ -1,11 +1,18 @@
 # optimization_tools/abstract_solver.py
 from abc import abstractmethod
+import asyncio
 import copy
 import logging
 import os
 from .config import OptimizationConfig
+from .exceptions import SolverError
 
 class AbstractSolver:
+    # True, если расчет проходит с комплексными значениями переменных без
+    # потери мнимой части (нет abs, float(), сравнений по ветвям и т.п.):
+    # тогда градиенты можно считать методом комплексного шага
+    complex_step_safe = False
+
     def __init__(self, config: OptimizationConfig) -> None:
         self.config = config
         self.working_dir = None
@@ -77,8 +84,8 @@ class CachableSolver(LoggableSolver):
         raise NotImplementedError
 
     def clone_for_parallel_eval(self, worker_tag: str = "") -> "CachableSolver":
-        clone = copy.deepcopy(self)
-        clone.cache_map = {}
+        # cache_map подменяется пустым словарем прямо в memo, чтобы не копировать кэш
+        clone = copy.deepcopy(self, {id(self.cache_map): {}})
         clone.filehandler = None
         clone.on_parallel_clone(worker_tag)
         return clone
@@ -98,4 +105,72 @@ class CachableSolver(LoggableSolver):
         if res_type is not None:
             return result_map[res_type]
         else:
-            return result_map
\ No newline at end of file
+            return result_map
+
+
+class AsyncSubprocessSolver(CachableSolver):
+    """
+    Солвер, запускающий внешнюю программу (Nastran и т.п.).
+    Асинхронный контракт: await solve_async(calc_task, unique_id, res_type)
+    запускает процесс через asyncio.create_subprocess_exec и ждет его, не занимая
+    ни поток, ни процесс Python, поэтому AsyncioExecutor ведет сотни расчетов
+    из одного потока. solve() остается синхронным для остальных исполнителей.
+
+    make_command(calc_task, unique_id) - подготовка входных файлов и argv,
+    read_results(calc_task, unique_id, stdout) - разбор результатов.
+    Процесс запускается в working_dir; ненулевой код возврата и превышение
+    config.single_fem_task_timeout дают SolverError, процесс при этом убивается.
+    """
+
+    @abstractmethod
+    def make_command(self, calc_task, unique_id: str) -> list[str]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def read_results(self, calc_task, unique_id: str, stdout: bytes) -> dict:
+        raise NotImplementedError
+
+    async def solve_async(self, calc_task, unique_id: str, res_type: str | None = None) -> dict:
+        signature = calc_task.signature()
+        if signature in self.cache_map:
+            result_map = self.cache_map[signature]
+        else:
+            result_map = await self.non_cached_calculation_async(calc_task, unique_id)
+            self.cache_map[signature] = result_map
+
+        if res_type is not None:
+            return result_map[res_type]
+        return result_map
+
+    async def non_cached_calculation_async(self, calc_task, unique_id: str) -> dict:
+        command = [str(item) for item in self.make_command(calc_task, unique_id)]
+        process = await asyncio.create_subprocess_exec(
+            *command,
+            cwd=self.working_dir,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        try:
+            stdout, stderr = await asyncio.wait_for(
+                process.communicate(), timeout=self.config.single_fem_task_timeout)
+        except asyncio.TimeoutError:
+            await self._kill(process)
+            raise SolverError(
+                f"{unique_id}: {command[0]} timed out after {self.config.single_fem_task_timeout} s")
+        except asyncio.CancelledError:
+            await self._kill(process)
+            raise
+        if process.returncode != 0:
+            raise SolverError(
+                f"{unique_id}: {command[0]} exited with code {process.returncode}: "
+                f"{stderr.decode(errors='replace')[-2000:]}")
+        return self.read_results(calc_task, unique_id, stdout)
+
+    @staticmethod
+    async def _kill(process) -> None:
+        if process.returncode is None:
+            process.kill()
+            await process.wait()
+
+    def non_cached_calculation(self, calc_task, unique_id: str):
+        return asyncio.run(self.non_cached_calculation_async(calc_task, unique_id))
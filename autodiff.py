@@ -0,0 +1,244 @@
+"""Forward-mode automatic differentiation of NumPy-based analytic solvers."""
+
+from __future__ import annotations
+
+import copy
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+
+_UNARY_DERIVATIVES: Dict[Any, Callable[[float], float]] = {
+    np.negative: lambda x: -1.0,
+    np.positive: lambda x: 1.0,
+    np.absolute: np.sign,
+    np.sqrt: lambda x: 0.5 / np.sqrt(x),
+    np.square: lambda x: 2.0 * x,
+    np.exp: np.exp,
+    np.log: lambda x: 1.0 / x,
+    np.log10: lambda x: 1.0 / (x * np.log(10.0)),
+    np.sin: np.cos,
+    np.cos: lambda x: -np.sin(x),
+    np.tan: lambda x: 1.0 / np.cos(x) ** 2,
+    np.arcsin: lambda x: 1.0 / np.sqrt(1.0 - x * x),
+    np.arccos: lambda x: -1.0 / np.sqrt(1.0 - x * x),
+    np.arctan: lambda x: 1.0 / (1.0 + x * x),
+    np.sinh: np.cosh,
+    np.cosh: np.sinh,
+    np.tanh: lambda x: 1.0 - np.tanh(x) ** 2,
+}
+
+
+class DualNumber:
+    """
+    Value with its gradient over all design variables at once, so a single
+    pass through the solver code gives the full gradient. Supports Python
+    arithmetic, comparisons by value and the common NumPy ufuncs (sqrt, exp,
+    log, trigonometric, power, maximum, minimum...). Code that converts to
+    float (math module, float()) would drop the derivative and raises instead.
+    """
+
+    __slots__ = ("value", "grad")
+
+    def __init__(self, value: float, grad: np.ndarray) -> None:
+        self.value = float(value)
+        self.grad = np.asarray(grad, dtype=float)
+
+    @staticmethod
+    def seed(values: Sequence[float]) -> List["DualNumber"]:
+        """Independent variables: the i-th one has the i-th unit gradient."""
+        identity = np.eye(len(values))
+        return [DualNumber(value, identity[i]) for i, value in enumerate(values)]
+
+    def _lift(self, other: Any) -> "DualNumber | None":
+        if isinstance(other, DualNumber):
+            return other
+        if isinstance(other, (int, float, np.integer, np.floating)):
+            return DualNumber(other, np.zeros_like(self.grad))
+        return None
+
+    def __repr__(self) -> str:
+        return f"DualNumber({self.value!r}, {self.grad!r})"
+
+    def __float__(self) -> float:
+        raise TypeError("float() of a DualNumber would drop its derivative; use NumPy functions")
+
+    def __add__(self, other):
+        other = self._lift(other)
+        if other is None:
+            return NotImplemented
+        return DualNumber(self.value + other.value, self.grad + other.grad)
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        other = self._lift(other)
+        if other is None:
+            return NotImplemented
+        return DualNumber(self.value - other.value, self.grad - other.grad)
+
+    def __rsub__(self, other):
+        other = self._lift(other)
+        if other is None:
+            return NotImplemented
+        return other - self
+
+    def __mul__(self, other):
+        other = self._lift(other)
+        if other is None:
+            return NotImplemented
+        return DualNumber(self.value * other.value, self.grad * other.value + other.grad * self.value)
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other):
+        other = self._lift(other)
+        if other is None:
+            return NotImplemented
+        return DualNumber(self.value / other.value,
+                          (self.grad * other.value - other.grad * self.value) / other.value ** 2)
+
+    def __rtruediv__(self, other):
+        other = self._lift(other)
+        if other is None:
+            return NotImplemented
+        return other / self
+
+    def __pow__(self, other):
+        other = self._lift(other)
+        if other is None:
+            return NotImplemented
+        value = self.value ** other.value
+        if other.value == 0 or not np.any(self.grad):
+            grad = np.zeros_like(self.grad)
+        else:
+            grad = other.value * self.value ** (other.value - 1) * self.grad
+        if np.any(other.grad):
+            grad = grad + value * np.log(self.value) * other.grad
+        return DualNumber(value, grad)
+
+    def __rpow__(self, other):
+        other = self._lift(other)
+        if other is None:
+            return NotImplemented
+        return other ** self
+
+    def __neg__(self):
+        return DualNumber(-self.value, -self.grad)
+
+    def __pos__(self):
+        return self
+
+    def __abs__(self):
+        return DualNumber(abs(self.value), np.sign(self.value) * self.grad)
+
+    def __lt__(self, other):
+        return self.value < _value(other)
+
+    def __le__(self, other):
+        return self.value <= _value(other)
+
+    def __gt__(self, other):
+        return self.value > _value(other)
+
+    def __ge__(self, other):
+        return self.value >= _value(other)
+
+    def __eq__(self, other):
+        return self.value == _value(other)
+
+    def __ne__(self, other):
+        return self.value != _value(other)
+
+    __hash__ = None
+
+    def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+        if method != "__call__" or kwargs.get("out") is not None:
+            return NotImplemented
+        if any(isinstance(item, np.ndarray) and item.ndim > 0 for item in inputs):
+            # Elementwise over object arrays, one scalar ufunc call per element
+            return np.vectorize(lambda *args: ufunc(*args), otypes=[object])(*inputs)
+        if len(inputs) == 1 and ufunc in _UNARY_DERIVATIVES:
+            return DualNumber(ufunc(self.value), _UNARY_DERIVATIVES[ufunc](self.value) * self.grad)
+        if len(inputs) == 2:
+            first, second = inputs
+            if ufunc is np.add:
+                return first + second
+            if ufunc is np.subtract:
+                return first - second
+            if ufunc is np.multiply:
+                return first * second
+            if ufunc in (np.divide, np.true_divide):
+                return first / second
+            if ufunc is np.power:
+                return first ** second
+            if ufunc is np.maximum:
+                return first if _value(first) >= _value(second) else second
+            if ufunc is np.minimum:
+                return first if _value(first) <= _value(second) else second
+            if ufunc is np.arctan2:
+                y = self._lift(first)
+                x = self._lift(second)
+                denominator = x.value ** 2 + y.value ** 2
+                return DualNumber(np.arctan2(y.value, x.value),
+                                  (x.value * y.grad - y.value * x.grad) / denominator)
+        return NotImplemented
+
+
+def _unary_method(ufunc: Any) -> Callable[[DualNumber], DualNumber]:
+    def method(self: DualNumber) -> DualNumber:
+        return DualNumber(ufunc(self.value), _UNARY_DERIVATIVES[ufunc](self.value) * self.grad)
+    method.__name__ = ufunc.__name__
+    return method
+
+
+# Ufuncs over object arrays call the element's method of the same name (x.sqrt())
+for _ufunc in _UNARY_DERIVATIVES:
+    if not hasattr(DualNumber, _ufunc.__name__):
+        setattr(DualNumber, _ufunc.__name__, _unary_method(_ufunc))
+del _ufunc
+
+
+def _value(item: Any) -> Any:
+    return item.value if isinstance(item, DualNumber) else item
+
+
+def split_dual_results(results: Dict[str, Any], n_vars: int) -> Tuple[Dict[str, Any], Dict[str, np.ndarray]]:
+    """Plain results map and gradients of its scalar entries (zero for constants)."""
+    values: Dict[str, Any] = {}
+    gradients: Dict[str, np.ndarray] = {}
+    for key, item in results.items():
+        if isinstance(item, DualNumber):
+            values[key] = item.value
+            gradients[key] = item.grad.copy()
+        elif isinstance(item, np.ndarray) and item.dtype == object:
+            values[key] = np.vectorize(_value, otypes=[float])(item)
+        else:
+            values[key] = item
+            if isinstance(item, (int, float, np.integer, np.floating)):
+                gradients[key] = np.zeros(n_vars)
+    return values, gradients
+
+
+class ForwardModeGradientsMixin:
+    """
+    solve_with_gradients for analytic solvers written against NumPy: the
+    design variables of a copy of the model are replaced with DualNumber
+    seeds and the solver's calculation runs once, giving exact gradients of
+    every scalar result. Mix in before the solver class:
+
+        class PanelSolver(ForwardModeGradientsMixin, CachableSolver): ...
+
+    differentiable_calculation defaults to non_cached_calculation.
+    """
+
+    def differentiable_calculation(self, calc_task: Any, unique_id: str) -> Dict[str, Any]:
+        return self.non_cached_calculation(calc_task, unique_id)
+
+    def solve_with_gradients(self, calc_task: Any, unique_id: str,
+                             var_names: Sequence[str]) -> Tuple[Dict[str, Any], Dict[str, np.ndarray]]:
+        dual_task = copy.deepcopy(calc_task)
+        seeds = DualNumber.seed([getattr(calc_task, name) for name in var_names])
+        for name, seed in zip(var_names, seeds):
+            setattr(dual_task, name, seed)
+        return split_dual_results(self.differentiable_calculation(dual_task, unique_id), len(var_names))
@@ -0,0 +1,269 @@
+"""Parallel evaluation of batches of designs for population and surrogate optimizers."""
+
+from __future__ import annotations
+
+import copy
+import os
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+
+from optimization_tools.config import OptimizationConfig
+from optimization_tools.evaluation_ledger import EvaluationLedger
+from optimization_tools.exceptions import SolverError
+from optimization_tools.history import OptimizationHistory
+from optimization_tools.opt_conditions import OptimizationTaskResults
+from optimization_tools.optimizers.abstract_optimizer import AbstractOPtimizer, AbstractOptimizationTask
+
+
+class DesignEvaluation(AbstractOPtimizer):
+    """
+    Executor task that solves one design and returns every solver output in
+    metadata["results"]; lets executors built for optimizers run plain solves.
+    Under AsyncioExecutor, solvers with solve_async are awaited without a thread.
+    """
+
+    def optimize(self, **kwargs) -> OptimizationTaskResults:
+        task = self.optimized_object
+        try:
+            results = task.solver.solve(task.model, task.unique_id, None)
+        except SolverError:
+            self.logger.exception("%s design evaluation failed", task.unique_id)
+            return OptimizationTaskResults(1, 1, None, None, None, task.model)
+        return self._wrap(results)
+
+    async def optimize_async(self, **kwargs) -> OptimizationTaskResults:
+        task = self.optimized_object
+        solve_async = getattr(task.solver, "solve_async", None)
+        if not callable(solve_async):
+            return await super().optimize_async(**kwargs)
+        try:
+            results = await solve_async(task.model, task.unique_id, None)
+        except SolverError:
+            self.logger.exception("%s design evaluation failed", task.unique_id)
+            return OptimizationTaskResults(1, 1, None, None, None, task.model)
+        return self._wrap(results)
+
+    def _wrap(self, results: Dict[str, Any]) -> OptimizationTaskResults:
+        task = self.optimized_object
+        var_values = {name: getattr(task.model, name) for name in task.opt_conditions.vars}
+        constr_values = {name: results[name] for name in task.opt_conditions.constraints if name in results}
+        return OptimizationTaskResults(0, 0, var_values, constr_values, results.get("objective"), task.model,
+                                       metadata={"results": results})
+
+
+class BatchEvaluator:
+    """
+    Solves batches of designs of an optimization task given as physical
+    variable values (in conversion_map order).
+
+    Designs already in the task ledger or the solver cache are not solved
+    again, duplicates within a batch are solved once. The rest goes, in
+    priority order, to solver.solve_batch(models, unique_ids) when the solver
+    provides it, to the executor as DesignEvaluation tasks, or to plain
+    in-process solver.solve calls. Results are recorded in the ledger and in
+    the solver cache of the main process.
+    """
+
+    def __init__(self, task: AbstractOptimizationTask, config: OptimizationConfig, executor=None) -> None:
+        self.task = task
+        self.config = config
+        self.executor = executor
+        self.solves = 0
+        self._counter = 0
+        if getattr(task, "ledger", None) is None:
+            task.ledger = EvaluationLedger()
+
+    @property
+    def var_names(self) -> List[str]:
+        return [self.task.conversion_map[i] for i in range(len(self.task.conversion_map))]
+
+    def make_model(self, point: Sequence[float]) -> Any:
+        model = copy.deepcopy(self.task.model)
+        self.task.x_to_model(model, [float(value) for value in point], self.task.conversion_map)
+        return model
+
+    def _known(self, signature: Any) -> Dict[str, Any] | None:
+        if signature is None:
+            return None
+        results = self.task.ledger.get(signature)
+        if results is None:
+            results = getattr(self.task.solver, "cache_map", {}).get(signature)
+            if results is not None:
+                self.task.ledger.record(signature, results)
+        return results
+
+    def _record(self, signature: Any, results: Dict[str, Any]) -> None:
+        if signature is None:
+            return
+        self.task.ledger.record(signature, results)
+        cache_map = getattr(self.task.solver, "cache_map", None)
+        if cache_map is not None:
+            cache_map[signature] = results
+
+    def _evaluation_task(self, model: Any, unique_id: str, tag: str) -> DesignEvaluation:
+        task = copy.copy(self.task)
+        task.model = model
+        task.unique_id = unique_id
+        task.local_log_path = os.path.join(self.task.local_log_path, "evaluations")
+        clone = getattr(self.task.solver, "clone_for_parallel_eval", None)
+        task.solver = clone(tag) if callable(clone) else copy.deepcopy(self.task.solver)
+        # Keep the pickled copy small: no ledger, history or constraints of the original task
+        task.ledger = EvaluationLedger()
+        task.history = OptimizationHistory()
+        task.cons = []
+        return DesignEvaluation(task, self.config)
+
+    def _solve(self, models: List[Any], unique_ids: List[str]) -> List[Dict[str, Any] | None]:
+        solve_batch = getattr(self.task.solver, "solve_batch", None)
+        if callable(solve_batch):
+            return list(solve_batch(models, unique_ids))
+        if self.executor is not None:
+            tasks = [self._evaluation_task(model, unique_id, unique_id.split("__")[-1])
+                     for model, unique_id in zip(models, unique_ids)]
+            results = self.executor(tasks)
+            return [None if result is None else result.metadata.get("results") for result in results]
+        solved = []
+        for model, unique_id in zip(models, unique_ids):
+            try:
+                solved.append(self.task.solver.solve(model, unique_id, None))
+            except SolverError:
+                solved.append(None)
+        return solved
+
+    def evaluate(self, points: Sequence[Sequence[float]]) -> List[Dict[str, Any] | None]:
+        """Full results maps for the points (None where the solve failed)."""
+        models = [self.make_model(point) for point in points]
+        evaluated: List[Dict[str, Any] | None] = [None] * len(models)
+        pending: Dict[Any, List[int]] = {}
+        signatures: Dict[Any, Any] = {}
+        for i, model in enumerate(models):
+            signature_fn = getattr(model, "signature", None)
+            signature = signature_fn() if callable(signature_fn) else None
+            known = self._known(signature)
+            if known is not None:
+                self.task.ledger.hits += 1
+                evaluated[i] = known
+                continue
+            key = signature if signature is not None else ("unsigned", i)
+            pending.setdefault(key, []).append(i)
+            signatures[key] = signature
+
+        if pending:
+            keys = list(pending)
+            unique_ids = []
+            for _ in keys:
+                self._counter += 1
+                unique_ids.append(f"{self.task.unique_id}__eval_{self._counter}")
+            solved = self._solve([models[pending[key][0]] for key in keys], unique_ids)
+            self.solves += len(keys)
+            self.task.ledger.misses += len(keys)
+            for key, results in zip(keys, solved):
+                if results is None:
+                    continue
+                self._record(signatures[key], results)
+                for i in pending[key]:
+                    evaluated[i] = results
+        return evaluated
+
+    def cached_designs(self, lower: np.ndarray, upper: np.ndarray) -> List[tuple]:
+        """
+        (point, results) pairs read back from solver.cache_map: signatures made of
+        (field, value) pairs covering every variable, other fields equal to the
+        task model, point inside [lower, upper], objective and constraints present.
+        """
+        var_names = self.var_names
+        limits = self.task.opt_conditions.constraints
+        model_fields = dict(self.task.model.signature())
+        designs = []
+        for signature, results in getattr(self.task.solver, "cache_map", {}).items():
+            try:
+                fields = dict(signature)
+            except (TypeError, ValueError):
+                continue
+            if any(name not in fields for name in var_names) or "objective" not in results \
+                    or any(name not in results for name in limits):
+                continue
+            if any(fields[name] != value for name, value in model_fields.items() if name not in var_names):
+                continue
+            point = np.array([fields[name] for name in var_names], dtype=float)
+            if np.all(point >= lower - 1e-12) and np.all(point <= upper + 1e-12):
+                designs.append((point, results))
+        return designs
+
+    def constraint_margins(self, results: Dict[str, Any]) -> np.ndarray:
+        """Constraint values as ConstraintForNormalized returns them: >= 0 when satisfied."""
+        margins = []
+        for name, limit in self.task.opt_conditions.constraints.items():
+            value = float(results[name])
+            margins.append(value / limit - 1 if limit != 0 else value)
+        return np.asarray(margins, dtype=float)
+
+    def task_results(self, point: Sequence[float], results: Dict[str, Any],
+                     metadata: Dict[str, Any] | None = None) -> OptimizationTaskResults:
+        """Write the point into the task model and wrap it as the optimizer result."""
+        self.task.x_to_model(self.task.model, [float(value) for value in point], self.task.conversion_map)
+        var_values = {name: getattr(self.task.model, name) for name in self.task.opt_conditions.vars}
+        constr_values = {name: results[name] for name in self.task.opt_conditions.constraints}
+        return OptimizationTaskResults(0, 0, var_values, constr_values, results["objective"], self.task.model,
+                                       metadata=metadata, opt_conditions=self.task.opt_conditions)
+
+
+class DesignArchive:
+    """
+    Evaluated designs of one run as arrays: points, objective values and
+    constraint margins (>= 0 when satisfied). Exact duplicates are kept out,
+    since they make interpolating surrogates singular.
+    """
+
+    def __init__(self, evaluator: BatchEvaluator, feasibility_tolerance: float = 1e-6) -> None:
+        self.evaluator = evaluator
+        self.feasibility_tolerance = feasibility_tolerance
+        self.points: List[np.ndarray] = []
+        self.results: List[Dict[str, Any]] = []
+
+    def __len__(self) -> int:
+        return len(self.points)
+
+    def contains(self, point: Sequence[float], atol: float = 1e-12) -> bool:
+        return any(np.allclose(point, other, rtol=0, atol=atol) for other in self.points)
+
+    def add(self, points: Sequence[Sequence[float]], results: Sequence[Dict[str, Any] | None]) -> None:
+        for point, point_results in zip(points, results):
+            if point_results is None or self.contains(point):
+                continue
+            self.points.append(np.asarray(point, dtype=float))
+            self.results.append(point_results)
+
+    def evaluate(self, points: Sequence[Sequence[float]]) -> List[Dict[str, Any] | None]:
+        results = self.evaluator.evaluate(points)
+        self.add(points, results)
+        return results
+
+    @property
+    def x(self) -> np.ndarray:
+        return np.array(self.points, dtype=float).reshape(len(self.points), -1)
+
+    @property
+    def objectives(self) -> np.ndarray:
+        return np.array([results["objective"] for results in self.results], dtype=float)
+
+    @property
+    def margins(self) -> np.ndarray:
+        margins = [self.evaluator.constraint_margins(results) for results in self.results]
+        return np.array(margins, dtype=float).reshape(len(self.results), -1)
+
+    @property
+    def violation(self) -> np.ndarray:
+        return np.clip(-self.margins, 0, None).sum(axis=1)
+
+    @property
+    def feasible(self) -> np.ndarray:
+        return self.violation <= self.feasibility_tolerance
+
+    def best_index(self) -> int:
+        """Best feasible design, or the least violating one when none is feasible."""
+        feasible = self.feasible
+        if feasible.any():
+            return int(np.argmin(np.where(feasible, self.objectives, np.inf)))
+        return int(np.argmin(self.violation))
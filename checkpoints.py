@@ -0,0 +1,97 @@
+"""Checkpoint storage for long optimization runs."""
+
+from __future__ import annotations
+
+import os
+import pickle
+from typing import Any
+
+
+def atomic_pickle_dump(obj: Any, path: str) -> None:
+    """Write a pickle via a temporary file so a crash never leaves a torn checkpoint."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump(obj, f, pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+
+def pickle_load_or_none(path: str) -> Any:
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "rb") as f:
+            return pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError):
+        return None
+
+
+class BruteForceCheckpoint:
+    """
+    Completed point results of a BruteForceOptimizer sweep keyed by ParameterMapper code.
+    Each result is pickled into its point_{code} directory next to the point logs.
+    """
+
+    file_name = "point_result.pkl"
+
+    def __init__(self, sweep_dir: str) -> None:
+        self.sweep_dir = sweep_dir
+
+    def path_for(self, code: int) -> str:
+        return os.path.join(self.sweep_dir, f"point_{code}", self.file_name)
+
+    def save(self, code: int, result: Any) -> None:
+        atomic_pickle_dump(result, self.path_for(code))
+
+    def load(self, code: int) -> Any:
+        return pickle_load_or_none(self.path_for(code))
+
+
+class GradientCheckpoint:
+    """
+    Last accepted iterate of a GradientOptimizer run with everything needed for
+    a warm restart: history, FD Jacobian memo and the solver result cache.
+    The solver cache lives in a separate append-only file: every checkpoint
+    appends only the entries added since the previous one.
+    """
+
+    file_name = "gradient_checkpoint.pkl"
+    cache_file_name = "gradient_checkpoint_cache.pkl"
+
+    def __init__(self, run_dir: str) -> None:
+        self.path = os.path.join(run_dir, self.file_name)
+        self.cache_path = os.path.join(run_dir, self.cache_file_name)
+
+    def save(self, state: dict) -> None:
+        atomic_pickle_dump(state, self.path)
+
+    def load(self) -> dict | None:
+        return pickle_load_or_none(self.path)
+
+    def reset_cache(self) -> None:
+        if os.path.exists(self.cache_path):
+            os.remove(self.cache_path)
+
+    def append_cache(self, entries: dict) -> None:
+        if not entries:
+            return
+        os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+        with open(self.cache_path, "ab") as f:
+            pickle.dump(entries, f, pickle.HIGHEST_PROTOCOL)
+
+    def load_cache(self) -> dict:
+        """All appended entries; a torn last record from a crash is dropped."""
+        entries: dict = {}
+        if not os.path.exists(self.cache_path):
+            return entries
+        with open(self.cache_path, "rb") as f:
+            while True:
+                try:
+                    entries.update(pickle.load(f))
+                except (EOFError, pickle.UnpicklingError):
+                    break
+        # Compact into one record so later appends never follow a torn one
+        atomic_pickle_dump(entries, self.cache_path)
+        return entries
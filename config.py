@@ -23,11 +23,27 @@ class OptimizationConfig:
     parallel_fd_workers: bool = False
     # Extra parallel Nastran in SLSQP callback; usually redundant with jac prefill.
     prefetch_fd_in_callback: bool = False
+    # Parallel FD workers: "process" (solver clone per process), "thread" (thread
+    # pool sharing the main solver and cache; per-thread clones only for solvers
+    # overriding on_parallel_clone). None -> "process" if parallel_fd_workers.
+    parallel_fd_backend: Optional[str] = None
     # If True, fall back to the last feasible point from optimization history.
     avoid_constraints_violations: bool = False
+    # Gradient runs: take Jacobians from solver.solve_with_gradients instead of
+    # finite differences; None -> whenever the solver implements it.
+    analytic_gradients: Optional[bool] = None
+    # Gradient runs: complex-step derivatives (n solves at x + i*h*e_k, exact
+    # to machine precision); None -> whenever solver.complex_step_safe.
+    complex_step: Optional[bool] = None
+    # Gradient runs: checkpoint every N accepted iterates (0 disables) and
+    # restart from the last checkpoint instead of the model's current state.
+    checkpoint_every: int = 0
+    resume_from_checkpoint: bool = False
     single_fem_task_timeout: float = 300.0
     max_iter: int = 100
-    finite_diff_rel_step: float = None
+    # Default FD step for gradient runs (0.01 when None); "adaptive" picks one
+    # step per variable from a one-time solver probe (see fd_steps.py).
+    finite_diff_rel_step: Optional[float | str] = None
     seed: dict = None
     
     # Флаги
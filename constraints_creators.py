@@ -22,8 +22,12 @@ class Constraint:
         copy_model = copy.deepcopy(self.opt_task_object.model)
         self.opt_task_object.x_to_model(copy_model,
                                          x=x, conversion_map=self.opt_task_object.conversion_map)
-        result =  self.opt_task_object.solver.solve(calc_task=copy_model,
-                     unique_id=self.opt_task_object.unique_id, res_type=self.parameter)
+        evaluate_model = getattr(self.opt_task_object, "evaluate_model", None)
+        if callable(evaluate_model):
+            result = evaluate_model(copy_model)[self.parameter]
+        else:
+            result =  self.opt_task_object.solver.solve(calc_task=copy_model,
+                         unique_id=self.opt_task_object.unique_id, res_type=self.parameter)
         logger.info(f"{self.parameter}: {float(result)}")
         if self.limit != 0:
             return result / self.limit - 1
@@ -0,0 +1,61 @@
+"""Per-run store of solver results keyed by design signature."""
+
+from __future__ import annotations
+
+from typing import Any, Callable, Dict
+
+
+class EvaluationLedger:
+    """
+    Full result maps (res_type=None) of every design evaluated during a run.
+
+    Objective, constraints, SLSQP callback and FD stencil all read through the
+    ledger, so a point solved by any of them is never solved again in the same
+    run, even by a solver without its own cache. Models without signature()
+    bypass the ledger.
+    """
+
+    def __init__(self) -> None:
+        self._results: Dict[Any, Dict[str, Any]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __contains__(self, signature: Any) -> bool:
+        return signature in self._results
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+    def __getitem__(self, signature: Any) -> Dict[str, Any]:
+        return self._results[signature]
+
+    def __setitem__(self, signature: Any, results: Dict[str, Any]) -> None:
+        self._results[signature] = results
+
+    def get(self, signature: Any) -> Dict[str, Any] | None:
+        return self._results.get(signature)
+
+    def items(self):
+        return self._results.items()
+
+    def record(self, signature: Any, results: Dict[str, Any]) -> None:
+        self._results[signature] = results
+
+    def clear(self) -> None:
+        self._results.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def evaluate(self, model: Any, solve: Callable[[Any], Dict[str, Any]]) -> Dict[str, Any]:
+        signature_fn = getattr(model, "signature", None)
+        if not callable(signature_fn):
+            return solve(model)
+        signature = signature_fn()
+        results = self._results.get(signature)
+        if results is not None:
+            self.hits += 1
+            return results
+        self.misses += 1
+        results = solve(model)
+        self._results[signature] = results
+        return results
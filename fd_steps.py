@@ -0,0 +1,110 @@
+"""Per-variable finite-difference step selection from a one-time probe of the solver."""
+
+from __future__ import annotations
+
+from typing import Callable, List, NamedTuple, Sequence, Tuple
+
+import numpy as np
+from scipy.optimize import Bounds
+
+from optimization_tools.parallel_fd import _bounds_tuple, clip_to_bounds
+
+# Relative steps tried for every variable, largest first
+DEFAULT_STEP_LADDER = (1e-1, 3e-2, 1e-2, 3e-3, 1e-3, 3e-4)
+
+
+class ProbeStencil(NamedTuple):
+    """Two probe points giving a 3-point derivative of one variable at one ladder step."""
+    variable: int
+    level: int
+    step: float
+    central: bool
+    indices: Tuple[int, int]
+
+
+def probe_points(
+    x0: np.ndarray,
+    bounds: Bounds | Tuple[np.ndarray, np.ndarray] | None,
+    ladder: Sequence[float] = DEFAULT_STEP_LADDER,
+) -> Tuple[List[np.ndarray], List[ProbeStencil]]:
+    """
+    Points of the step probe: x0 first, then for every variable and ladder
+    step the pair a 3-point difference needs, central where both sides fit
+    into the bounds and one-sided otherwise (as scipy approx_derivative does).
+    The absolute step is rel_step * max(1, |x|), again matching scipy.
+    """
+    x0 = clip_to_bounds(np.asarray(x0, dtype=float), bounds)
+    bt = _bounds_tuple(bounds)
+    lb, ub = bt if bt is not None else (np.full(x0.size, -np.inf), np.full(x0.size, np.inf))
+    points: List[np.ndarray] = [x0.copy()]
+    stencils: List[ProbeStencil] = []
+    for i in range(x0.size):
+        for level, rel_step in enumerate(ladder):
+            h = rel_step * max(1.0, abs(x0[i]))
+            central = x0[i] - h >= lb[i] and x0[i] + h <= ub[i]
+            if central:
+                step, offsets = h, (-h, h)
+            else:
+                step = h if x0[i] + 2 * h <= ub[i] else -h
+                offsets = (step, 2 * step)
+            indices = []
+            for offset in offsets:
+                point = x0.copy()
+                point[i] += offset
+                indices.append(len(points))
+                points.append(point)
+            stencils.append(ProbeStencil(i, level, step, central, tuple(indices)))
+    return points, stencils
+
+
+def select_rel_steps(
+    values: np.ndarray,
+    stencils: List[ProbeStencil],
+    n_vars: int,
+    ladder: Sequence[float] = DEFAULT_STEP_LADDER,
+) -> np.ndarray:
+    """
+    Stepleman-Winarsky style choice of one relative step per variable.
+    values[p] holds every output (objective and constraints) at probe point p.
+    Along the ladder, successive derivative estimates get closer while the
+    truncation error dominates and drift apart again once solver noise does;
+    the step where they agree best is taken, with the disagreement measured
+    relative to each output's derivative magnitude and the worst output
+    deciding. Ties (e.g. exactly quadratic outputs) go to the larger step.
+    """
+    values = np.atleast_2d(np.asarray(values, dtype=float))
+    f0 = values[0]
+    derivatives = np.zeros((n_vars, len(ladder), values.shape[1]))
+    for stencil in stencils:
+        first, second = values[stencil.indices[0]], values[stencil.indices[1]]
+        if stencil.central:
+            derivative = (second - first) / (2 * stencil.step)
+        else:
+            derivative = (-3 * f0 + 4 * first - second) / (2 * stencil.step)
+        derivatives[stencil.variable, stencil.level] = derivative
+
+    rel_steps = np.full(n_vars, float(ladder[0]))
+    if len(ladder) < 2:
+        return rel_steps
+    for i in range(n_vars):
+        estimates = derivatives[i]
+        scale = np.abs(estimates).max(axis=0) + 1e-12 * (1.0 + np.abs(f0))
+        disagreement = (np.abs(np.diff(estimates, axis=0)) / scale).max(axis=1)
+        rel_steps[i] = ladder[int(np.flatnonzero(disagreement <= disagreement.min() + 1e-9)[0])]
+    return rel_steps
+
+
+def adaptive_rel_steps(
+    x0: np.ndarray,
+    bounds: Bounds | Tuple[np.ndarray, np.ndarray] | None,
+    evaluate: Callable[[List[np.ndarray]], np.ndarray],
+    ladder: Sequence[float] = DEFAULT_STEP_LADDER,
+) -> np.ndarray:
+    """
+    Relative FD step per variable for normalized x0. evaluate(points) returns
+    the output vectors at all probe points and is called once, so the whole
+    probe (1 + 2 * len(ladder) * n solves) can run as one parallel batch.
+    """
+    x0 = np.asarray(x0, dtype=float)
+    points, stencils = probe_points(x0, bounds, ladder)
+    return select_rel_steps(evaluate(points), stencils, x0.size, ladder)
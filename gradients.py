@@ -0,0 +1,99 @@
+"""Solver-supplied sensitivities as SLSQP Jacobians in normalized variables."""
+
+from __future__ import annotations
+
+import copy
+from typing import Any, Callable, Dict, List, Sequence
+
+import numpy as np
+
+
+def provides_gradients(solver: Any) -> bool:
+    """True when the solver implements the solve_with_gradients contract."""
+    return callable(getattr(solver, "solve_with_gradients", None))
+
+
+class SolverGradients:
+    """
+    Objective and constraint Jacobians of an OptimizationTaskWithNormalization
+    from solver.solve_with_gradients(calc_task, unique_id, var_names), which
+    returns (results, gradients): the usual full results map and, for result
+    keys, arrays of d results[key] / d var over var_names (physical units, in
+    conversion_map order). Gradients are needed for "objective" and every
+    constrained result.
+
+    While installed as task.solver_gradients, every ledger miss of the task is
+    solved with gradients, so the value and the Jacobian of a point cost one
+    solve. The chain rule maps physical derivatives to the optimizer's
+    variables: x = x_norm * denorm_coefficients, objective divided by
+    cost_function_normalization, constraints divided by their limit.
+    """
+
+    def __init__(self, task: Any) -> None:
+        self.task = task
+        self.var_names: List[str] = [task.conversion_map[i] for i in range(len(task.conversion_map))]
+        self._gradients: Dict[Any, Dict[str, np.ndarray]] = {}
+        self.solves = 0
+
+    def clear(self) -> None:
+        self._gradients.clear()
+        self.solves = 0
+
+    def solve(self, model: Any, unique_id: str) -> Dict[str, Any]:
+        """Solve one design with sensitivities; results go to the solver cache as well."""
+        results, gradients = self.task.solver.solve_with_gradients(model, unique_id, list(self.var_names))
+        self.solves += 1
+        signature = model.signature()
+        self._gradients[signature] = {
+            key: np.asarray(value, dtype=float).reshape(len(self.var_names))
+            for key, value in gradients.items()
+        }
+        cache_map = getattr(self.task.solver, "cache_map", None)
+        if cache_map is not None:
+            cache_map[signature] = results
+        return results
+
+    def _model_at(self, x_norm: Sequence[float]) -> Any:
+        x = [float(x_component) for x_component in x_norm]
+        x_denorm = [x[i] * self.task.denorm_coefficients[i] for i in range(len(x))]
+        model = copy.deepcopy(self.task.model)
+        self.task.x_to_model(model, x_denorm, self.task.conversion_map)
+        return model
+
+    def gradients_at(self, x_norm: Sequence[float]) -> Dict[str, np.ndarray]:
+        """Physical gradients at a normalized point, solving it only if it has none yet."""
+        model = self._model_at(x_norm)
+        signature = model.signature()
+        if signature not in self._gradients:
+            results = self.solve(model, self.task.unique_id)
+            self.task.ledger.record(signature, results)
+            self.task.ledger.misses += 1
+        return self._gradients[signature]
+
+    def _gradient(self, x_norm: Sequence[float], key: str) -> np.ndarray:
+        gradients = self.gradients_at(x_norm)
+        if key not in gradients:
+            raise ValueError(f"solve_with_gradients returned no gradient for {key!r}")
+        return gradients[key] * np.asarray(self.task.denorm_coefficients, dtype=float)
+
+    def objective_jac(self, x_norm: Sequence[float]) -> np.ndarray:
+        return self._gradient(x_norm, "objective") / self.task.cost_function_normalization
+
+    def make_constraint_jac(self, constraint_index: int) -> Callable[[Sequence[float]], np.ndarray]:
+        constraint = self.task.cons[constraint_index]["fun"]
+        parameter, limit = constraint.parameter, constraint.limit
+
+        def jac(x_norm: Sequence[float]) -> np.ndarray:
+            gradient = self._gradient(x_norm, parameter)
+            return gradient / limit if limit != 0 else gradient
+
+        return jac
+
+    def attach_constraint_jacs(self, constraints: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        enriched = []
+        for index, constraint in enumerate(constraints):
+            item = dict(constraint)
+            if item.get("jac") is None:
+                item["jac"] = self.make_constraint_jac(index)
+            enriched.append(item)
+        return enriched
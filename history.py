@@ -0,0 +1,178 @@
+"""Columnar NumPy store for optimization history."""
+
+from __future__ import annotations
+
+import time
+from numbers import Real
+from typing import Any, Dict, Iterator, List, Sequence
+
+import numpy as np
+
+OBJECTIVE_KEYS = ("objective", "mass")
+
+
+class OptimizationHistory:
+    """
+    Accepted iterates as growable NumPy columns: variable values, every scalar
+    solver result, iteration number and timestamp.
+
+    Columns are created on the first append; a result key that appears later
+    gets a new column backfilled with NaN. Non-scalar results are not stored.
+    Rows are still available as {"vars": ..., "constraints": ...} dicts
+    (indexing/iteration) for code written against the old list-of-dicts history;
+    records() gives that list itself, e.g. for JSON.
+    """
+
+    def __init__(self, initial_capacity: int = 64) -> None:
+        self._capacity = max(1, int(initial_capacity))
+        self._size = 0
+        self.var_names: List[str] = []
+        self.result_names: List[str] = []
+        self._x = np.empty((0, 0), dtype=float)
+        self._results = np.empty((0, 0), dtype=float)
+        self._iteration = np.empty(0, dtype=np.int64)
+        self._timestamp = np.empty(0, dtype=float)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for index in range(self._size):
+            yield self.record(index)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.record(i) for i in range(*index.indices(self._size))]
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("history index out of range")
+        return self.record(index)
+
+    @property
+    def x(self) -> np.ndarray:
+        return self._x[: self._size]
+
+    @property
+    def iteration(self) -> np.ndarray:
+        return self._iteration[: self._size]
+
+    @property
+    def timestamp(self) -> np.ndarray:
+        return self._timestamp[: self._size]
+
+    def column(self, name: str) -> np.ndarray:
+        if name in self.var_names:
+            return self.x[:, self.var_names.index(name)]
+        return self._results[: self._size, self.result_names.index(name)]
+
+    def _init_columns(self, vars_dict: Dict[str, Any]) -> None:
+        self.var_names = list(vars_dict)
+        self._x = np.full((self._capacity, len(self.var_names)), np.nan)
+        self._results = np.full((self._capacity, 0), np.nan)
+        self._iteration = np.zeros(self._capacity, dtype=np.int64)
+        self._timestamp = np.zeros(self._capacity, dtype=float)
+
+    def _grow(self) -> None:
+        self._capacity *= 2
+        extra = self._capacity - self._x.shape[0]
+        self._x = np.vstack([self._x, np.full((extra, self._x.shape[1]), np.nan)])
+        self._results = np.vstack([self._results, np.full((extra, self._results.shape[1]), np.nan)])
+        self._iteration = np.concatenate([self._iteration, np.zeros(extra, dtype=np.int64)])
+        self._timestamp = np.concatenate([self._timestamp, np.zeros(extra, dtype=float)])
+
+    def _add_result_column(self, name: str) -> None:
+        self.result_names.append(name)
+        self._results = np.hstack([self._results, np.full((self._results.shape[0], 1), np.nan)])
+
+    def append(self, vars_dict: Dict[str, Any], results: Dict[str, Any], iteration: int | None = None) -> None:
+        if self._size == 0 and not self.var_names:
+            self._init_columns(vars_dict)
+        if self._size == self._x.shape[0]:
+            self._grow()
+        row = self._size
+        self._x[row] = [float(vars_dict[name]) for name in self.var_names]
+        for name, value in (results or {}).items():
+            if not isinstance(value, Real) or isinstance(value, bool):
+                continue
+            if name not in self.result_names:
+                self._add_result_column(name)
+            self._results[row, self.result_names.index(name)] = float(value)
+        self._iteration[row] = row + 1 if iteration is None else iteration
+        self._timestamp[row] = time.time()
+        self._size += 1
+
+    def record(self, index: int) -> Dict[str, Any]:
+        vars_dict = {name: float(self._x[index, j]) for j, name in enumerate(self.var_names)}
+        results = {
+            name: float(self._results[index, j])
+            for j, name in enumerate(self.result_names)
+            if not np.isnan(self._results[index, j])
+        }
+        return {"vars": vars_dict, "constraints": results}
+
+    def records(self) -> List[Dict[str, Any]]:
+        """All rows as the old list-of-dicts history."""
+        return [self.record(index) for index in range(self._size)]
+
+    def feasible_mask(self, limits: Dict[str, float]) -> np.ndarray:
+        """Vectorized utils.constraints_are_satisfied over all rows; missing values are ignored."""
+        mask = np.ones(self._size, dtype=bool)
+        for name, limit in limits.items():
+            if name not in self.result_names:
+                continue
+            values = self.column(name)
+            violated = values - limit < -abs(0.0001 * limit)
+            mask &= ~(violated & ~np.isnan(values))
+        return mask
+
+    def objective_column(self, objective_keys: Sequence[str] = OBJECTIVE_KEYS) -> np.ndarray:
+        objective = np.full(self._size, np.nan)
+        for name in reversed(objective_keys):
+            if name in self.result_names:
+                values = self.column(name)
+                objective = np.where(np.isnan(values), objective, values)
+        return objective
+
+    def best_feasible_index(self, limits: Dict[str, float]) -> int | None:
+        objective = self.objective_column()
+        candidates = self.feasible_mask(limits) & ~np.isnan(objective)
+        if not candidates.any():
+            return None
+        return int(np.argmin(np.where(candidates, objective, np.inf)))
+
+    def last_feasible_index(self, limits: Dict[str, float]) -> int | None:
+        feasible = np.flatnonzero(self.feasible_mask(limits))
+        if feasible.size == 0:
+            return None
+        return int(feasible[-1])
+
+    def save_npz(self, path: str) -> None:
+        np.savez_compressed(
+            path,
+            var_names=np.asarray(self.var_names, dtype=str),
+            result_names=np.asarray(self.result_names, dtype=str),
+            x=self.x,
+            results=self._results[: self._size],
+            iteration=self.iteration,
+            timestamp=self.timestamp,
+        )
+
+    @classmethod
+    def load_npz(cls, path: str) -> "OptimizationHistory":
+        with np.load(path) as data:
+            history = cls(initial_capacity=max(1, len(data["iteration"])))
+            history.var_names = [str(name) for name in data["var_names"]]
+            history.result_names = [str(name) for name in data["result_names"]]
+            history._x = np.array(data["x"], dtype=float).reshape(-1, len(history.var_names))
+            history._results = np.array(data["results"], dtype=float).reshape(-1, len(history.result_names))
+            history._iteration = np.array(data["iteration"], dtype=np.int64)
+            history._timestamp = np.array(data["timestamp"], dtype=float)
+        history._size = len(history._iteration)
+        if history._size == 0:
+            history._x = np.full((1, len(history.var_names)), np.nan)
+            history._results = np.full((1, len(history.result_names)), np.nan)
+            history._iteration = np.zeros(1, dtype=np.int64)
+            history._timestamp = np.zeros(1, dtype=float)
+        history._capacity = history._x.shape[0]
+        return history
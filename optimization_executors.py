@@ -1,14 +1,21 @@
 from abc import abstractmethod, ABCMeta
-from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+import asyncio
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+import functools
 from multiprocessing.pool import ApplyResult
+import logging
 import pickle
+import time
+import traceback
 import uuid
+from multiprocess import TimeoutError as PoolTimeoutError
 from pathos.multiprocessing import ProcessingPool
 import pika 
-from dataclasses import asdict
+from dataclasses import asdict, dataclass
 from optimization_tools.config import OptimizationConfig
 
 from optimization_tools.optimizers.abstract_optimizer import AbstractOPtimizer
+from optimization_tools.scheduling import LongestJobFirstScheduler
 from . import opt_tools_settings
 
 
@@ -16,10 +23,14 @@ def run_single_optimization(optimizer: AbstractOPtimizer, config_dict: dict = No
     """
     Запуск оптимизации. 
     config_dict нужен только для параллельного выполнения.
+    optimizer.config_overrides (если есть) - поля конфига, заданные именно
+    этой задаче (например, бюджет итераций раунда successive halving);
+    они применяются поверх config_dict.
     """
     # В параллельном режиме восстанавливаем конфиг
     if config_dict:
-        config = OptimizationConfig.from_dict(config_dict)
+        overrides = getattr(optimizer, "config_overrides", None) or {}
+        config = OptimizationConfig.from_dict({**config_dict, **overrides})
         optimizer.config = config
         optimizer.optimized_object.config = config
         optimizer.optimized_object.solver.config = config
@@ -27,6 +38,64 @@ def run_single_optimization(optimizer: AbstractOPtimizer, config_dict: dict = No
     result = optimizer.run_optimization()
     return result
 
+
+@dataclass
+class RetryPolicy:
+    """
+    Политика повторов для исполнителей.
+    max_retries - число повторных запусков упавшей задачи.
+    retry_on_crash - повторять задачи, потерянные из-за падения воркера
+    (пул при этом пересоздается).
+    retry_delay - пауза перед очередным раундом повторов, с.
+    """
+    max_retries: int = 0
+    retry_on_crash: bool = True
+    retry_delay: float = 0.0
+
+
+@dataclass
+class TaskFailure:
+    """Маркер упавшей задачи; в результатах исполнителя на ее месте - None."""
+    error: str
+    traceback: str = ""
+    crashed: bool = False
+    task_index: int = None
+    attempts: int = 0
+
+    @classmethod
+    def from_exception(cls, exc: BaseException, crashed: bool = False) -> "TaskFailure":
+        return cls(
+            error=repr(exc),
+            traceback="".join(traceback.format_exception(type(exc), exc, exc.__traceback__)),
+            crashed=crashed,
+        )
+
+
+class WorkerCrashError(RuntimeError):
+    """Процесс пула завершился, не вернув результат задачи."""
+
+
+def run_optimization_chunk(optimizers: list[AbstractOPtimizer], config_dict: dict = None,
+                           capture_errors: bool = False):
+    """
+    Последовательный запуск пакета задач в одном воркере.
+    Возвращает список пар (результат, длительность в секундах).
+    При capture_errors исключение задачи не прерывает пакет:
+    вместо результата возвращается TaskFailure.
+    """
+    timed_results = []
+    for optimizer in optimizers:
+        started = time.perf_counter()
+        try:
+            result = run_single_optimization(optimizer, config_dict)
+        except Exception as exc:
+            if not capture_errors:
+                raise
+            result = TaskFailure.from_exception(exc)
+        timed_results.append((result, time.perf_counter() - started))
+    return timed_results
+
+
 class panel_optimization_client(object):
     def __init__(self):
         credentials = pika.PlainCredentials('user', 'password')
@@ -79,101 +148,504 @@ def run_single_optimization_on_cluster(optimizer: AbstractOPtimizer):
             return ready_task
 
 
+class OptimizationBatch:
+    """
+    Пакет задач, отправляемый на удаленный воркер одним RPC-сообщением.
+    Для воркера выглядит как обычный оптимизатор: run_optimization()
+    выполняет все задачи локально (при max_workers > 1 - в пуле процессов)
+    и возвращает список результатов в исходном порядке.
+    """
+    def __init__(self, optimizers: list[AbstractOPtimizer], max_workers: int = 1) -> None:
+        self.optimizers = list(optimizers)
+        self.max_workers = max_workers
+
+    def __len__(self):
+        return len(self.optimizers)
+
+    def run_optimization(self, **kwargs) -> list:
+        if self.max_workers <= 1 or len(self.optimizers) <= 1:
+            return [run_single_optimization(optimizer) for optimizer in self.optimizers]
+        max_workers = min(self.max_workers, len(self.optimizers))
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            return list(pool.map(run_single_optimization, self.optimizers))
+
+
+def handle_rpc_request(body: bytes) -> bytes:
+    """
+    Обработка RPC-сообщения на стороне воркера. Сообщение - pickle
+    оптимизатора или OptimizationBatch, ответ - pickle результата
+    (для пакета - списка результатов).
+    """
+    task = pickle.loads(body)
+    result = run_single_optimization(task)
+    return pickle.dumps(result, pickle.HIGHEST_PROTOCOL)
+
+
+def futures_in_completion_order(futures: list[Future]):
+    """Позиции futures в порядке их завершения."""
+    positions = {future: position for position, future in enumerate(futures)}
+    for future in as_completed(positions):
+        yield positions[future]
+
+
 class AbstractExecutor(metaclass=ABCMeta):
+    scheduler: LongestJobFirstScheduler | None = None
+    retry_policy: RetryPolicy | None = None
+    failures: list[TaskFailure]
+
     @abstractmethod
-    def __call__(self, tasks):
+    def __call__(self, tasks, on_result=None):
+        """
+        Выполняет задачи и возвращает результаты в исходном порядке.
+        on_result(index, result) вызывается по мере готовности каждого результата
+        (в порядке завершения задач, index - номер задачи во входном списке).
+        """
         pass
 
+    def _completed(self, handles: list):
+        """Позиции отправленных задач в порядке готовности; по умолчанию - в порядке отправки."""
+        return range(len(handles))
+
+    def set_scheduler(self, scheduler: LongestJobFirstScheduler | None) -> None:
+        self.scheduler = scheduler
+
+    def set_retry_policy(self, retry_policy: RetryPolicy | None) -> None:
+        self.retry_policy = retry_policy
+
+    def _is_managed(self) -> bool:
+        return self.scheduler is not None or self.retry_policy is not None
+
+    def _restart_pool(self) -> None:
+        """Пересоздание пула после падения воркера; по умолчанию не требуется."""
+
+    def _run_managed(self, tasks, submit, wait, on_result=None):
+        """
+        Запуск задач с планировщиком и/или политикой повторов.
+        submit(chunk, capture_errors) отправляет пакет задач в run_optimization_chunk,
+        wait(future) возвращает его список пар (результат, длительность).
+        Результаты возвращаются в исходном порядке задач. Если задана
+        retry_policy, задачи, упавшие после всех повторов, дают None,
+        а их TaskFailure сохраняются в self.failures. При потере воркера
+        попытка засчитывается только первому упавшему пакету раунда.
+        """
+        tasks = list(tasks)
+        policy = self.retry_policy
+        capture_errors = policy is not None
+        if self.scheduler is not None:
+            pending = self.scheduler.plan(tasks)
+        else:
+            pending = [[index] for index in range(len(tasks))]
+
+        calculated = [None] * len(tasks)
+        durations = [None] * len(tasks)
+        attempts = [0] * len(tasks)
+        self.failures = []
+        while pending:
+            chunks = pending
+            futures = [submit([tasks[index] for index in chunk], capture_errors) for chunk in chunks]
+            pending = []
+            pool_crashed = False
+            for position in self._completed(futures):
+                chunk = chunks[position]
+                try:
+                    timed_results = wait(futures[position])
+                except Exception as exc:
+                    # Исключение здесь - потеря воркера целиком (или отказ без capture_errors)
+                    if not capture_errors:
+                        raise
+                    if pool_crashed:
+                        # Пакет потерян вместе с уже упавшим пулом - повтор без расхода попыток
+                        pending.append(chunk)
+                        continue
+                    pool_crashed = True
+                    failure = TaskFailure.from_exception(exc, crashed=True)
+                    timed_results = [(failure, None)] * len(chunk)
+                for index, (result, duration) in zip(chunk, timed_results):
+                    attempts[index] += 1
+                    if not isinstance(result, TaskFailure):
+                        calculated[index] = result
+                        durations[index] = duration
+                        if on_result is not None:
+                            on_result(index, result)
+                        continue
+                    if attempts[index] <= policy.max_retries and (policy.retry_on_crash or not result.crashed):
+                        pending.append([index])
+                        continue
+                    logging.getLogger(__name__).error(
+                        "Task %s failed after %s attempt(s): %s", index, attempts[index], result.error)
+                    self.failures.append(TaskFailure(
+                        result.error, result.traceback, result.crashed, index, attempts[index]))
+            if pool_crashed:
+                self._restart_pool()
+            if pending and policy.retry_delay:
+                time.sleep(policy.retry_delay)
+
+        if self.scheduler is not None:
+            finished = [index for index, duration in enumerate(durations) if duration is not None]
+            self.scheduler.record([tasks[index] for index in finished],
+                                  [durations[index] for index in finished])
+        return calculated
+
 
 class ForLoopExecutor(AbstractExecutor):
-    def __init__(self, config: OptimizationConfig):
+    def __init__(self, config: OptimizationConfig, scheduler: LongestJobFirstScheduler = None,
+                 retry_policy: RetryPolicy = None):
         self.config = config
         self.function = run_single_optimization
+        self.scheduler = scheduler
+        self.retry_policy = retry_policy
+        self.failures = []
 
-    def __call__(self, tasks):
+    def __call__(self, tasks, on_result=None):
+        if self._is_managed():
+            return self._run_managed(
+                tasks,
+                lambda chunk, capture_errors: functools.partial(run_optimization_chunk, chunk, None, capture_errors),
+                lambda run_chunk: run_chunk(),
+                on_result,
+            )
         # В последовательном режиме конфиг уже в optimizer
-        return list(map(self.function, tasks))
+        calculated = []
+        for index, task in enumerate(tasks):
+            calculated.append(self.function(task))
+            if on_result is not None:
+                on_result(index, calculated[-1])
+        return calculated
     
 
 # https://stackoverflow.com/questions/19984152/what-can-multiprocessing-and-dill-do-together
 class MultiprocessExecutor(AbstractExecutor):
-    def __init__(self, pool) -> None:
+    """
+    Исполнитель на пуле pathos ProcessingPool.
+    Задача, чей процесс умер (os._exit, OOM killer), в pathos никогда не
+    завершается, поэтому результат ждется с таймаутом poll_interval, а между
+    ожиданиями проверяются процессы пула, бывшие живыми при отправке задачи.
+    Если какой-то из них умер, все еще не готовые задачи считаются потерянными
+    (WorkerCrashError): с retry_policy они повторяются на пересозданном пуле,
+    без нее исключение пробрасывается.
+    """
+    poll_interval: float = 1.0
+
+    def __init__(self, pool, scheduler: LongestJobFirstScheduler = None,
+                 retry_policy: RetryPolicy = None) -> None:
         # self.num_proc = num_proc
         self.pool: ProcessingPool = pool
         self.function = run_single_optimization
-        
-    def __call__(self, tasks):
-        print(f"MultiprocessExecutor with id {id(self)}")
-        future_results: list[ApplyResult] = []
-        for task in tasks:
-            future_result = self.pool.apipe(self.function, task)
-            future_results.append(future_result)
-        calculated = []
-        for result in future_results:
-            calculated.append(result.get())
+        self.scheduler = scheduler
+        self.retry_policy = retry_policy
+        self.failures = []
+
+    def _restart_pool(self) -> None:
+        # close()+join() внутри restart ждут потерянную задачу вечно - сначала terminate
+        self.pool.terminate()
+        self.pool.restart(force=True)
+
+    def _workers(self) -> list:
+        serve = getattr(self.pool, "_serve", None)
+        inner_pool = serve() if callable(serve) else self.pool
+        return list(getattr(inner_pool, "_pool", None) or [])
+
+    def _submit(self, function, *args) -> tuple[ApplyResult, list]:
+        return self.pool.apipe(function, *args), self._workers()
+
+    def _wait(self, submitted: tuple[ApplyResult, list]):
+        future, workers = submitted
+        while True:
+            try:
+                return future.get(timeout=self.poll_interval)
+            except PoolTimeoutError:
+                dead = [worker for worker in workers if worker.exitcode is not None]
+                if dead and not future.ready():
+                    raise WorkerCrashError(
+                        f"pool worker(s) {[worker.pid for worker in dead]} exited with code(s) "
+                        f"{[worker.exitcode for worker in dead]}")
+
+    def _completed(self, submitted: list[tuple[ApplyResult, list]]):
+        remaining = list(range(len(submitted)))
+        while remaining:
+            ready = [position for position in remaining if submitted[position][0].ready()]
+            if not ready:
+                future, workers = submitted[remaining[0]]
+                future.wait(self.poll_interval)
+                if future.ready() or not any(worker.exitcode is not None for worker in workers):
+                    continue
+                # Воркер умер: отдаем задачу, _wait для нее выбросит WorkerCrashError
+                ready = [remaining[0]]
+            for position in ready:
+                remaining.remove(position)
+                yield position
+
+    def __call__(self, tasks, on_result=None):
+        if self._is_managed():
+            return self._run_managed(
+                tasks,
+                lambda chunk, capture_errors: self._submit(
+                    run_optimization_chunk, chunk, None, capture_errors),
+                self._wait,
+                on_result,
+            )
+        submitted = [self._submit(self.function, task) for task in tasks]
+        calculated = [None] * len(submitted)
+        for index in self._completed(submitted):
+            calculated[index] = self._wait(submitted[index])
+            if on_result is not None:
+                on_result(index, calculated[index])
         return calculated
 
 
 class MultiprocessExecutorCF(AbstractExecutor):
-    def __init__(self, pool=None, config: OptimizationConfig=None):
+    """
+    Исполнитель на concurrent.futures.ProcessPoolExecutor.
+    Без pool создается собственный пул на config.num_proc процессов; он живет
+    между вызовами (раунды successive halving, волны мультистарта) и
+    закрывается close() или выходом из with. Вызов после close() создает
+    новый пул. Пул, переданный снаружи, закрывает его владелец.
+    """
+    def __init__(self, pool=None, config: OptimizationConfig=None,
+                 scheduler: LongestJobFirstScheduler = None, retry_policy: RetryPolicy = None):
         if pool is None:
-            self.pool = ProcessPoolExecutor(max_workers=config.num_proc)
+            self._max_workers = config.num_proc
+            self.pool = ProcessPoolExecutor(max_workers=self._max_workers)
             self._own_pool = True
         else:
             self.pool = pool
             self._own_pool = False
+        self._pool_closed = False
         
         self.config = config
         self.function = run_single_optimization
+        self.scheduler = scheduler
+        self.retry_policy = retry_policy
+        self.failures = []
+
+    def _restart_pool(self) -> None:
+        # После падения процесса ProcessPoolExecutor непригоден (BrokenProcessPool).
+        # Чужой пул не закрывается и не подменяется: на нем может быть другая работа
+        if not self._own_pool:
+            raise WorkerCrashError(
+                "a worker of the caller's ProcessPoolExecutor died and the pool is broken; "
+                "create MultiprocessExecutorCF without a pool to retry crashed tasks")
+        self.pool.shutdown(wait=False, cancel_futures=True)
+        self.pool = ProcessPoolExecutor(max_workers=self._max_workers)
+
+    def _completed(self, futures: list[Future]):
+        return futures_in_completion_order(futures)
+
+    def close(self) -> None:
+        """Закрывает собственный пул; чужой пул не трогается."""
+        if self._own_pool and not self._pool_closed:
+            self.pool.shutdown()
+            self._pool_closed = True
+
+    def __enter__(self) -> "MultiprocessExecutorCF":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
     
-    def __call__(self, tasks):
+    def __call__(self, tasks, on_result=None):
+        if self._pool_closed:
+            self.pool = ProcessPoolExecutor(max_workers=self._max_workers)
+            self._pool_closed = False
         future_results: list[Future] = []
         config_dict = self.config.to_dict()  # Сериализуем конфиг
+
+        if self._is_managed():
+            return self._run_managed(
+                tasks,
+                lambda chunk, capture_errors: self.pool.submit(
+                    run_optimization_chunk, chunk, config_dict, capture_errors),
+                lambda future: future.result(),
+                on_result,
+            )
         
         for task in tasks:
             # Передаем конфиг в дочерний процесс
             future_result = self.pool.submit(self.function, task, config_dict)
             future_results.append(future_result)
         
-        calculated = []
-        for result in future_results:
-            calculated.append(result.result())
-        
-        if self._own_pool:
-            self.pool.shutdown()
+        calculated = [None] * len(future_results)
+        for index in self._completed(future_results):
+            calculated[index] = future_results[index].result()
+            if on_result is not None:
+                on_result(index, calculated[index])
         
         return calculated
 
 class ThreadExecutor(AbstractExecutor):
-    def __init__(self, pool: ThreadPoolExecutor) -> None:
+    def __init__(self, pool: ThreadPoolExecutor, scheduler: LongestJobFirstScheduler = None,
+                 retry_policy: RetryPolicy = None) -> None:
         # self.num_proc = num_proc
         self.pool: ThreadPoolExecutor = pool
         self.function = run_single_optimization
+        self.scheduler = scheduler
+        self.retry_policy = retry_policy
+        self.failures = []
+
+    def _completed(self, futures: list[Future]):
+        return futures_in_completion_order(futures)
     
-    def __call__(self, tasks):
+    def __call__(self, tasks, on_result=None):
         print(f"ThreadExecutor with id {id(self)}")
+        if self._is_managed():
+            return self._run_managed(
+                tasks,
+                lambda chunk, capture_errors: self.pool.submit(
+                    run_optimization_chunk, chunk, None, capture_errors),
+                lambda future: future.result(),
+                on_result,
+            )
         future_results: list[Future] = []
         for task in tasks:
             future_result = self.pool.submit(self.function, task)
             future_results.append(future_result)
-        calculated = []
-        for result in future_results:
-            calculated.append(result.result())
+        calculated = [None] * len(future_results)
+        for index in self._completed(future_results):
+            calculated[index] = future_results[index].result()
+            if on_result is not None:
+                on_result(index, calculated[index])
         return calculated
 
+class AsyncioExecutor(AbstractExecutor):
+    """
+    Исполнитель на asyncio: все задачи ведутся из одного потока, одновременно
+    выполняется не более max_concurrency (семафор; по умолчанию config.num_proc).
+    Задачи с run_optimization_async (оптимизаторы, DesignEvaluation с солвером,
+    реализующим solve_async, например AsyncSubprocessSolver) ждут внешние
+    процессы без отдельных потоков и процессов Python; остальные задачи
+    выполняются в потоке через asyncio.to_thread. __call__ ставит своему event loop
+    пул потоков по умолчанию на max_concurrency потоков; при вызове run_async из
+    чужого loop потоков не больше, чем в его пуле по умолчанию
+    (в стандартном - min(32, os.cpu_count() + 4)).
+    Повторы по retry_policy - как в других исполнителях: упавшие после всех
+    повторов задачи дают None, их TaskFailure сохраняются в self.failures.
+    on_result(index, result) вызывается из того же потока по мере готовности.
+    """
+    def __init__(self, max_concurrency: int = None, config: OptimizationConfig = None,
+                 retry_policy: RetryPolicy = None) -> None:
+        self.config = config
+        if max_concurrency is None:
+            max_concurrency = config.num_proc if config is not None else 1
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.function = run_single_optimization
+        self.retry_policy = retry_policy
+        self.failures = []
+
+    def __call__(self, tasks, on_result=None):
+        return asyncio.run(self._run_with_own_threads(tasks, on_result))
+
+    async def _run_with_own_threads(self, tasks, on_result):
+        # asyncio.run сам останавливает пул по умолчанию при закрытии loop
+        asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=self.max_concurrency))
+        return await self.run_async(tasks, on_result)
+
+    async def _run_task(self, task):
+        run_async = getattr(task, "run_optimization_async", None)
+        if callable(run_async):
+            return await run_async()
+        return await asyncio.to_thread(self.function, task)
+
+    async def run_async(self, tasks, on_result=None) -> list:
+        """То же, что __call__, для вызова из уже работающего event loop"""
+        tasks = list(tasks)
+        policy = self.retry_policy
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        calculated = [None] * len(tasks)
+        self.failures = []
+
+        async def run_one(index, task):
+            attempts = 0
+            while True:
+                attempts += 1
+                try:
+                    async with semaphore:
+                        result = await self._run_task(task)
+                except Exception as exc:
+                    if policy is None:
+                        raise
+                    if attempts <= policy.max_retries:
+                        if policy.retry_delay:
+                            await asyncio.sleep(policy.retry_delay)
+                        continue
+                    failure = TaskFailure.from_exception(exc)
+                    logging.getLogger(__name__).error(
+                        "Task %s failed after %s attempt(s): %s", index, attempts, failure.error)
+                    self.failures.append(TaskFailure(
+                        failure.error, failure.traceback, False, index, attempts))
+                    return
+                calculated[index] = result
+                if on_result is not None:
+                    on_result(index, result)
+                return
+
+        await asyncio.gather(*(run_one(index, task) for index, task in enumerate(tasks)))
+        self.failures.sort(key=lambda failure: failure.task_index)
+        return calculated
+
+
 class RabbitExecutor(AbstractExecutor):
-    def __init__(self, pool) -> None:
+    """
+    Выполнение задач на кластере через RabbitMQ.
+    batch_size - число задач в одном RPC-сообщении (1 - по задаче на сообщение).
+    target_batch_duration - желаемая длительность пакета в секундах; если задана,
+    размер пакета подбирается по измеренной длительности одной задачи
+    (первая задача запускается отдельно как замер).
+    worker_parallelism - число процессов, которыми воркер выполняет пакет.
+    """
+    def __init__(self, pool, batch_size: int = 1, target_batch_duration: float = None,
+                 worker_parallelism: int = 1) -> None:
         self.pool: ThreadPoolExecutor = pool
         self.function = run_single_optimization
+        self.batch_size = max(1, int(batch_size))
+        self.target_batch_duration = target_batch_duration
+        self.worker_parallelism = worker_parallelism
+        self._task_duration_estimate: float | None = None
+        self.failures = []
 
-    def __call__(self, tasks: list[AbstractOPtimizer]):
-        future_results: list[Future] = []
-        for task in tasks:
-            future_result = self.pool.submit(run_single_optimization_on_cluster, task)
-            future_results.append(future_result)
-        
-        calculated = []
-        for result in future_results:
-            calculated.append(result.result())
+    def _current_batch_size(self) -> int:
+        if self.target_batch_duration is None or not self._task_duration_estimate:
+            return self.batch_size
+        return max(1, int(self.target_batch_duration / self._task_duration_estimate))
+
+    def _update_duration_estimate(self, duration: float, tasks_count: int) -> None:
+        per_task = duration / max(1, tasks_count)
+        if self._task_duration_estimate is None:
+            self._task_duration_estimate = per_task
+        else:
+            self._task_duration_estimate = 0.5 * (self._task_duration_estimate + per_task)
+
+    def _run_batch(self, tasks: list[AbstractOPtimizer]) -> list:
+        started = time.perf_counter()
+        if len(tasks) == 1:
+            # Одиночная задача уходит как есть - совместимо со старыми воркерами
+            calculated = [run_single_optimization_on_cluster(tasks[0])]
+        else:
+            batch = OptimizationBatch(tasks, max_workers=self.worker_parallelism)
+            calculated = run_single_optimization_on_cluster(batch)
+        self._update_duration_estimate(time.perf_counter() - started, len(tasks))
+        return calculated
+
+    def __call__(self, tasks: list[AbstractOPtimizer], on_result=None):
+        tasks = list(tasks)
+        calculated = [None] * len(tasks)
+        probe_count = 0
+        if self.target_batch_duration is not None and self._task_duration_estimate is None and tasks:
+            probe_count = 1
+            calculated[0] = self._run_batch(tasks[:1])[0]
+            if on_result is not None:
+                on_result(0, calculated[0])
+
+        batch_size = self._current_batch_size()
+        starts = list(range(probe_count, len(tasks), batch_size))
+        future_results: list[Future] = [
+            self.pool.submit(self._run_batch, tasks[start:start + batch_size]) for start in starts
+        ]
+
+        for position in futures_in_completion_order(future_results):
+            for offset, batch_result in enumerate(future_results[position].result()):
+                index = starts[position] + offset
+                calculated[index] = batch_result
+                if on_result is not None:
+                    on_result(index, batch_result)
 
         return calculated
@@ -1,5 +1,6 @@
 # optimization_tools/optimizers/abstract_optimizer.py
 from abc import abstractmethod
+import asyncio
 import logging
 import os
 from optimization_tools.config import OptimizationConfig
@@ -103,33 +104,53 @@ class AbstractOPtimizer:
                     self.optimized_object.local_log_path + "solver_log"
                 )
  
+    def _start_run(self, **kwargs) -> None:
+        self.logger = logging.getLogger(self.optimized_object.unique_id)
+        self.logger.setLevel(logging.DEBUG)
+        handlers = self._create_handlers()
+        for handler in handlers:
+            self.logger.addHandler(handler)
+        
+        if kwargs.get("handlers"):
+            for handler in kwargs["handlers"]:
+                self.logger.addHandler(handler)
+        
+        if not self.optimized_object._inner_optimizer and \
+           hasattr(self.optimized_object.solver, "set_working_dir"):
+            self._set_up_logging_for_solver()
+
+    def _finish_run(self) -> None:
+        self.logger.info("LOG FINISH")
+        if self.filehandler:
+            self.filehandler.close()
+        self.optimized_object.solver.free_up_log_file()
+
     def run_optimization(self, **kwargs) -> OptimizationTaskResults:
         try:
-            self.logger = logging.getLogger(self.optimized_object.unique_id)
-            self.logger.setLevel(logging.DEBUG)
-            handlers = self._create_handlers()
-            for handler in handlers:
-                self.logger.addHandler(handler)
-            
-            if kwargs.get("handlers"):
-                for handler in kwargs["handlers"]:
-                    self.logger.addHandler(handler)
-            
-            if not self.optimized_object._inner_optimizer and \
-               hasattr(self.optimized_object.solver, "set_working_dir"):
-                self._set_up_logging_for_solver()
-            
+            self._start_run(**kwargs)
             return self.optimize(**kwargs)
         finally:
-            self.logger.info("LOG FINISH")
-            if self.filehandler:
-                self.filehandler.close()
-            self.optimized_object.solver.free_up_log_file()
+            self._finish_run()
+
+    async def run_optimization_async(self, **kwargs) -> OptimizationTaskResults:
+        """run_optimization для AsyncioExecutor"""
+        try:
+            self._start_run(**kwargs)
+            return await self.optimize_async(**kwargs)
+        finally:
+            self._finish_run()
 
     @abstractmethod
     def optimize(self, **kwargs) -> OptimizationTaskResults:
         pass
 
+    async def optimize_async(self, **kwargs) -> OptimizationTaskResults:
+        """
+        Асинхронная оптимизация; по умолчанию - синхронный optimize в потоке.
+        Переопределяется там, где расчеты можно ждать через solver.solve_async.
+        """
+        return await asyncio.to_thread(self.optimize, **kwargs)
+
     def _create_handlers(self):
         handlers = []
         formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -0,0 +1,165 @@
+"""
+Пакетная байесовская оптимизация: гауссовские процессы для objective и
+ограничений, на каждом раунде q точек (constant liar) считаются параллельно
+через executor
+"""
+import json
+import time
+
+import numpy as np
+from scipy.optimize import minimize
+from scipy.stats import norm
+
+from optimization_tools.batch_evaluation import BatchEvaluator, DesignArchive
+from optimization_tools.config import OptimizationConfig
+from optimization_tools.opt_conditions import OptimizationTaskResults
+from optimization_tools.optimizers.abstract_optimizer import AbstractOPtimizer
+from optimization_tools.optimizers.gradient_optimizer import OptimizationTaskWithNormalization
+from optimization_tools.sampling import draw_unit_samples
+from optimization_tools.surrogates import GaussianProcess
+
+
+class BayesianOptimizer(AbstractOPtimizer):
+    """
+    Байесовская оптимизация с критерием expected improvement, умноженным на
+    вероятность выполнения всех ограничений (для каждого ограничения OptConditions
+    строится свой гауссовский процесс по запасу в смысле ConstraintForNormalized).
+    Пока допустимых точек нет, максимизируется только вероятность допустимости.
+    batch_size (по умолчанию config.num_proc) точек раунда выбираются по очереди:
+    после каждой выбранной точки в выборку добавляется "ложное" значение
+    (constant liar - текущий рекорд objective, прогноз для ограничений) без
+    переобучения гиперпараметров.
+    Начальный план - точки из кэша солвера плюс выборка sampling до
+    initial_samples точек (по умолчанию 2*d + 1). Не более config.max_iter раундов
+    и max_solves реальных расчетов.
+    """
+    def __init__(self, optimized_object: OptimizationTaskWithNormalization, config: OptimizationConfig,
+                 batch_size: int = None, initial_samples: int = None, max_solves: int = None,
+                 sampling: str = "sobol", candidates_per_dim: int = 500, seed: int = None):
+        super().__init__(optimized_object, config)
+        self.batch_size = batch_size
+        self.initial_samples = initial_samples
+        self.max_solves = max_solves
+        self.sampling = sampling
+        self.candidates_per_dim = candidates_per_dim
+        self.seed = seed
+        self.executor = None
+
+    def set_executor(self, executor) -> None:
+        self.executor = executor
+
+    @staticmethod
+    def _acquisition(models: dict, x: np.ndarray, incumbent: float | None) -> np.ndarray:
+        probability = np.ones(len(np.atleast_2d(x)))
+        for name, model in models.items():
+            if name == "objective":
+                continue
+            mean, std = model.predict(x)
+            probability *= norm.cdf(mean / std)
+        if incumbent is None:
+            return probability
+        mean, std = models["objective"].predict(x)
+        z = (incumbent - mean) / std
+        return ((incumbent - mean) * norm.cdf(z) + std * norm.pdf(z)) * probability
+
+    def _fit(self, models: dict, x: np.ndarray, objectives: np.ndarray, margins: np.ndarray,
+             optimize: bool) -> None:
+        models["objective"].fit(x, objectives, optimize=optimize)
+        for j in range(margins.shape[1]):
+            models[f"g{j}"].fit(x, margins[:, j], optimize=optimize)
+
+    def _propose(self, archive: DesignArchive, models: dict, lower: np.ndarray, upper: np.ndarray,
+                 count: int, seed: int | None) -> list[np.ndarray]:
+        x = archive.x
+        objectives = archive.objectives
+        margins = archive.margins
+        feasible = archive.feasible
+        incumbent = float(objectives[feasible].min()) if feasible.any() else None
+        self._fit(models, x, objectives, margins, optimize=True)
+
+        d = len(lower)
+        unit = draw_unit_samples(self.sampling, self.candidates_per_dim * d, d, seed)
+        candidates = lower + unit * (upper - lower)
+        span = upper - lower
+        proposed: list[np.ndarray] = []
+        for _ in range(count):
+            acquisition = self._acquisition(models, candidates, incumbent)
+            order = np.argsort(-acquisition)
+            start = candidates[order[0]]
+            polished = minimize(lambda point: -self._acquisition(models, point, incumbent)[0], start,
+                                method="L-BFGS-B", bounds=list(zip(lower, upper)))
+            choice = None
+            for point in [np.clip(polished.x, lower, upper)] + [candidates[k] for k in order[:50]]:
+                distances = np.linalg.norm((np.vstack([x] + proposed) - point) / span, axis=1)
+                if distances.min() > 1e-6:
+                    choice = point
+                    break
+            if choice is None:
+                break
+            proposed.append(np.asarray(choice, dtype=float))
+            # Constant liar: рекорд для objective, прогноз для ограничений
+            lie = incumbent if incumbent is not None else float(objectives.min())
+            lie_margins = np.array([[models[f"g{j}"].predict(choice)[0][0] for j in range(margins.shape[1])]])
+            x = np.vstack([x, choice])
+            objectives = np.append(objectives, lie)
+            margins = np.vstack([margins, lie_margins.reshape(1, margins.shape[1])])
+            self._fit(models, x, objectives, margins, optimize=False)
+        return proposed
+
+    def optimize(self, **kwargs) -> OptimizationTaskResults:
+        logger = self.logger
+        time_start = time.time()
+        task = self.optimized_object
+        task.update_opt_vars()
+        task.ledger.clear()
+        evaluator = BatchEvaluator(task, self.config, self.executor)
+        lower = np.asarray(task.lower_bounds, dtype=float)
+        upper = np.asarray(task.upper_bounds, dtype=float)
+        d = len(lower)
+        batch_size = self.batch_size or max(1, self.config.num_proc)
+
+        archive = DesignArchive(evaluator)
+        cached = evaluator.cached_designs(lower, upper)
+        archive.add([point for point, _ in cached], [results for _, results in cached])
+        logger.info(f"Bayesian optimizer: {len(archive)} cached designs reused")
+        n_initial = self.initial_samples or 2 * d + 1
+        if len(archive) < n_initial:
+            initial = [np.asarray(task.get_x(), dtype=float)]
+            n_new = n_initial - len(archive) - 1
+            if n_new > 0:
+                initial += [lower + row * (upper - lower) for row in draw_unit_samples(self.sampling, n_new, d, self.seed)]
+            archive.evaluate([point for point in initial if not archive.contains(point)])
+        if len(archive) == 0:
+            logger.error("Bayesian optimizer: no initial design was solved successfully")
+            return OptimizationTaskResults(1, 1, None, None, None, task.model)
+
+        models = {"objective": GaussianProcess(lower, upper, seed=self.seed)}
+        for j in range(len(task.opt_conditions.constraints)):
+            models[f"g{j}"] = GaussianProcess(lower, upper, seed=self.seed)
+
+        rounds = 0
+        while rounds < self.config.max_iter:
+            count = batch_size if self.max_solves is None else min(batch_size, self.max_solves - evaluator.solves)
+            if count <= 0:
+                break
+            seed = None if self.seed is None else self.seed + rounds
+            proposed = self._propose(archive, models, lower, upper, count, seed)
+            if not proposed:
+                logger.info("No new points proposed, stopping")
+                break
+            archive.evaluate(proposed)
+            rounds += 1
+            best = archive.best_index()
+            logger.info(f"Round {rounds}: {len(proposed)} points, best objective {archive.objectives[best]}, "
+                        f"feasible {bool(archive.feasible[best])}, solves {evaluator.solves}")
+
+        best = archive.best_index()
+        results = evaluator.task_results(archive.x[best], archive.results[best], metadata={"bayesian": {
+            "rounds": rounds,
+            "solves": evaluator.solves,
+            "observations": len(archive),
+        }})
+        logger.info(f"Bayesian optimization finished in {time.time() - time_start}")
+        logger.info(json.dumps(results.var_values, indent=2, default=float))
+        logger.info(f"objective = {results.objective}")
+        return results
@@ -3,16 +3,23 @@ BruteForceOptimizer - Оптимизатор тупым перебором. По
 возможность запуска вложенных оптимизаторов для перебираемых точек
 """
 import copy
+import dataclasses
 import json
 import logging
+import math
 import os
 import numpy
 import time
 
+from optimization_tools.checkpoints import BruteForceCheckpoint
 from optimization_tools.optimization_executors import ForLoopExecutor
 from optimization_tools.opt_conditions import OptimizationTaskResults
 from optimization_tools.optimization_executors import AbstractExecutor
 from optimization_tools.optimizers.abstract_optimizer import AbstractOPtimizer
+from optimization_tools.optimizers.null_optimizer import NullOptimizer
+from optimization_tools.pruning import OBJECTIVE, BoxPruner
+from optimization_tools.surrogates import RBFSurrogate, maximin_subset
+from optimization_tools.sampling import SAMPLING_METHODS, draw_unit_samples, scale_unit_samples
 from optimization_tools.utils import iterate, constraints_are_satisfied
 from optimization_tools.simple_optimization_task import OptimizationTaskWithInnerOptimizer
 from optimization_tools.mapping_utils import ParameterMapper  # Новый импорт
@@ -27,19 +34,71 @@ class BruteForceOptimizer(AbstractOPtimizer):
     непрерывным отрезком
     executor - механизм запуска расчета отдельных точек. По умолчанию - просто цикл, 
     можно запускать с распараллеливанием на одной машине или на кластере.
+    checkpoint - сохранять результат каждой точки в ее папку point_{code} сразу по готовности
+    resume - восстановить сохраненные результаты и рассчитывать только оставшиеся точки
+    sampling - вместо полной сетки взять n_samples квазислучайных точек (sobol, halton,
+    lhs, random), sampling_seed - зерно генератора. Перебираются дискретные переменные
+    и переменные из seed_map (если seed_map пуст - все переменные); вложенный оптимизатор
+    получает окрестность точки размером с ячейку эквивалентной сетки
+    halving_eta - режим successive halving для вложенных оптимизаторов: все точки
+    считаются с бюджетом halving_min_iter итераций, в следующий раунд проходит лучшая
+    1/halving_eta часть (допустимые, затем по objective) с продолжением из достигнутой
+    точки и бюджетом в halving_eta раз больше; финальный раунд - полный config.max_iter.
+    Чекпоинты и resume относятся к финальному раунду
+    monotonicity, objective_lower_bound - отсечение точек (см. pruning.BoxPruner):
+    знаки влияния переменных на objective и ограничения и/или нижняя оценка objective
+    на области точки. Точки считаются волнами по prune_wave_size (по умолчанию
+    config.num_proc), перед каждой волной отбрасываются точки, которые не могут
+    улучшить текущий рекорд или стать допустимыми
+    screening_initial - предварительный отбор по суррогату: сначала считаются
+    screening_initial равномерно разнесенных точек, по ним строится RBF-модель objective
+    и ограничений, далее полным солвером считаются партиями по screening_batch
+    (по умолчанию config.num_proc) только точки, предсказанные допустимыми и не хуже
+    рекорда с запасом screening_margin (в долях разброса наблюденных значений);
+    модель уточняется после каждой партии
 
     Методы:
     set_executor(self, executor)
 
     optimize(self, **kwargs) - оптимизация
     """
-    def __init__(self, optimized_object: OptimizationTaskWithInnerOptimizer, discreteness, config, seed_map: list = []):
+    def __init__(self, optimized_object: OptimizationTaskWithInnerOptimizer, discreteness, config, seed_map: list = [],
+                 checkpoint: bool = False, resume: bool = False,
+                 sampling: str = None, n_samples: int = None, sampling_seed: int = None,
+                 halving_eta: int = None, halving_min_iter: int = 2,
+                 monotonicity: dict = None, objective_lower_bound=None, prune_wave_size: int = None,
+                 screening_initial: int = None, screening_batch: int = None, screening_margin: float = 0.1):
         super().__init__(optimized_object, config=config)
         self.discreteness = discreteness
         self.seed_map: dict = seed_map
         self.executor = ForLoopExecutor(config)
         self.all_points = None
         self.param_mapper = None  # Будет инициализирован в optimize
+        self.checkpoint = checkpoint
+        self.resume = resume
+        if sampling is not None and sampling not in SAMPLING_METHODS:
+            raise ValueError(f"Unknown sampling method {sampling!r}, expected one of {SAMPLING_METHODS}")
+        if sampling is not None and not n_samples:
+            raise ValueError("n_samples must be set for the sampling mode")
+        self.sampling = sampling
+        self.n_samples = n_samples
+        self.sampling_seed = sampling_seed
+        if halving_eta is not None and halving_eta < 2:
+            raise ValueError("halving_eta must be at least 2")
+        self.halving_eta = halving_eta
+        self.halving_min_iter = halving_min_iter
+        self.halving_rungs: list[dict] = []
+        if sum([halving_eta is not None, bool(monotonicity or objective_lower_bound),
+                screening_initial is not None]) > 1:
+            raise ValueError("Successive halving, branch-and-bound pruning and surrogate screening can not be combined")
+        self.monotonicity = monotonicity
+        self.objective_lower_bound = objective_lower_bound
+        self.prune_wave_size = prune_wave_size
+        self.pruning_stats: dict = {}
+        self.screening_initial = screening_initial
+        self.screening_batch = screening_batch
+        self.screening_margin = screening_margin
+        self.screening_stats: dict = {}
 
     def set_executor(self, executor) -> None:
         self.executor: AbstractExecutor = executor
@@ -60,6 +119,265 @@ class BruteForceOptimizer(AbstractOPtimizer):
             params_dict[component_name] = round(point[j], 6)  # Округляем для согласованности
         return params_dict
 
+    def _sample_points(self) -> tuple[list[list], list[list[list[float]]]]:
+        """
+        Точки и границы вложенной оптимизации для режима sampling.
+        Неперебираемые непрерывные переменные берутся из модели с полными границами.
+        """
+        vars_ranges = self.optimized_object.opt_conditions.vars
+        var_names = list(self.optimized_object.conversion_map.values())
+        sampled = [name for name in var_names
+                   if isinstance(vars_ranges[name], list) or not self.seed_map or name in self.seed_map]
+        unit = draw_unit_samples(self.sampling, self.n_samples, len(sampled), self.sampling_seed)
+        samples = scale_unit_samples(unit, sampled, vars_ranges)
+        # Полуширина ячейки сетки с тем же числом точек
+        half_cell = 0.5 / self.n_samples ** (1 / max(len(sampled), 1))
+
+        all_points, all_bounds = [], []
+        for sample in samples:
+            values = dict(zip(sampled, sample))
+            point, bounds = [], []
+            for name in var_names:
+                var_range = vars_ranges[name]
+                if name in values and isinstance(var_range, list):
+                    point.append(values[name])
+                    bounds.append([values[name], values[name]])
+                elif name in values:
+                    half_width = half_cell * (var_range["max"] - var_range["min"])
+                    point.append(values[name])
+                    bounds.append([max(var_range["min"], values[name] - half_width),
+                                   min(var_range["max"], values[name] + half_width)])
+                else:
+                    point.append(getattr(self.optimized_object.model, name))
+                    bounds.append([var_range["min"], var_range["max"]])
+            all_points.append(point)
+            all_bounds.append(bounds)
+        return all_points, all_bounds
+
+    def _log_failures(self, optimizers: list[AbstractOPtimizer], logger: logging.Logger) -> None:
+        for failure in getattr(self.executor, "failures", []):
+            failed_code = optimizers[failure.task_index].optimized_object.unique_id
+            logger.warning(f"Point {failed_code} failed after {failure.attempts} attempt(s): {failure.error}")
+
+    @staticmethod
+    def _set_iteration_budget(optimizer: AbstractOPtimizer, max_iter: int) -> None:
+        if getattr(optimizer, "config", None) is not None:
+            optimizer.config = dataclasses.replace(optimizer.config, max_iter=max_iter)
+        # Исполнители процессов заменяют config на свой config_dict - бюджет
+        # раунда передается поверх него (см. run_single_optimization)
+        optimizer.config_overrides = {**(getattr(optimizer, "config_overrides", None) or {}),
+                                      "max_iter": max_iter}
+
+    def _halving_rank(self, result: OptimizationTaskResults) -> tuple:
+        """Ключ сортировки: сначала допустимые точки, затем по objective"""
+        if result is None or result.objective is None:
+            return (2, math.inf)
+        feasible = constraints_are_satisfied(result.constr_values, self.optimized_object.opt_conditions.constraints)
+        return (0 if feasible else 1, result.objective)
+
+    def _successive_halving(self, inner_optimizers: list[AbstractOPtimizer], point_codes: list[int],
+                            sweep_dir: str, logger: logging.Logger) -> list[OptimizationTaskResults]:
+        """
+        Раунды с растущим бюджетом итераций для все меньшего числа точек.
+        Выбывшие точки сохраняют результат последнего раунда.
+        """
+        results: list[OptimizationTaskResults] = [None] * len(inner_optimizers)
+        full_budget = max(getattr(getattr(optimizer, "config", None), "max_iter", 0) or 0
+                          for optimizer in inner_optimizers) if inner_optimizers else 0
+        alive = list(range(len(inner_optimizers)))
+        budget = self.halving_min_iter
+        rungs = []
+        while budget < full_budget and len(alive) > 1:
+            rung_optimizers = [inner_optimizers[i] for i in alive]
+            for optimizer in rung_optimizers:
+                self._set_iteration_budget(optimizer, budget)
+            rung_results = self.executor(rung_optimizers)
+            self._log_failures(rung_optimizers, logger)
+            for i, result in zip(alive, rung_results):
+                results[i] = result
+                if result is not None and result.model is not None:
+                    # Следующий раунд продолжает из достигнутой точки
+                    inner_optimizers[i].optimized_object.model = copy.deepcopy(result.model)
+                    if hasattr(inner_optimizers[i], "first_approx_function"):
+                        inner_optimizers[i].first_approx_function = None
+            ranked = sorted(alive, key=lambda i: self._halving_rank(results[i]))
+            survivors = ranked[:max(1, math.ceil(len(alive) / self.halving_eta))]
+            rungs.append({"max_iter": budget, "points": len(alive), "survivors": len(survivors)})
+            logger.info(f"Successive halving: {len(alive)} points with max_iter={budget}, "
+                        f"{len(survivors)} continue")
+            alive = sorted(survivors)
+            budget *= self.halving_eta
+
+        for i in alive:
+            self._set_iteration_budget(inner_optimizers[i], full_budget)
+        final_results = self._dispatch([inner_optimizers[i] for i in alive], [point_codes[i] for i in alive],
+                                       sweep_dir, logger)
+        rungs.append({"max_iter": full_budget, "points": len(alive), "survivors": len(alive)})
+        for i, result in zip(alive, final_results):
+            results[i] = result
+        self.halving_rungs = rungs
+        return results
+
+    def _pruning_order(self, boxes: list[tuple[dict, dict]]) -> list[int]:
+        """
+        Порядок расчета точек: сначала самые перспективные по нижней оценке
+        или по положению наилучшего угла области для монотонного objective
+        """
+        if self.objective_lower_bound is not None:
+            return sorted(range(len(boxes)), key=lambda i: self.objective_lower_bound(*boxes[i]))
+        signs = (self.monotonicity or {}).get(OBJECTIVE) or {}
+        spans = {}
+        for name in signs:
+            values = [box[0][name] for box in boxes] + [box[1][name] for box in boxes]
+            spans[name] = (max(values) - min(values)) or 1.0
+
+        def favourable_corner(i):
+            lower, upper = boxes[i]
+            return sum(sign * (lower[name] if sign > 0 else upper[name]) / spans[name]
+                       for name, sign in signs.items() if name in lower)
+
+        return sorted(range(len(boxes)), key=favourable_corner)
+
+    def _dispatch_with_pruning(self, inner_optimizers: list[AbstractOPtimizer], point_codes: list[int],
+                               boxes: list[tuple[dict, dict]], designs: list[dict],
+                               sweep_dir: str, logger: logging.Logger) -> list[OptimizationTaskResults]:
+        """Расчет волнами с отсечением точек перед каждой волной"""
+        pruner = BoxPruner(self.optimized_object.opt_conditions.constraints,
+                           self.monotonicity, self.objective_lower_bound)
+        results: list[OptimizationTaskResults] = [None] * len(inner_optimizers)
+        order = self._pruning_order(boxes)
+        wave_size = self.prune_wave_size or max(1, self.config.num_proc)
+        stats = {"evaluated": 0}
+        position = 0
+        while position < len(order):
+            wave = []
+            while position < len(order) and len(wave) < wave_size:
+                i = order[position]
+                position += 1
+                reason = pruner.prune_reason(*boxes[i])
+                if reason is None:
+                    wave.append(i)
+                else:
+                    stats[reason] = stats.get(reason, 0) + 1
+                    logger.debug(f"Point {point_codes[i]} pruned: {reason}")
+            if not wave:
+                continue
+            wave_results = self._dispatch([inner_optimizers[i] for i in wave], [point_codes[i] for i in wave],
+                                          sweep_dir, logger)
+            stats["evaluated"] += len(wave)
+            for i, result in zip(wave, wave_results):
+                results[i] = result
+                if result is not None:
+                    design = dict(designs[i])
+                    design.update(result.var_values or {})
+                    pruner.add_result(design, result.constr_values, result.objective)
+        pruned = {key: value for key, value in stats.items() if key != "evaluated"}
+        logger.info(f"Branch-and-bound: {stats['evaluated']} of {len(order)} points evaluated, pruned: {pruned}")
+        self.pruning_stats = stats
+        return results
+
+    def _screening_candidates(self, surrogate: RBFSurrogate, coordinates: numpy.ndarray,
+                              pending: list[int], incumbent: float | None) -> list[int]:
+        """Точки, прошедшие отбор по суррогату, от лучших к худшим"""
+        limits = self.optimized_object.opt_conditions.constraints
+        predicted = surrogate.predict(coordinates[pending])
+        passed = numpy.ones(len(pending), dtype=bool)
+        for name, limit in limits.items():
+            if name in predicted:
+                passed &= predicted[name] >= limit - self.screening_margin * surrogate.scale[name]
+        if incumbent is not None:
+            passed &= predicted["objective"] <= incumbent + self.screening_margin * surrogate.scale["objective"]
+        order = numpy.argsort(predicted["objective"])
+        return [pending[k] for k in order if passed[k]]
+
+    def _dispatch_with_screening(self, inner_optimizers: list[AbstractOPtimizer], point_codes: list[int],
+                                 designs: list[dict], sweep_dir: str,
+                                 logger: logging.Logger) -> list[OptimizationTaskResults]:
+        """Начальный план, затем партии точек, отобранных по суррогату"""
+        limits = self.optimized_object.opt_conditions.constraints
+        var_names = list(self.optimized_object.conversion_map.values())
+        coordinates = numpy.array([[design[name] for name in var_names] for design in designs], dtype=float)
+        surrogate = RBFSurrogate(coordinates.min(axis=0), coordinates.max(axis=0))
+        results: list[OptimizationTaskResults] = [None] * len(inner_optimizers)
+        evaluated: list[int] = []
+        incumbent = None
+
+        def run(indices):
+            nonlocal incumbent
+            batch_results = self._dispatch([inner_optimizers[i] for i in indices], [point_codes[i] for i in indices],
+                                           sweep_dir, logger)
+            for i, result in zip(indices, batch_results):
+                results[i] = result
+                if result is None or result.objective is None or result.constr_values is None:
+                    continue
+                evaluated.append(i)
+                if constraints_are_satisfied(result.constr_values, limits) and (
+                        incumbent is None or result.objective < incumbent):
+                    incumbent = result.objective
+
+        doe = maximin_subset(coordinates, self.screening_initial)
+        run(doe)
+        doe_set = set(doe)
+        pending = [i for i in range(len(inner_optimizers)) if i not in doe_set]
+        batch_size = self.screening_batch or max(1, self.config.num_proc)
+        while pending:
+            outputs = {"objective": [results[i].objective for i in evaluated]}
+            for name in limits:
+                outputs[name] = [results[i].constr_values.get(name, numpy.nan) for i in evaluated]
+            outputs = {name: values for name, values in outputs.items() if not numpy.isnan(values).any()}
+            try:
+                surrogate.fit(coordinates[evaluated], outputs)
+                candidates = self._screening_candidates(surrogate, coordinates, pending, incumbent)
+            except (ValueError, numpy.linalg.LinAlgError) as e:
+                logger.warning(f"Surrogate fit failed ({e}), evaluating the remaining points directly")
+                candidates = list(pending)
+            if not candidates:
+                break
+            batch = candidates[:batch_size]
+            run(batch)
+            batch_set = set(batch)
+            pending = [i for i in pending if i not in batch_set]
+
+        self.screening_stats = {"doe": len(doe), "evaluated": len(inner_optimizers) - len(pending),
+                                "screened_out": len(pending)}
+        logger.info(f"Surrogate screening: {self.screening_stats['evaluated']} of {len(inner_optimizers)} points "
+                    f"evaluated with the full solver")
+        return results
+
+    def _dispatch(self, inner_optimizers: list[AbstractOPtimizer], point_codes: list[int],
+                  sweep_dir: str, logger: logging.Logger) -> list[OptimizationTaskResults]:
+        """
+        Запуск расчета точек через executor с учетом чекпоинтов.
+        Возвращает результаты в порядке inner_optimizers (None - точка не рассчитана).
+        """
+        results: list[OptimizationTaskResults] = [None] * len(inner_optimizers)
+        checkpoint = None
+        if self.checkpoint or self.resume:
+            checkpoint = BruteForceCheckpoint(sweep_dir)
+
+        if self.resume:
+            for i, point_code in enumerate(point_codes):
+                results[i] = checkpoint.load(point_code)
+        pending = [i for i, result in enumerate(results) if result is None]
+        if self.resume:
+            logger.info(f"Resume: {len(results) - len(pending)} of {len(results)} points restored from checkpoint")
+
+        pending_optimizers = [inner_optimizers[i] for i in pending]
+        if self.checkpoint:
+            def save_point_result(pending_index, result):
+                if result is not None:
+                    checkpoint.save(point_codes[pending[pending_index]], result)
+
+            pending_results = self.executor(pending_optimizers, on_result=save_point_result)
+        else:
+            pending_results = self.executor(pending_optimizers)
+
+        self._log_failures(pending_optimizers, logger)
+
+        for i, result in zip(pending, pending_results):
+            results[i] = result
+        return results
+
     def optimize(self, **kwargs) -> OptimizationTaskResults:
         logger = self.logger
         all_vars_ranges = []
@@ -86,48 +404,52 @@ class BruteForceOptimizer(AbstractOPtimizer):
 
         # Составляем списки значений переменных
         bounds_for_gradient = []
-        for key, opt_var_name in self.optimized_object.conversion_map.items():
-            var_constraints = self.optimized_object.opt_conditions.vars[self.optimized_object.conversion_map[key]]
-            if isinstance(var_constraints, list):
-                all_vars_ranges.append(var_constraints)
-            else:
-                min_val = var_constraints["min"]
-                max_val = var_constraints["max"]
-                if self.seed_map is None:
-                    some_var_values = list(numpy.linspace(min_val, max_val, self.discreteness))
+        # В режиме sampling точки и границы строятся в _sample_points
+        if self.sampling is None:
+            for key, opt_var_name in self.optimized_object.conversion_map.items():
+                var_constraints = self.optimized_object.opt_conditions.vars[self.optimized_object.conversion_map[key]]
+                if isinstance(var_constraints, list):
+                    all_vars_ranges.append(var_constraints)
                 else:
-                    if opt_var_name in self.seed_map.keys():
-                        some_var_values = list(numpy.linspace(min_val, max_val, self.seed_map[opt_var_name] + 1))
-                if opt_var_name not in self.seed_map.keys():
-                    bounds_for_gradient.append([(min_val, max_val)])
-                    all_vars_ranges.append([getattr(self.optimized_object.model, opt_var_name)])
-                else:
-                    overlap_ratio = 0.5
-                    some_var_bounds = []
-                    if len(some_var_values) > 1:
-                        n = len(some_var_values)
-                        step = some_var_values[1] - some_var_values[0]
-                        overlap = step * overlap_ratio
+                    min_val = var_constraints["min"]
+                    max_val = var_constraints["max"]
+                    if self.seed_map is None:
+                        some_var_values = list(numpy.linspace(min_val, max_val, self.discreteness))
+                    else:
+                        if opt_var_name in self.seed_map.keys():
+                            some_var_values = list(numpy.linspace(min_val, max_val, self.seed_map[opt_var_name] + 1))
+                    if opt_var_name not in self.seed_map.keys():
+                        bounds_for_gradient.append([(min_val, max_val)])
+                        all_vars_ranges.append([getattr(self.optimized_object.model, opt_var_name)])
+                    else:
+                        overlap_ratio = 0.5
+                        some_var_bounds = []
+                        if len(some_var_values) > 1:
+                            n = len(some_var_values)
+                            step = some_var_values[1] - some_var_values[0]
+                            overlap = step * overlap_ratio
                         
-                        for i in range(n - 1):
-                            start = some_var_values[i] - overlap
-                            end = some_var_values[i + 1] + overlap
+                            for i in range(n - 1):
+                                start = some_var_values[i] - overlap
+                                end = some_var_values[i + 1] + overlap
                             
-                            if i == 0 or start < some_var_values[i]:
-                                start = some_var_values[i]
-                            if i == n - 2 or end > some_var_values[-1]:
-                                end = some_var_values[-1]
+                                if i == 0 or start < some_var_values[i]:
+                                    start = some_var_values[i]
+                                if i == n - 2 or end > some_var_values[-1]:
+                                    end = some_var_values[-1]
                             
-                            some_var_bounds.append([start, end])
-                    else:
-                        some_var_bounds = [[some_var_values[0], some_var_values[0]]]
+                                some_var_bounds.append([start, end])
+                        else:
+                            some_var_bounds = [[some_var_values[0], some_var_values[0]]]
                     
-                    all_vars_ranges.append(numpy.linspace(min_val, max_val, len(some_var_bounds)))
-                    bounds_for_gradient.append(some_var_bounds)
+                        all_vars_ranges.append(numpy.linspace(min_val, max_val, len(some_var_bounds)))
+                        bounds_for_gradient.append(some_var_bounds)
 
         # создаем набор точек параметров all_points
         if self.all_points is not None:
             all_points = self.all_points
+        elif self.sampling is not None:
+            all_points, all_bounds = self._sample_points()
         else:
             all_points = []
             all_bounds = []
@@ -143,6 +465,10 @@ class BruteForceOptimizer(AbstractOPtimizer):
         
         # Словарь для хранения соответствия кода и параметров (для логирования)
         code_to_point_info = {}
+        point_codes: list[int] = []
+        # Области точек (нижние и верхние значения переменных) для отсечения
+        point_boxes: list[tuple[dict, dict]] = []
+        point_designs: list[dict] = []
         
         for i, optimizer in enumerate(inner_optimizers_copies):
             if hasattr(optimizer, "executor"):
@@ -151,7 +477,7 @@ class BruteForceOptimizer(AbstractOPtimizer):
             for j, opt_var in enumerate(optimizer.optimized_object.opt_conditions.vars.keys()):
                 if opt_var in self.optimized_object.opt_conditions.vars:
                     new_bounds_for_this_var = all_bounds[i][j]
-                    if opt_var in self.seed_map.keys():
+                    if self.sampling is None and opt_var in self.seed_map.keys():
                         all_points[i][j] = (all_bounds[i][j][0] + all_bounds[i][j][1]) / 2
                     optimizer.optimized_object.opt_conditions.vars[opt_var] = {
                         "min": new_bounds_for_this_var[0], 
@@ -161,6 +487,16 @@ class BruteForceOptimizer(AbstractOPtimizer):
             inner_model = copy.deepcopy(self.optimized_object.model)
             self.optimized_object.x_to_model(inner_model, all_points[i], self.optimized_object.conversion_map)
             optimizer.optimized_object.model = inner_model
+
+            design = {name: all_points[i][j] for j, name in enumerate(self.optimized_object.conversion_map.values())}
+            inner_vars = optimizer.optimized_object.opt_conditions.vars
+            lower, upper = dict(design), dict(design)
+            if not isinstance(optimizer, NullOptimizer):
+                for name in design:
+                    if isinstance(inner_vars.get(name), dict):
+                        lower[name], upper[name] = inner_vars[name]["min"], inner_vars[name]["max"]
+            point_boxes.append((lower, upper))
+            point_designs.append(design)
             
             # Получаем словарь параметров для текущей точки
             params_dict = self._get_params_dict_from_point(all_points[i])
@@ -168,6 +504,7 @@ class BruteForceOptimizer(AbstractOPtimizer):
             # Получаем код для этих параметров
             point_code = self.param_mapper.get_or_create_code(params_dict)
             code_to_point_info[point_code] = params_dict
+            point_codes.append(point_code)
             
             # Используем код как имя папки
             optimizer.optimized_object.optimization_dir = self.optimized_object.optimization_dir
@@ -190,7 +527,16 @@ class BruteForceOptimizer(AbstractOPtimizer):
         logger.info("=" * 60)
         
         # Запускаем вычисления
-        another_type_results = self.executor(inner_optimizers_copies)
+        if self.halving_eta is not None:
+            another_type_results = self._successive_halving(inner_optimizers_copies, point_codes, this_log_dir, logger)
+        elif self.screening_initial is not None:
+            another_type_results = self._dispatch_with_screening(inner_optimizers_copies, point_codes, point_designs,
+                                                                 this_log_dir, logger)
+        elif self.monotonicity or self.objective_lower_bound is not None:
+            another_type_results = self._dispatch_with_pruning(inner_optimizers_copies, point_codes, point_boxes,
+                                                               point_designs, this_log_dir, logger)
+        else:
+            another_type_results = self._dispatch(inner_optimizers_copies, point_codes, this_log_dir, logger)
 
         # Анализируем результаты
         constraints_satisfied_points: list[tuple[int, OptimizationTaskResults]] = []
@@ -244,5 +590,11 @@ class BruteForceOptimizer(AbstractOPtimizer):
         logger.info("Margin values:")
         logger.info(json.dumps(min_objective_point.constr_values, indent=2))
         logger.info(f"objective = {str(min_objective_point.objective)}")
-        
+        if self.halving_eta is not None:
+            min_objective_point.metadata["successive_halving"] = self.halving_rungs
+        if self.pruning_stats:
+            min_objective_point.metadata["pruning"] = self.pruning_stats
+        if self.screening_stats:
+            min_objective_point.metadata["screening"] = self.screening_stats
+
         return min_objective_point
\ No newline at end of file
@@ -0,0 +1,137 @@
+"""
+CMA-ES в нормализованном пространстве OptimizationTaskWithNormalization,
+поколение считается одной партией через executor
+"""
+import json
+import time
+
+import numpy as np
+
+from optimization_tools.batch_evaluation import BatchEvaluator
+from optimization_tools.config import OptimizationConfig
+from optimization_tools.opt_conditions import OptimizationTaskResults
+from optimization_tools.optimizers.abstract_optimizer import AbstractOPtimizer
+from optimization_tools.optimizers.gradient_optimizer import OptimizationTaskWithNormalization
+
+
+class CMAESOptimizer(AbstractOPtimizer):
+    """
+    Эволюционная стратегия с адаптацией ковариационной матрицы (CMA-ES, (mu/mu_w, lambda)).
+    Работает с теми же нормализованными переменными, что и SLSQP в GradientOptimizer:
+    objective, деленный на cost_function_normalization, и запасы ограничений в виде
+    ConstraintForNormalized (допустимо при значении >= 0). Точки сравниваются по
+    правилу допустимости: допустимые по objective, затем недопустимые по сумме нарушений;
+    кандидаты с неудавшимся расчетом - худшие.
+    Выходящие за границы кандидаты проецируются на границы.
+    popsize - размер поколения (по умолчанию 4 + 3 ln d), sigma0 - начальный шаг
+    в долях среднего диапазона нормализованных переменных. Остановка после
+    config.max_iter поколений, max_solves расчетов или при шаге меньше tol_x.
+    """
+    def __init__(self, optimized_object: OptimizationTaskWithNormalization, config: OptimizationConfig,
+                 popsize: int = None, sigma0: float = 0.3, tol_x: float = 1e-6, max_solves: int = None,
+                 seed: int = None):
+        super().__init__(optimized_object, config)
+        self.popsize = popsize
+        self.sigma0 = sigma0
+        self.tol_x = tol_x
+        self.max_solves = max_solves
+        self.seed = seed
+        self.executor = None
+
+    def set_executor(self, executor) -> None:
+        self.executor = executor
+
+    def _fitness(self, evaluator: BatchEvaluator, results: dict | None) -> tuple[float, float]:
+        """(нарушение ограничений, нормализованный objective); неудачный расчет - (inf, inf)"""
+        if results is None:
+            return np.inf, np.inf
+        violation = float(np.clip(-evaluator.constraint_margins(results), 0, None).sum())
+        return violation, float(results["objective"]) / self.optimized_object.cost_function_normalization
+
+    def optimize(self, **kwargs) -> OptimizationTaskResults:
+        logger = self.logger
+        time_start = time.time()
+        task = self.optimized_object
+        task.update_opt_vars()
+        task.ledger.clear()
+        evaluator = BatchEvaluator(task, self.config, self.executor)
+        norm = np.asarray(task.normalization_coefficients, dtype=float)
+        denorm = np.asarray(task.denorm_coefficients, dtype=float)
+        lower = np.asarray(task.lower_bounds, dtype=float) * norm
+        upper = np.asarray(task.upper_bounds, dtype=float) * norm
+        rng = np.random.default_rng(self.seed)
+
+        initial_results = evaluator.evaluate([np.asarray(task.get_x(), dtype=float)])[0]
+        objective0 = initial_results["objective"] if initial_results else 0
+        task.cost_function_normalization = objective0 if objective0 != 0 else 1
+
+        # Параметры стратегии по умолчанию (Hansen, The CMA Evolution Strategy: A Tutorial)
+        n = len(lower)
+        lam = self.popsize or 4 + int(3 * np.log(n))
+        mu = lam // 2
+        weights = np.log(mu + 0.5) - np.log(np.arange(1, mu + 1))
+        weights /= weights.sum()
+        mueff = 1.0 / np.sum(weights ** 2)
+        cc = (4 + mueff / n) / (n + 4 + 2 * mueff / n)
+        cs = (mueff + 2) / (n + mueff + 5)
+        c1 = 2 / ((n + 1.3) ** 2 + mueff)
+        cmu = min(1 - c1, 2 * (mueff - 2 + 1 / mueff) / ((n + 2) ** 2 + mueff))
+        damps = 1 + 2 * max(0.0, np.sqrt((mueff - 1) / (n + 1)) - 1) + cs
+        chi_n = np.sqrt(n) * (1 - 1 / (4 * n) + 1 / (21 * n ** 2))
+
+        mean = np.clip(np.asarray(task.get_x(), dtype=float) * norm, lower, upper)
+        sigma = self.sigma0 * float(np.mean(upper - lower))
+        cov = np.eye(n)
+        p_sigma = np.zeros(n)
+        p_c = np.zeros(n)
+        eigen_basis, eigen_values = np.eye(n), np.ones(n)
+
+        best_key, best_x = None, mean.copy()
+        generation = 0
+        while generation < self.config.max_iter:
+            if self.max_solves is not None and evaluator.solves >= self.max_solves:
+                break
+            z = rng.standard_normal((lam, n))
+            y = z @ (eigen_basis * np.sqrt(eigen_values)).T
+            candidates = np.clip(mean + sigma * y, lower, upper)
+            keys = [self._fitness(evaluator, results)
+                    for results in evaluator.evaluate(list(candidates * denorm))]
+            order = sorted(range(lam), key=lambda k: keys[k])
+            if best_key is None or keys[order[0]] < best_key:
+                best_key, best_x = keys[order[0]], candidates[order[0]].copy()
+
+            # Шаги после проекции на границы
+            y_selected = (candidates[order[:mu]] - mean) / sigma
+            y_w = weights @ y_selected
+            mean = mean + sigma * y_w
+            inv_sqrt = eigen_basis @ np.diag(1 / np.sqrt(eigen_values)) @ eigen_basis.T
+            p_sigma = (1 - cs) * p_sigma + np.sqrt(cs * (2 - cs) * mueff) * inv_sqrt @ y_w
+            h_sigma = np.linalg.norm(p_sigma) / np.sqrt(1 - (1 - cs) ** (2 * (generation + 1))) < (1.4 + 2 / (n + 1)) * chi_n
+            p_c = (1 - cc) * p_c + h_sigma * np.sqrt(cc * (2 - cc) * mueff) * y_w
+            rank_mu = (y_selected.T * weights) @ y_selected
+            cov = (1 - c1 - cmu) * cov + c1 * (np.outer(p_c, p_c) + (1 - h_sigma) * cc * (2 - cc) * cov) \
+                + cmu * rank_mu
+            sigma *= np.exp((cs / damps) * (np.linalg.norm(p_sigma) / chi_n - 1))
+            cov = np.triu(cov) + np.triu(cov, 1).T
+            eigen_values, eigen_basis = np.linalg.eigh(cov)
+            eigen_values = np.clip(eigen_values, 1e-20, None)
+            generation += 1
+            logger.info(f"Generation {generation}: best violation {best_key[0]}, "
+                        f"best objective {best_key[1] * task.cost_function_normalization}, sigma {sigma}")
+            if sigma * np.sqrt(eigen_values.max()) < self.tol_x:
+                break
+
+        best_point = best_x * denorm
+        best_results = evaluator.evaluate([best_point])[0]
+        if best_results is None:
+            logger.error("CMA-ES: no candidate was solved successfully")
+            return OptimizationTaskResults(1, 1, None, None, None, task.model)
+        results = evaluator.task_results(best_point, best_results, metadata={"cmaes": {
+            "generations": generation,
+            "solves": evaluator.solves,
+            "sigma": float(sigma),
+        }})
+        logger.info(f"CMA-ES finished in {time.time() - time_start}, solves {evaluator.solves}")
+        logger.info(json.dumps(results.var_values, indent=2, default=float))
+        logger.info(f"objective = {results.objective}")
+        return results
@@ -1,90 +1,139 @@
 """
-Градиентный оптимизатор на основе SLSQP
+Безградиентный оптимизатор на основе COBYLA
 """
 import copy
 import json
-import logging
 import os
-import sys
 import time
 
+import numpy as np
 from scipy.optimize import minimize, Bounds
 
-from exceptions import AllLoadsZeroException
-from optimization_tools.abstract_solver import AbstractSolver
-from optimization_tools.constraints_creators import ConstraintForNormalized
+from ..config import OptimizationConfig
+from optimization_tools.batch_evaluation import BatchEvaluator
 from optimization_tools.exceptions import SolverError
+from optimization_tools.history import OptimizationHistory
 from optimization_tools.opt_conditions import OptimizationTaskResults
-from optimization_tools.optimizers.abstract_optimizer import AbstractOPtimizer, AbstractOptimizationTask
+from optimization_tools.optimizers.abstract_optimizer import AbstractOPtimizer
 from .gradient_optimizer import OptimizationTaskWithNormalization
-
-from ..opt_tools_settings import get_max_iter
+from ..parallel_fd import clip_to_bounds
 
 
 class COBYLAOptimizer(AbstractOPtimizer):
     """
-    Градиентный оптимизатор.
+    Оптимизатор COBYLA в нормализованных переменных OptimizationTaskWithNormalization.
+    Objective и все ограничения точки берутся из одного расчета через ledger задачи.
+    Число итераций - config.max_iter, параметры rhobeg, tol, catol передаются
+    в optimize через kwargs. Если задан executor (set_executor), точки начального
+    симплекса (x0 и шаги rhobeg по каждой переменной) считаются одной партией.
     """
-    def __init__(self, optimized_object: OptimizationTaskWithNormalization, first_approx_function=None):
-        super().__init__(optimized_object=optimized_object)
+    def __init__(
+        self,
+        optimized_object: OptimizationTaskWithNormalization,
+        config: OptimizationConfig,
+        first_approx_function=None
+    ):
+        super().__init__(optimized_object, config)
         self.first_approx_function = first_approx_function
-        self.history: list[dict] = []
+        self.history = OptimizationHistory()
+        self.executor = None
+
+    def set_executor(self, executor) -> None:
+        self.executor = executor
 
     def callback(self, x):
         vars_dict = self.optimized_object.get_vars_dict(x)
         vars_list = [vars_dict[var] for var in vars_dict]
         model = copy.deepcopy(self.optimized_object.model)
         self.optimized_object.x_to_model(model=model, x=vars_list, conversion_map=self.optimized_object.conversion_map)
-        constraint_values = self.optimized_object.solver.solve(model, self.optimized_object.unique_id + "_callback", None)
-        self.history.append({"vars" : vars_dict, "constraints": constraint_values})
+        constraint_values = self.optimized_object.evaluate_model(model, self.optimized_object.unique_id + "_callback")
+        self.history.append(vars_dict, constraint_values)
+        self.optimized_object.history = self.history
 
+    @staticmethod
+    def _initial_simplex(x0_normalized: np.ndarray, rhobeg: float, bounds: Bounds) -> list[np.ndarray]:
+        """x0 и шаги rhobeg по каждой переменной (внутрь границ, как в COBYLA)"""
+        simplex = [x0_normalized.copy()]
+        for i in range(len(x0_normalized)):
+            point = x0_normalized.copy()
+            step = rhobeg if x0_normalized[i] + rhobeg <= bounds.ub[i] else -rhobeg
+            point[i] += step
+            simplex.append(clip_to_bounds(point, bounds))
+        return simplex
 
     def optimize(self, **kwargs) -> OptimizationTaskResults:
+        rhobeg = kwargs.get("rhobeg", 0.2)
+        options = {
+            'maxiter': self.config.max_iter,
+            'disp': False,
+            'rhobeg': rhobeg,
+            'tol': kwargs.get("tol", 1e-4),
+            'catol': kwargs.get("catol", 2e-4),
+        }
         try:
             self.optimized_object.update_opt_vars()
+            self.optimized_object.ledger.clear()
             logger = self.logger
-            logger.debug("Gradient optimization started")
+            logger.debug("COBYLA optimization started")
             time_start = time.time()
             if self.first_approx_function:
-                initial_results = self.optimized_object.solver.solve(self.optimized_object.model, self.optimized_object.unique_id, None)
+                initial_results = self.optimized_object.evaluate_model(self.optimized_object.model)
                 self.first_approx_function(
-            results_map=initial_results, panel=self.optimized_object.model, opt_conditions=self.optimized_object.opt_conditions, logger=self.logger)
+                    results_map=initial_results,
+                    panel=self.optimized_object.model,
+                    opt_conditions=self.optimized_object.opt_conditions,
+                    logger=self.logger
+                )
+                # Первое приближение может менять поля модели вне сигнатуры
+                self.optimized_object.ledger.clear()
 
             x0 = self.optimized_object.get_x()
-            x0_normalized = [x0[i]*self.optimized_object.normalization_coefficients[i]
-                              for i in range(len(self.optimized_object.lower_bounds))]
-
             bounds = Bounds([self.optimized_object.lower_bounds[i] *
                               self.optimized_object.normalization_coefficients[i]
-                                for i in range(len(self.optimized_object.lower_bounds))], 
+                                for i in range(len(self.optimized_object.lower_bounds))],
                         [self.optimized_object.upper_bounds[i] *
-                          self.optimized_object.normalization_coefficients[i] 
+                          self.optimized_object.normalization_coefficients[i]
                           for i in range(len(self.optimized_object.lower_bounds))])
-            initial_results = self.optimized_object.solver.solve(self.optimized_object.model, self.optimized_object.unique_id, None)
-            cost_fun_coeff = initial_results["mass"]
-            self.optimized_object.cost_function_normalization = cost_fun_coeff
+            x0_normalized = clip_to_bounds(
+                np.array(
+                    [
+                        x0[i] * self.optimized_object.normalization_coefficients[i]
+                        for i in range(len(self.optimized_object.lower_bounds))
+                    ],
+                    dtype=float,
+                ),
+                bounds,
+            )
+            denorm = np.asarray(self.optimized_object.denorm_coefficients, dtype=float)
+            if self.executor is not None:
+                simplex = self._initial_simplex(x0_normalized, rhobeg, bounds)
+                BatchEvaluator(self.optimized_object, self.config, self.executor).evaluate(
+                    [point * denorm for point in simplex])
+                logger.info(f"Initial simplex of {len(simplex)} points evaluated in one batch")
+            initial_results = self.optimized_object.evaluate_model(self.optimized_object.model)
+            cost_fun_coeff = initial_results["objective"]
+            self.optimized_object.cost_function_normalization = cost_fun_coeff if cost_fun_coeff != 0 else 1
+
             sim_start_time = time.time()
             logger.info(json.dumps(self.optimized_object.opt_conditions.vars))
-            logger.info(f"SLSQP started at {sim_start_time}")
-            settings = {
-                'rhobeg': 0.2,
-                'rhoend': 0.02,
-                'catol': catol,
-                'maxiter': 200,
-                'disp': True
-            }
-            res = minimize(self.optimized_object.mass, x0_normalized, method='COBYLA',
-                        jac='3-point', constraints= self.optimized_object.cons, bounds=bounds, 
-                        options={'maxiter': get_max_iter(), 'disp': False}, callback=self.callback)
-            
-            logger.info(f"SLSQP finished at {sim_start_time} with status {res.status}")
-            logger.info(f"SLSQP duration {time.time() - sim_start_time}")
+            logger.info(f"COBYLA started at {sim_start_time}")
+            res = minimize(
+                self.optimized_object.objective,
+                x0_normalized,
+                method="COBYLA",
+                constraints=self.optimized_object.cons,
+                bounds=bounds,
+                options=options,
+                callback=self.callback,
+            )
+            logger.info(f"COBYLA finished with status {res.status}: {res.message}")
+            logger.info(f"COBYLA duration {time.time() - sim_start_time}")
             res_x_denormalized = [res.x[i] * self.optimized_object.denorm_coefficients[i]
                                    for i in range(len(self.optimized_object.lower_bounds))]
             self.optimized_object.x_to_model(self.optimized_object.model,
                                               res_x_denormalized, self.optimized_object.conversion_map)
-            
-            mass = self.optimized_object.mass(res.x) * self.optimized_object.cost_function_normalization
+
+            objective = self.optimized_object.objective(res.x) * self.optimized_object.cost_function_normalization
             result_vars_map = {}
             for var in self.optimized_object.opt_conditions.vars:
                 result_vars_map[var] = getattr(self.optimized_object.model, var)
@@ -98,28 +147,34 @@ class COBYLAOptimizer(AbstractOPtimizer):
                     constraint = self.optimized_object.cons[i]['fun'](res.x)
                 final_constraints[constraint_name] = constraint
             logger.info(f"Optimization duration {time.time() - time_start}")
-            logger.info("Ruslult variables:")
+            logger.info("Result variables:")
             logger.info(json.dumps(result_vars_map, indent=2))
             logger.info("Margin values:")
             logger.info(json.dumps(final_constraints, indent=2))
-            logger.info(f"mass = {str(mass)}")
-            logger.info(json.dumps(self.history))
+            logger.info(f"objective = {str(objective)}")
+            logger.info(f"Evaluation ledger: {self.optimized_object.ledger.hits} hits, "
+                        f"{self.optimized_object.ledger.misses} solves")
+            history_file = os.path.join(self.optimized_object.logging_dir,
+                                        self.optimized_object.local_log_path, "history.npz")
+            self.history.save_npz(history_file)
+            logger.info(f"History of {len(self.history)} iterations saved to: {history_file}")
             results : OptimizationTaskResults = OptimizationTaskResults(
-                0, 0, result_vars_map, final_constraints, mass, self.optimized_object.model,
+                0, 0, result_vars_map, final_constraints, objective, self.optimized_object.model,
                 opt_conditions=self.optimized_object.opt_conditions)
-
+            results.history = self.history
+            results.metadata["cobyla"] = {
+                "evaluations": int(res.nfev),
+                "solves": self.optimized_object.ledger.misses,
+                "status": int(res.status),
+            }
             return results
         except SolverError:
             logger.critical("%s Optimization failed due to unhandled exception during optimization" %  self.optimized_object.unique_id)
             logger.exception("%s exception: " % self.optimized_object.unique_id)
             return OptimizationTaskResults(
                 1, 1, None, None, None, self.optimized_object.model)
-        except AllLoadsZeroException:
-            logger.warning(f"all loads zero for panel {self.optimized_object.unique_id}")
-            return OptimizationTaskResults(
-                1, 1, None, None, None, self.optimized_object.model)
         finally:
             logger.info("LOG FINISH")
             if self.filehandler:
                 self.filehandler.close()
-            self.optimized_object.solver.free_up_log_file()
\ No newline at end of file
+            self.optimized_object.solver.free_up_log_file()
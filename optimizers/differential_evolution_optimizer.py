@@ -0,0 +1,111 @@
+"""
+Глобальный оптимизатор дифференциальной эволюции (scipy.optimize.differential_evolution),
+каждое поколение считается одной партией через executor
+"""
+import json
+import time
+
+import numpy as np
+from scipy.optimize import differential_evolution
+
+from optimization_tools.batch_evaluation import BatchEvaluator
+from optimization_tools.config import OptimizationConfig
+from optimization_tools.opt_conditions import OptimizationTaskResults
+from optimization_tools.optimizers.abstract_optimizer import AbstractOPtimizer
+from optimization_tools.optimizers.gradient_optimizer import OptimizationTaskWithNormalization
+
+
+class PopulationMap:
+    """
+    Map-like объект для параметра workers differential_evolution: сначала вся
+    популяция считается одной партией через BatchEvaluator, затем функция
+    вызывается для каждого члена и берет результат из ledger
+    """
+    def __init__(self, evaluator: BatchEvaluator):
+        self.evaluator = evaluator
+        self.generations = 0
+
+    def __call__(self, func, iterable):
+        population = [np.asarray(x, dtype=float) for x in iterable]
+        self.evaluator.evaluate(population)
+        self.generations += 1
+        return [func(x) for x in population]
+
+
+class DifferentialEvolutionOptimizer(AbstractOPtimizer):
+    """
+    Дифференциальная эволюция в границах OptConditions.vars.
+    Ограничения учитываются штрафом penalty * сумма нарушений запасов (в смысле
+    ConstraintForNormalized), objective делится на его значение в начальной точке.
+    Начальная точка модели входит в начальную популяцию.
+    popsize, mutation, recombination, tol, polish, init - параметры
+    scipy.optimize.differential_evolution; число поколений - config.max_iter.
+    """
+    def __init__(self, optimized_object: OptimizationTaskWithNormalization, config: OptimizationConfig,
+                 popsize: int = 15, mutation=(0.5, 1.0), recombination: float = 0.7, tol: float = 0.01,
+                 penalty: float = 1e3, polish: bool = False, init: str = "latinhypercube", seed: int = None):
+        super().__init__(optimized_object, config)
+        self.popsize = popsize
+        self.mutation = mutation
+        self.recombination = recombination
+        self.tol = tol
+        self.penalty = penalty
+        self.polish = polish
+        self.init = init
+        self.seed = seed
+        self.executor = None
+
+    def set_executor(self, executor) -> None:
+        self.executor = executor
+
+    def optimize(self, **kwargs) -> OptimizationTaskResults:
+        logger = self.logger
+        time_start = time.time()
+        task = self.optimized_object
+        task.update_opt_vars()
+        task.ledger.clear()
+        evaluator = BatchEvaluator(task, self.config, self.executor)
+        lower = np.asarray(task.lower_bounds, dtype=float)
+        upper = np.asarray(task.upper_bounds, dtype=float)
+        x0 = np.clip(np.asarray(task.get_x(), dtype=float), lower, upper)
+
+        initial_results = evaluator.evaluate([x0])[0]
+        scale = abs(initial_results["objective"]) if initial_results and initial_results["objective"] else 1.0
+
+        def penalized_objective(x):
+            results = evaluator.evaluate([x])[0]
+            if results is None:
+                return np.inf
+            violation = np.clip(-evaluator.constraint_margins(results), 0, None).sum()
+            return results["objective"] / scale + self.penalty * violation
+
+        workers = PopulationMap(evaluator)
+        res = differential_evolution(
+            penalized_objective,
+            bounds=list(zip(lower, upper)),
+            maxiter=self.config.max_iter,
+            popsize=self.popsize,
+            mutation=self.mutation,
+            recombination=self.recombination,
+            tol=self.tol,
+            polish=self.polish,
+            init=self.init,
+            seed=self.seed,
+            x0=x0,
+            workers=workers,
+            updating="deferred",
+        )
+        logger.info(f"Differential evolution finished: {res.message}")
+        best_results = evaluator.evaluate([res.x])[0]
+        if best_results is None:
+            logger.error("Differential evolution: no candidate was solved successfully")
+            return OptimizationTaskResults(1, 1, None, None, None, task.model)
+        results = evaluator.task_results(res.x, best_results, metadata={"differential_evolution": {
+            "generations": res.nit,
+            "solves": evaluator.solves,
+            "penalized_objective": float(res.fun),
+        }})
+        logger.info(f"Optimization duration {time.time() - time_start}, solves {evaluator.solves}")
+        logger.info(json.dumps(results.var_values, indent=2, default=float))
+        logger.info(f"objective = {results.objective}")
+        return results
@@ -14,13 +14,18 @@ from scipy.optimize import minimize, Bounds
 # from exceptions import AllLoadsZeroException
 from ..config import OptimizationConfig
 from optimization_tools.abstract_solver import AbstractSolver
+from optimization_tools.checkpoints import GradientCheckpoint
 from optimization_tools.constraints_creators import ConstraintForNormalized
+from optimization_tools.evaluation_ledger import EvaluationLedger
 from optimization_tools.exceptions import SolverError
+from optimization_tools.history import OptimizationHistory
 from optimization_tools.opt_conditions import OptimizationTaskResults
 from optimization_tools.optimizers.abstract_optimizer import AbstractOPtimizer, AbstractOptimizationTask
 
 from .. import opt_tools_settings
-from ..parallel_fd import ParallelFiniteDifferences, clip_to_bounds
+from ..fd_steps import adaptive_rel_steps
+from ..gradients import SolverGradients, provides_gradients
+from ..parallel_fd import ParallelFiniteDifferences, clip_to_bounds, supports_complex_step
 from ..utils import constraints_are_satisfied
 # print(f"MAX_ITER {get_max_iter()}")
 
@@ -41,7 +46,10 @@ class OptimizationTaskWithNormalization(AbstractOptimizationTask):
         self.lower_bounds = []
         self.upper_bounds = []
         self.cost_function_normalization = None
-        self.history = []
+        self.history = OptimizationHistory()
+        self.ledger = EvaluationLedger()
+        # SolverGradients, пока оптимизатор берет производные из солвера
+        self.solver_gradients = None
         self._update_bounds_and_constraints()
 
     def _update_bounds_and_constraints(self):
@@ -87,6 +95,13 @@ class OptimizationTaskWithNormalization(AbstractOptimizationTask):
 
         return vars_dict
 
+    def evaluate_model(self, model, unique_id: str = None) -> dict:
+        """Полный набор результатов для модели; повторные точки берутся из ledger"""
+        unique_id = unique_id if unique_id is not None else self.unique_id
+        if self.solver_gradients is not None:
+            return self.ledger.evaluate(model, lambda calc_task: self.solver_gradients.solve(calc_task, unique_id))
+        return self.ledger.evaluate(model, lambda calc_task: self.solver.solve(calc_task, unique_id, None))
+
     def objective(self, x):
         x = [float(x_component) for x_component in x]
         logger = logging.getLogger(self.local_log_path + "solver_log")
@@ -98,7 +113,7 @@ class OptimizationTaskWithNormalization(AbstractOptimizationTask):
         logger.info(x_denorm)
         inner_model = copy.deepcopy(self.model)
         self.x_to_model(inner_model, x_denorm, self.conversion_map)
-        result = self.solver.solve(inner_model, self.unique_id, "objective")
+        result = self.evaluate_model(inner_model)["objective"]
         logger.info(f"objective: {result}")
         return result / self.cost_function_normalization
 
@@ -112,7 +127,31 @@ class GradientOptimizer(AbstractOPtimizer):
     ):
         super().__init__(optimized_object, config)
         self.first_approx_function = first_approx_function
-        self.history: list[dict] = []
+        self.history = OptimizationHistory()
+        self._parallel_fd: ParallelFiniteDifferences | None = None
+        # Нормализованные точки уже найденных оптимумов (мультистарт):
+        # запуск останавливается, если итерация попала в их окрестность
+        self.known_optima: list[np.ndarray] = []
+        self.basin_radius: float = 0.0
+        self.stopped_in_known_basin = False
+        # True - новые записи cache_map солвера возвращаются в
+        # metadata["solver_cache"] (мультистарт в процессных исполнителях)
+        self.export_solver_cache = False
+        # Сигнатуры cache_map, уже записанные в чекпоинт этого запуска
+        # (None - чекпоинтов еще не было, файл кэша начинается заново)
+        self._checkpointed_cache_keys: set | None = None
+        # Шаги КР по переменным, найденные пробой для finite_diff_rel_step="adaptive"
+        self.adaptive_rel_step: np.ndarray | None = None
+
+    def _use_solver_gradients(self) -> bool:
+        if self.config.analytic_gradients is not None:
+            return bool(self.config.analytic_gradients)
+        return provides_gradients(self.optimized_object.solver)
+
+    def _use_complex_step(self) -> bool:
+        if self.config.complex_step is not None:
+            return bool(self.config.complex_step)
+        return supports_complex_step(self.optimized_object.solver)
 
     def _use_parallel_fd(self) -> bool:
         if bool(self.config.extra.get("sensitivity_stencil_validation", False)):
@@ -124,33 +163,12 @@ class GradientOptimizer(AbstractOPtimizer):
         return True
 
     def _find_last_feasible_history_point(self) -> dict | None:
-        limits = self.optimized_object.opt_conditions.constraints
-        for history_point in reversed(self.history):
-            if constraints_are_satisfied(history_point.get("constraints"), limits):
-                return history_point
-        return None
+        index = self.history.last_feasible_index(self.optimized_object.opt_conditions.constraints)
+        return None if index is None else self.history.record(index)
 
     def _find_best_feasible_history_point(self) -> dict | None:
-        limits = self.optimized_object.opt_conditions.constraints
-        best_point = None
-        best_objective = float("inf")
-
-        for history_point in self.history:
-            constraints = history_point.get("constraints")
-            if not constraints_are_satisfied(constraints, limits):
-                continue
-
-            objective = constraints.get("objective")
-            if objective is None:
-                objective = constraints.get("mass")
-            if objective is None:
-                continue
-
-            if objective < best_objective:
-                best_objective = objective
-                best_point = history_point
-
-        return best_point
+        index = self.history.best_feasible_index(self.optimized_object.opt_conditions.constraints)
+        return None if index is None else self.history.record(index)
 
     def _apply_history_point(self, history_point: dict) -> tuple[dict, dict, float]:
         vars_dict = history_point["vars"]
@@ -175,49 +193,128 @@ class GradientOptimizer(AbstractOPtimizer):
         }
         objective = constraint_values.get("objective")
         if objective is None:
-            objective = self.optimized_object.solver.solve(
-                self.optimized_object.model,
-                self.optimized_object.unique_id,
-                "objective",
-            )
+            objective = self.optimized_object.evaluate_model(self.optimized_object.model)["objective"]
         return result_vars_map, final_constraints, objective
 
+    def _checkpoint(self) -> GradientCheckpoint:
+        return GradientCheckpoint(os.path.join(
+            self.optimized_object.logging_dir, self.optimized_object.local_log_path))
+
+    def _save_checkpoint(self, x) -> None:
+        """
+        Сохранение последней принятой итерации для теплого рестарта.
+        Кэш солвера дописывается в отдельный файл только новыми записями.
+        """
+        checkpoint = self._checkpoint()
+        solver_cache = getattr(self.optimized_object.solver, "cache_map", None)
+        if solver_cache is not None:
+            if self._checkpointed_cache_keys is None:
+                checkpoint.reset_cache()
+                self._checkpointed_cache_keys = set()
+            new_entries = {signature: results for signature, results in solver_cache.items()
+                           if signature not in self._checkpointed_cache_keys}
+            checkpoint.append_cache(new_entries)
+            self._checkpointed_cache_keys.update(new_entries)
+        checkpoint.save({
+            "x_norm": np.asarray(x, dtype=float).copy(),
+            "history": self.history,
+            "best_feasible": self._find_best_feasible_history_point(),
+            "cost_function_normalization": self.optimized_object.cost_function_normalization,
+            "fd_memo": self._parallel_fd.jacobian_memo() if self._parallel_fd is not None else None,
+            "adaptive_rel_step": self.adaptive_rel_step,
+        })
+
+    def _load_checkpoint(self) -> dict | None:
+        """Восстановление истории и кэша солвера из чекпоинта"""
+        checkpoint = self._checkpoint()
+        state = checkpoint.load()
+        if state is None:
+            return None
+        self.history = state["history"]
+        self.optimized_object.history = self.history
+        self.optimized_object.cost_function_normalization = state["cost_function_normalization"]
+        cached = checkpoint.load_cache()
+        self._checkpointed_cache_keys = set(cached)
+        solver_cache = getattr(self.optimized_object.solver, "cache_map", None)
+        if solver_cache is not None:
+            solver_cache.update(cached)
+        return state
+
+    def _probe_rel_step(self, x0_normalized: np.ndarray, bounds: Bounds,
+                        parallel_fd: ParallelFiniteDifferences | None) -> np.ndarray:
+        """
+        Относительный шаг конечных разностей для каждой переменной (см. fd_steps).
+        Точки пробы считаются одной партией через parallel_fd, если он есть,
+        иначе последовательно; все результаты остаются в ledger.
+        """
+        task = self.optimized_object
+        if parallel_fd is not None:
+            def evaluate(points):
+                return np.array([parallel_fd.output_vector(results)
+                                 for results in parallel_fd.evaluate_points(points)])
+        else:
+            def evaluate(points):
+                return np.array([[task.objective(point)] + [constraint["fun"](point) for constraint in task.cons]
+                                 for point in points])
+        return adaptive_rel_steps(x0_normalized, bounds, evaluate)
+
     def callback(self, x):
-        if len(self.history)  == 4:
-            debug = 1
         vars_dict = self.optimized_object.get_vars_dict(x)
         vars_list = [vars_dict[var] for var in vars_dict]
         model = copy.deepcopy(self.optimized_object.model)
         self.optimized_object.x_to_model(model=model, x=vars_list, conversion_map=self.optimized_object.conversion_map)
-        constraint_values = self.optimized_object.solver.solve(model, self.optimized_object.unique_id + "_callback", None)
-        self.history.append({"vars" : vars_dict, "constraints": constraint_values})
+        constraint_values = self.optimized_object.evaluate_model(model, self.optimized_object.unique_id + "_callback")
+        self.history.append(vars_dict, constraint_values)
         self.optimized_object.history = self.history
+        if self.config.checkpoint_every and len(self.history) % self.config.checkpoint_every == 0:
+            self._save_checkpoint(x)
+        if self.basin_radius > 0 and any(
+                np.linalg.norm(np.asarray(x, dtype=float) - optimum) <= self.basin_radius
+                for optimum in self.known_optima):
+            self.stopped_in_known_basin = True
+            raise StopIteration
 
     def optimize(self, **kwargs) -> OptimizationTaskResults:
         # Используем self.config.max_iter
+        default_rel_step = self.config.finite_diff_rel_step if self.config.finite_diff_rel_step is not None else 0.01
         options = {
             'maxiter': self.config.max_iter, 
             'disp': False, 
-            "finite_diff_rel_step": kwargs.get("finite_diff_rel_step", 0.01),
+            "finite_diff_rel_step": kwargs.get("finite_diff_rel_step", default_rel_step),
             'ftol': kwargs.get("ftol", 1e-5)
         }
         try:
             self.optimized_object.update_opt_vars()
+            self.optimized_object.ledger.clear()
+            self.stopped_in_known_basin = False
+            self._checkpointed_cache_keys = None
+            cache_map = getattr(self.optimized_object.solver, "cache_map", None)
+            cached_before = set(cache_map) if self.export_solver_cache and cache_map is not None else None
             logger = self.logger
             logger.debug("Gradient optimization started")
+            use_solver_gradients = self._use_solver_gradients()
+            solver_gradients = None
+            if use_solver_gradients:
+                # Производные из солвера: одно решение на точку вместо 2n+1,
+                # начиная с начальной точки
+                solver_gradients = SolverGradients(self.optimized_object)
+                self.optimized_object.solver_gradients = solver_gradients
             time_start = time.time()
-            if self.first_approx_function:
-                initial_results = self.optimized_object.solver.solve(
-                    self.optimized_object.model, 
-                    self.optimized_object.unique_id, 
-                    None
-                )
+            checkpoint_state = self._load_checkpoint() if self.config.resume_from_checkpoint else None
+            if checkpoint_state is not None:
+                logger.info(f"Warm restart from checkpoint at iteration {len(self.history)}")
+            if self.first_approx_function and checkpoint_state is None:
+                initial_results = self.optimized_object.evaluate_model(self.optimized_object.model)
                 self.first_approx_function(
                     results_map=initial_results, 
                     panel=self.optimized_object.model, 
                     opt_conditions=self.optimized_object.opt_conditions, 
                     logger=self.logger
                 )
+                # Первое приближение может менять поля модели вне сигнатуры
+                self.optimized_object.ledger.clear()
+                if solver_gradients is not None:
+                    solver_gradients.clear()
 
             x0 = self.optimized_object.get_x()
             bounds = Bounds([self.optimized_object.lower_bounds[i] *
@@ -236,13 +333,12 @@ class GradientOptimizer(AbstractOPtimizer):
                 ),
                 bounds,
             )
-            initial_results = self.optimized_object.solver.solve(
-                self.optimized_object.model, 
-                self.optimized_object.unique_id, 
-                None
-            )
-            cost_fun_coeff = initial_results["objective"]
-            self.optimized_object.cost_function_normalization = cost_fun_coeff if cost_fun_coeff != 0 else 1
+            if checkpoint_state is None:
+                initial_results = self.optimized_object.evaluate_model(self.optimized_object.model)
+                cost_fun_coeff = initial_results["objective"]
+                self.optimized_object.cost_function_normalization = cost_fun_coeff if cost_fun_coeff != 0 else 1
+            else:
+                x0_normalized = clip_to_bounds(checkpoint_state["x_norm"], bounds)
             sim_start_time = time.time()
             logger.info(json.dumps(self.optimized_object.opt_conditions.vars))
             logger.info(f"finite_diff_rel_step {options.get("finite_diff_rel_step")}")
@@ -250,18 +346,42 @@ class GradientOptimizer(AbstractOPtimizer):
             logger.info(f"SLSQP started at {sim_start_time}")
 
             finite_diff_rel_step = options.get("finite_diff_rel_step")
+            if use_solver_gradients:
+                options["finite_diff_rel_step"] = None
+            # Комплексный шаг не нуждается в подборе шага и не требует параллельности
+            use_complex_step = not use_solver_gradients and self._use_complex_step()
+            adaptive_step = isinstance(finite_diff_rel_step, str) and finite_diff_rel_step == "adaptive" \
+                and not use_solver_gradients and not use_complex_step
+            self.adaptive_rel_step = None
+            if adaptive_step and checkpoint_state is not None and checkpoint_state.get("adaptive_rel_step") is not None:
+                # Проба уже сделана до рестарта
+                self.adaptive_rel_step = np.asarray(checkpoint_state["adaptive_rel_step"], dtype=float)
             jac = "3-point"
             constraints = self.optimized_object.cons
             callback = self.callback
             parallel_fd = None
-            if self._use_parallel_fd():
+            if use_solver_gradients:
+                jac = solver_gradients.objective_jac
+                constraints = solver_gradients.attach_constraint_jacs(constraints)
+                logger.info("Objective and constraint gradients from solver.solve_with_gradients")
+            elif use_complex_step or self._use_parallel_fd():
                 parallel_fd = ParallelFiniteDifferences(
                     self.optimized_object,
                     self.config,
                     finite_diff_rel_step,
                     bounds,
+                    method="cs" if use_complex_step else "3-point",
                 )
+                if use_complex_step:
+                    logger.info("Objective and constraint gradients by complex step")
+                self._parallel_fd = parallel_fd
                 parallel_fd.setup()
+                if checkpoint_state is not None:
+                    parallel_fd.restore_jacobian_memo(checkpoint_state.get("fd_memo"))
+                if adaptive_step:
+                    if self.adaptive_rel_step is None:
+                        self.adaptive_rel_step = self._probe_rel_step(x0_normalized, bounds, parallel_fd)
+                    parallel_fd.rel_step = self.adaptive_rel_step
                 parallel_fd.prefill(x0_normalized, commit_after=False)
                 jac = parallel_fd.objective_jac
                 constraints = parallel_fd.attach_constraint_jacs(constraints)
@@ -277,6 +397,11 @@ class GradientOptimizer(AbstractOPtimizer):
                         return result
 
                     callback = callback_with_prefetch
+            elif adaptive_step and self.adaptive_rel_step is None:
+                self.adaptive_rel_step = self._probe_rel_step(x0_normalized, bounds, None)
+            if adaptive_step:
+                options["finite_diff_rel_step"] = self.adaptive_rel_step
+                logger.info(f"Adaptive finite_diff_rel_step {self.adaptive_rel_step.tolist()}")
 
             try:
                 res = minimize(
@@ -292,6 +417,7 @@ class GradientOptimizer(AbstractOPtimizer):
             finally:
                 if parallel_fd is not None:
                     parallel_fd.close()
+                self._parallel_fd = None
             
             logger.info(f"SLSQP finished at {sim_start_time} with status {res.status}")
             logger.info(f"SLSQP duration {time.time() - sim_start_time}")
@@ -345,11 +471,27 @@ class GradientOptimizer(AbstractOPtimizer):
             logger.info("Margin values:")
             logger.info(json.dumps(final_constraints, indent=2))
             logger.info(f"objective = {str(objective)}")
-            logger.info(json.dumps(self.history))
+            logger.info(f"Evaluation ledger: {self.optimized_object.ledger.hits} hits, "
+                        f"{self.optimized_object.ledger.misses} solves")
+            history_file = os.path.join(self.optimized_object.logging_dir,
+                                        self.optimized_object.local_log_path, "history.npz")
+            self.history.save_npz(history_file)
+            logger.info(f"History of {len(self.history)} iterations saved to: {history_file}")
             results : OptimizationTaskResults = OptimizationTaskResults(
                 0, 0, result_vars_map, final_constraints, objective, self.optimized_object.model,
                 opt_conditions=self.optimized_object.opt_conditions)
             results.history = self.history
+            if self.stopped_in_known_basin:
+                results.metadata["stopped_in_known_basin"] = True
+            if cached_before is not None:
+                results.metadata["solver_cache"] = {
+                    signature: values for signature, values in cache_map.items() if signature not in cached_before
+                }
+            if adaptive_step:
+                results.metadata["fd_rel_step"] = {
+                    self.optimized_object.conversion_map[i]: float(step)
+                    for i, step in enumerate(self.adaptive_rel_step)
+                }
             return results
         except SolverError:
             logger.critical("%s Optimization failed due to unhandled exception during optimization" %  self.optimized_object.unique_id)
@@ -361,6 +503,7 @@ class GradientOptimizer(AbstractOPtimizer):
         #     return OptimizationTaskResults(
         #         1, 1, None, None, None, self.optimized_object.model)
         finally:
+            self.optimized_object.solver_gradients = None
             logger.info("LOG FINISH")
             if self.filehandler:
                 self.filehandler.close()
@@ -0,0 +1,159 @@
+"""
+Мультистарт SLSQP - несколько запусков GradientOptimizer из разных начальных
+точек с параллельным выполнением через executor
+"""
+import copy
+import json
+import os
+import time
+
+import numpy as np
+
+from optimization_tools.config import OptimizationConfig
+from optimization_tools.opt_conditions import OptimizationTaskResults
+from optimization_tools.optimization_executors import AbstractExecutor, ForLoopExecutor
+from optimization_tools.optimizers.abstract_optimizer import AbstractOPtimizer
+from optimization_tools.optimizers.gradient_optimizer import GradientOptimizer, OptimizationTaskWithNormalization
+from optimization_tools.sampling import draw_unit_samples, scale_unit_samples
+from optimization_tools.utils import constraints_are_satisfied
+
+
+class MultiStartOptimizer(AbstractOPtimizer):
+    """
+    Мультистарт градиентной оптимизации.
+    n_starts - число начальных точек, sampling - способ их генерации
+    (sobol, halton, lhs, random); starting_points - явный список словарей
+    {переменная: значение}, используется вместо генерации.
+    Запуски идут волнами по wave_size (по умолчанию config.num_proc) через executor.
+    Старты, попавшие в окрестность basin_radius (в нормализованных координатах)
+    уже найденного оптимума, пропускаются, а идущие запуски останавливаются,
+    как только итерация в такую окрестность попадает.
+    Новые записи кэша солвера и оптимум каждого завершившегося запуска
+    (из metadata результата) добавляются в общее состояние сразу по получении
+    результата. Исполнители в том же процессе (ForLoopExecutor, ThreadExecutor)
+    работают с общим кэшем и списком оптимумов напрямую, так что запуски волны
+    видят оптимумы уже завершившихся запусков. В процессных исполнителях
+    запуск получает копию состояния на момент отправки волны: запуски одной
+    волны не видят оптимумы друг друга, и первая волна не останавливается
+    досрочно; для раннего отсечения в этом случае уменьшают wave_size.
+    """
+    def __init__(self, optimized_object: OptimizationTaskWithNormalization, config: OptimizationConfig,
+                 n_starts: int = 8, sampling: str = "sobol", starting_points: list[dict] = None,
+                 basin_radius: float = 0.05, wave_size: int = None, seed: int = None,
+                 first_approx_function=None):
+        super().__init__(optimized_object, config)
+        self.n_starts = n_starts
+        self.sampling = sampling
+        self.starting_points = starting_points
+        self.basin_radius = basin_radius
+        self.wave_size = wave_size
+        self.seed = seed
+        self.first_approx_function = first_approx_function
+        self.executor: AbstractExecutor = ForLoopExecutor(config)
+        self.shared_cache: dict = {}
+
+    def set_executor(self, executor) -> None:
+        self.executor: AbstractExecutor = executor
+
+    def _draw_starting_points(self) -> list[list[float]]:
+        var_names = list(self.optimized_object.conversion_map.values())
+        if self.starting_points is not None:
+            return [[point[name] for name in var_names] for point in self.starting_points]
+        unit = draw_unit_samples(self.sampling, self.n_starts, len(var_names), self.seed)
+        return scale_unit_samples(unit, var_names, self.optimized_object.opt_conditions.vars)
+
+    def _normalize(self, x: list[float]) -> np.ndarray:
+        return np.asarray(x, dtype=float) * np.asarray(self.optimized_object.normalization_coefficients)
+
+    def _in_known_basin(self, x_norm: np.ndarray, known_optima: list[np.ndarray]) -> bool:
+        return any(np.linalg.norm(x_norm - optimum) <= self.basin_radius for optimum in known_optima)
+
+    def _make_start_optimizer(self, start_index: int, x_start: list[float],
+                              known_optima: list[np.ndarray]) -> GradientOptimizer:
+        task = copy.deepcopy(self.optimized_object)
+        self.optimized_object.x_to_model(task.model, x_start, task.conversion_map)
+        task.unique_id = f"{self.optimized_object.unique_id}__start_{start_index}"
+        task.local_log_path = os.path.join(self.optimized_object.local_log_path, f"start_{start_index}")
+        task.optimization_dir = self.optimized_object.optimization_dir
+        if hasattr(task.solver, "cache_map"):
+            task.solver.cache_map = self.shared_cache
+        optimizer = GradientOptimizer(task, self.config, self.first_approx_function)
+        # Общий список, а не копия: в том же процессе запуск видит новые оптимумы
+        optimizer.known_optima = known_optima
+        optimizer.basin_radius = self.basin_radius
+        optimizer.export_solver_cache = True
+        return optimizer
+
+    def optimize(self, **kwargs) -> OptimizationTaskResults:
+        logger = self.logger
+        time_start = time.time()
+        self.optimized_object.update_opt_vars()
+        limits = self.optimized_object.opt_conditions.constraints
+        if hasattr(self.optimized_object.solver, "cache_map"):
+            self.shared_cache = self.optimized_object.solver.cache_map
+
+        starts = self._draw_starting_points()
+        wave_size = self.wave_size or max(1, self.config.num_proc)
+        logger.info(f"Multi-start SLSQP: {len(starts)} starts, waves of {wave_size}")
+
+        known_optima: list[np.ndarray] = []
+        all_results: list[tuple[int, OptimizationTaskResults]] = []
+        skipped = 0
+        stopped_count = 0
+        for wave_start in range(0, len(starts), wave_size):
+            wave = []
+            for start_index in range(wave_start, min(wave_start + wave_size, len(starts))):
+                if self._in_known_basin(self._normalize(starts[start_index]), known_optima):
+                    skipped += 1
+                    logger.info(f"Start {start_index} skipped: inside a known basin")
+                    continue
+                wave.append((start_index, self._make_start_optimizer(start_index, starts[start_index], known_optima)))
+            if not wave:
+                continue
+
+            def merge_start_result(index: int, result: OptimizationTaskResults, _wave=wave) -> None:
+                """Кэш и оптимум запуска - в общее состояние, как только он завершился"""
+                nonlocal stopped_count
+                if result is None:
+                    return
+                self.shared_cache.update(result.metadata.pop("solver_cache", None) or {})
+                if result.var_values is None:
+                    return
+                start_index = _wave[index][0]
+                all_results.append((start_index, result))
+                stopped = result.metadata.get("stopped_in_known_basin", False)
+                stopped_count += int(stopped)
+                logger.info(f"Start {start_index}: objective {result.objective}"
+                            f"{' (stopped in known basin)' if stopped else ''}")
+                x_opt = self._normalize(
+                    [result.var_values[name] for name in self.optimized_object.conversion_map.values()])
+                if not stopped and not self._in_known_basin(x_opt, known_optima):
+                    known_optima.append(x_opt)
+
+            self.executor([optimizer for _, optimizer in wave], on_result=merge_start_result)
+
+        all_results.sort(key=lambda item: item[0])
+        feasible = [(i, r) for i, r in all_results if constraints_are_satisfied(r.constr_values, limits)]
+        candidates = feasible or all_results
+        if not candidates:
+            logger.warning("Multi-start: no start produced a result")
+            return OptimizationTaskResults(1, 1, None, None, None, self.optimized_object.model)
+
+        best_index, best = min(candidates, key=lambda item: item[1].objective)
+        best.metadata["multistart"] = {
+            "best_start": best_index,
+            "starts": len(starts),
+            "skipped_starts": skipped,
+            "stopped_starts": stopped_count,
+            "distinct_optima": len(known_optima),
+            "feasible": bool(feasible),
+        }
+        self.optimized_object.x_to_model(
+            self.optimized_object.model,
+            [best.var_values[name] for name in self.optimized_object.conversion_map.values()],
+            self.optimized_object.conversion_map,
+        )
+        logger.info(f"Multi-start finished in {time.time() - time_start}")
+        logger.info(f"Best start {best_index}, objective = {best.objective}")
+        logger.info(json.dumps(best.var_values, indent=2, default=float))
+        return best
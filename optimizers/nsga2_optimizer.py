@@ -0,0 +1,195 @@
+"""
+Многокритериальный оптимизатор NSGA-II: популяция считается одной партией
+через executor, результат - архив Парето-оптимальных проектов
+"""
+import json
+import time
+from typing import Sequence
+
+import numpy as np
+
+from optimization_tools.batch_evaluation import BatchEvaluator
+from optimization_tools.config import OptimizationConfig
+from optimization_tools.opt_conditions import OptimizationTaskResults
+from optimization_tools.optimizers.abstract_optimizer import AbstractOPtimizer
+from optimization_tools.optimizers.gradient_optimizer import OptimizationTaskWithNormalization
+from optimization_tools.pareto import ParetoArchive, crowding_distance, non_dominated_ranks
+from optimization_tools.sampling import draw_unit_samples
+
+
+class NSGA2Optimizer(AbstractOPtimizer):
+    """
+    NSGA-II (Deb et al., 2002) в границах OptConditions.vars.
+    objectives - ключи результатов солвера, минимизируемые одновременно;
+    ключи из maximize максимизируются. Ограничения OptConditions учитываются
+    правилом доминирования Деба по сумме нарушений запасов.
+    Начальная популяция - точка модели плюс выборка sampling; потомки строятся
+    SBX-скрещиванием и полиномиальной мутацией. Каждое поколение (не более
+    config.max_iter) считается одной партией через BatchEvaluator.
+    В metadata["pareto"] - ParetoArchive недоминируемых допустимых проектов
+    из всех посчитанных; с keep_models=True в архив добавляются модели.
+    Основной результат - проект архива с минимумом первого критерия.
+    """
+    def __init__(self, optimized_object: OptimizationTaskWithNormalization, config: OptimizationConfig,
+                 objectives: Sequence[str], maximize: Sequence[str] = (), popsize: int = 40,
+                 crossover_prob: float = 0.9, crossover_eta: float = 15.0, mutation_prob: float = None,
+                 mutation_eta: float = 20.0, sampling: str = "lhs", keep_models: bool = False,
+                 seed: int = None):
+        super().__init__(optimized_object, config)
+        if not objectives:
+            raise ValueError("NSGA2Optimizer needs at least one objective key")
+        unknown = [name for name in maximize if name not in objectives]
+        if unknown:
+            raise ValueError(f"maximize keys {unknown} are not among objectives {list(objectives)}")
+        self.objectives = list(objectives)
+        self.maximize = list(maximize)
+        self.popsize = popsize + popsize % 2
+        self.crossover_prob = crossover_prob
+        self.crossover_eta = crossover_eta
+        self.mutation_prob = mutation_prob
+        self.mutation_eta = mutation_eta
+        self.sampling = sampling
+        self.keep_models = keep_models
+        self.seed = seed
+        self.executor = None
+
+    def set_executor(self, executor) -> None:
+        self.executor = executor
+
+    def _evaluate(self, evaluator: BatchEvaluator, points: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Критерии (все на минимум) и суммарные нарушения ограничений; неудачные расчеты - inf"""
+        sense = np.array([-1.0 if name in self.maximize else 1.0 for name in self.objectives])
+        values = np.full((len(points), len(self.objectives)), np.inf)
+        violation = np.full(len(points), np.inf)
+        for k, results in enumerate(evaluator.evaluate(list(points))):
+            if results is None:
+                continue
+            values[k] = sense * np.array([float(results[name]) for name in self.objectives])
+            violation[k] = np.clip(-evaluator.constraint_margins(results), 0, None).sum()
+        return values, violation
+
+    @staticmethod
+    def _tournament(ranks: np.ndarray, crowding: np.ndarray, count: int, rng: np.random.Generator) -> np.ndarray:
+        """Бинарный турнир: меньший ранг, при равенстве - больший crowding distance"""
+        a = rng.integers(len(ranks), size=count)
+        b = rng.integers(len(ranks), size=count)
+        a_wins = (ranks[a] < ranks[b]) | ((ranks[a] == ranks[b]) & (crowding[a] >= crowding[b]))
+        return np.where(a_wins, a, b)
+
+    def _offspring(self, parents: np.ndarray, lower: np.ndarray, upper: np.ndarray,
+                   rng: np.random.Generator) -> np.ndarray:
+        """SBX-скрещивание пар родителей и полиномиальная мутация"""
+        n, d = parents.shape
+        span = np.where(upper > lower, upper - lower, 1.0)
+        first, second = parents[0::2], parents[1::2]
+        u = rng.random(first.shape)
+        beta = np.where(u <= 0.5, (2 * u) ** (1 / (self.crossover_eta + 1)),
+                        (1 / (2 * (1 - u))) ** (1 / (self.crossover_eta + 1)))
+        crossed = (rng.random(len(first)) < self.crossover_prob)[:, None] & (rng.random(first.shape) < 0.5)
+        child1 = np.where(crossed, 0.5 * ((1 + beta) * first + (1 - beta) * second), first)
+        child2 = np.where(crossed, 0.5 * ((1 - beta) * first + (1 + beta) * second), second)
+        children = np.empty_like(parents)
+        children[0::2], children[1::2] = child1, child2
+
+        mutation_prob = self.mutation_prob if self.mutation_prob is not None else 1.0 / d
+        u = rng.random((n, d))
+        delta = np.where(u < 0.5, (2 * u) ** (1 / (self.mutation_eta + 1)) - 1,
+                         1 - (2 * (1 - u)) ** (1 / (self.mutation_eta + 1)))
+        mutated = rng.random((n, d)) < mutation_prob
+        children = np.where(mutated, children + delta * span, children)
+        return np.clip(children, lower, upper)
+
+    @staticmethod
+    def _survivors(values: np.ndarray, violation: np.ndarray, count: int) -> np.ndarray:
+        """Индексы count лучших по рангу фронта, затем по crowding distance"""
+        ranks = non_dominated_ranks(values, violation)
+        crowding = crowding_distance(values, ranks)
+        return np.lexsort((-crowding, ranks))[:count]
+
+    def optimize(self, **kwargs) -> OptimizationTaskResults:
+        logger = self.logger
+        time_start = time.time()
+        task = self.optimized_object
+        task.update_opt_vars()
+        task.ledger.clear()
+        evaluator = BatchEvaluator(task, self.config, self.executor)
+        lower = np.asarray(task.lower_bounds, dtype=float)
+        upper = np.asarray(task.upper_bounds, dtype=float)
+        d = len(lower)
+        rng = np.random.default_rng(self.seed)
+
+        x0 = np.clip(np.asarray(task.get_x(), dtype=float), lower, upper)
+        unit = draw_unit_samples(self.sampling, self.popsize - 1, d, self.seed)
+        population = np.vstack([x0, lower + unit * (upper - lower)])
+        values, violation = self._evaluate(evaluator, population)
+        all_x, all_values, all_violation = [population], [values], [violation]
+
+        generation = 0
+        while generation < self.config.max_iter:
+            ranks = non_dominated_ranks(values, violation)
+            crowding = crowding_distance(values, ranks)
+            parents = population[self._tournament(ranks, crowding, self.popsize, rng)]
+            children = self._offspring(parents, lower, upper, rng)
+            child_values, child_violation = self._evaluate(evaluator, children)
+            all_x.append(children)
+            all_values.append(child_values)
+            all_violation.append(child_violation)
+
+            merged_x = np.vstack([population, children])
+            merged_values = np.vstack([values, child_values])
+            merged_violation = np.concatenate([violation, child_violation])
+            keep = self._survivors(merged_values, merged_violation, self.popsize)
+            population, values, violation = merged_x[keep], merged_values[keep], merged_violation[keep]
+            generation += 1
+            logger.info(f"Generation {generation}: {int(np.sum(violation <= 0))} feasible, "
+                        f"first front {int(np.sum(non_dominated_ranks(values, violation) == 0))}, "
+                        f"solves {evaluator.solves}")
+
+        archive = self._archive(evaluator, np.vstack(all_x), np.vstack(all_values), np.concatenate(all_violation))
+        if len(archive):
+            best_point = archive.x[0]
+        else:
+            logger.warning("No feasible designs found, returning the least violating one")
+            best_point = population[int(np.argmin(violation))]
+        best_results = evaluator.evaluate([best_point])[0]
+        if best_results is None:
+            logger.error("NSGA-II: no candidate was solved successfully")
+            return OptimizationTaskResults(1, 1, None, None, None, task.model)
+        results = evaluator.task_results(best_point, best_results, metadata={
+            "pareto": archive,
+            "nsga2": {
+                "generations": generation,
+                "solves": evaluator.solves,
+                "front_size": len(archive),
+            },
+        })
+        logger.info(f"NSGA-II finished in {time.time() - time_start}, solves {evaluator.solves}, "
+                    f"Pareto front of {len(archive)} designs")
+        logger.info(json.dumps(results.var_values, indent=2, default=float))
+        return results
+
+    def _archive(self, evaluator: BatchEvaluator, x: np.ndarray, values: np.ndarray,
+                 violation: np.ndarray) -> ParetoArchive:
+        """Недоминируемые допустимые проекты среди всех посчитанных, по возрастанию первого критерия"""
+        feasible = np.flatnonzero(violation <= 0)
+        x, values = x[feasible], values[feasible]
+        x, unique = np.unique(x, axis=0, return_index=True)
+        values = values[unique]
+        front = np.flatnonzero(non_dominated_ranks(values) == 0) if len(x) else np.array([], dtype=int)
+        # Одинаковые значения критериев в разных точках - оставляем одну
+        _, distinct = np.unique(values[front], axis=0, return_index=True)
+        front = front[np.sort(distinct)]
+        front = front[np.argsort(values[front, 0], kind="stable")]
+        sense = np.array([-1.0 if name in self.maximize else 1.0 for name in self.objectives])
+        results = evaluator.evaluate(list(x[front]))
+        n_constraints = len(self.optimized_object.opt_conditions.constraints)
+        margins = np.array([evaluator.constraint_margins(point_results) for point_results in results],
+                           dtype=float).reshape(len(front), n_constraints)
+        return ParetoArchive(
+            evaluator.var_names,
+            list(self.objectives),
+            x[front],
+            values[front] * sense,
+            margins,
+            [evaluator.make_model(point) for point in x[front]] if self.keep_models else None,
+        )
@@ -0,0 +1,163 @@
+"""
+Оптимизатор на суррогатной модели (RBF) с доверительной областью.
+Обучается на уже посчитанных точках из кэша солвера и тратит реальные
+расчеты только на точки дозаполнения, партиями по числу параллельных расчетов
+"""
+import json
+import time
+
+import numpy as np
+from scipy.optimize import minimize, Bounds, NonlinearConstraint
+
+from optimization_tools.batch_evaluation import BatchEvaluator, DesignArchive
+from optimization_tools.config import OptimizationConfig
+from optimization_tools.opt_conditions import OptimizationTaskResults
+from optimization_tools.optimizers.abstract_optimizer import AbstractOPtimizer
+from optimization_tools.optimizers.gradient_optimizer import OptimizationTaskWithNormalization
+from optimization_tools.sampling import draw_unit_samples
+from optimization_tools.surrogates import RBFSurrogate
+
+
+class SurrogateOptimizer(AbstractOPtimizer):
+    """
+    Оптимизация по RBF-суррогату objective и ограничений с доверительной областью.
+    Обучающая выборка - точки из solver.cache_map, сигнатуры которых состоят из
+    переменных оптимизации (остальные поля сигнатуры должны совпадать с моделью),
+    плюс начальный план LHS до initial_samples точек (по умолчанию 2*d + 1).
+    На каждой итерации (не более config.max_iter) в доверительной области
+    радиуса trust_radius (доля диапазона переменных) ищется минимум суррогата
+    с учетом предсказанных ограничений, и batch_size (по умолчанию config.num_proc)
+    точек дозаполнения считаются через executor. Область расширяется при
+    улучшении рекорда и сужается иначе; остановка при радиусе меньше
+    min_trust_radius или после max_solves реальных расчетов.
+    """
+    def __init__(self, optimized_object: OptimizationTaskWithNormalization, config: OptimizationConfig,
+                 batch_size: int = None, initial_samples: int = None, trust_radius: float = 0.2,
+                 min_trust_radius: float = 1e-3, max_solves: int = None, seed: int = None):
+        super().__init__(optimized_object, config)
+        self.batch_size = batch_size
+        self.initial_samples = initial_samples
+        self.trust_radius = trust_radius
+        self.min_trust_radius = min_trust_radius
+        self.max_solves = max_solves
+        self.seed = seed
+        self.executor = None
+
+    def set_executor(self, executor) -> None:
+        self.executor = executor
+
+    def _propose(self, surrogate: RBFSurrogate, x_data: np.ndarray, center: np.ndarray, radius: float,
+                 lower: np.ndarray, upper: np.ndarray, n_constraints: int, count: int,
+                 rng_seed: int) -> list[np.ndarray]:
+        """Точки дозаполнения: минимум суррогата в доверительной области и лучшие разнесенные кандидаты"""
+        span = upper - lower
+        box_lower = np.maximum(lower, center - radius * span)
+        box_upper = np.minimum(upper, center + radius * span)
+        d = len(center)
+        unit = draw_unit_samples("lhs", 100 * d, d, rng_seed)
+        candidates = np.vstack([center, box_lower + unit * (box_upper - box_lower)])
+
+        constraint_names = [f"g{j}" for j in range(n_constraints)]
+        scale = surrogate.scale["objective"]
+
+        def merit(points):
+            predicted = surrogate.predict(points)
+            violation = sum(np.clip(-predicted[name], 0, None) for name in constraint_names) \
+                if constraint_names else 0.0
+            return predicted["objective"] / scale + 100.0 * violation
+
+        merits = merit(candidates)
+        start = candidates[int(np.argmin(merits))]
+        nonlinear = []
+        if constraint_names:
+            nonlinear.append(NonlinearConstraint(
+                lambda x: np.array([surrogate.predict(x)[name][0] for name in constraint_names]), 0, np.inf))
+        polished = minimize(lambda x: surrogate.predict(x)["objective"][0] / scale, start, method="SLSQP",
+                            bounds=Bounds(box_lower, box_upper), constraints=nonlinear,
+                            options={"maxiter": 100})
+        best = np.clip(polished.x, box_lower, box_upper) if np.all(np.isfinite(polished.x)) else start
+
+        min_distance = 0.05 * radius
+        proposed: list[np.ndarray] = []
+
+        def far_enough(x):
+            unit_x = (x - lower) / span
+            for other in list(x_data) + proposed:
+                if np.linalg.norm(unit_x - (other - lower) / span) < min_distance:
+                    return False
+            return True
+
+        for x in [best] + [candidates[k] for k in np.argsort(merits)]:
+            if len(proposed) >= count:
+                break
+            if far_enough(x):
+                proposed.append(np.asarray(x, dtype=float))
+        return proposed
+
+    def optimize(self, **kwargs) -> OptimizationTaskResults:
+        logger = self.logger
+        time_start = time.time()
+        task = self.optimized_object
+        task.update_opt_vars()
+        task.ledger.clear()
+        evaluator = BatchEvaluator(task, self.config, self.executor)
+        lower = np.asarray(task.lower_bounds, dtype=float)
+        upper = np.asarray(task.upper_bounds, dtype=float)
+        d = len(lower)
+        batch_size = self.batch_size or max(1, self.config.num_proc)
+
+        archive = DesignArchive(evaluator)
+        cached = evaluator.cached_designs(lower, upper)
+        archive.add([point for point, _ in cached], [results for _, results in cached])
+        logger.info(f"Surrogate optimizer: {len(archive)} cached designs reused as training data")
+
+        n_initial = self.initial_samples or 2 * d + 1
+        if len(archive) < n_initial:
+            n_new = n_initial - len(archive)
+            initial = [np.asarray(task.get_x(), dtype=float)]
+            if n_new > 1:
+                initial += [lower + row * (upper - lower) for row in draw_unit_samples("lhs", n_new - 1, d, self.seed)]
+            archive.evaluate([point for point in initial if not archive.contains(point)])
+        if len(archive) == 0:
+            logger.error("Surrogate optimizer: no initial design was solved successfully")
+            return OptimizationTaskResults(1, 1, None, None, None, task.model)
+
+        radius = self.trust_radius
+        rounds = 0
+        while rounds < self.config.max_iter:
+            if self.max_solves is not None and evaluator.solves >= self.max_solves:
+                break
+            best = archive.best_index()
+            margins = archive.margins
+            outputs = {"objective": archive.objectives}
+            outputs.update({f"g{j}": margins[:, j] for j in range(margins.shape[1])})
+            surrogate = RBFSurrogate(lower, upper).fit(archive.x, outputs)
+
+            count = batch_size if self.max_solves is None else min(batch_size, self.max_solves - evaluator.solves)
+            seed = None if self.seed is None else self.seed + rounds
+            proposed = self._propose(surrogate, archive.x, archive.x[best], radius, lower, upper,
+                                     margins.shape[1], count, seed)
+            if not proposed:
+                radius *= 0.5
+            else:
+                archive.evaluate(proposed)
+                # Лучшая точка сменилась - рекорд улучшен
+                improved = archive.best_index() != best
+                radius = min(2 * radius, 0.5) if improved else 0.5 * radius
+            rounds += 1
+            logger.info(f"Round {rounds}: best objective {archive.objectives[archive.best_index()]}, "
+                        f"trust radius {radius}, solves {evaluator.solves}")
+            if radius < self.min_trust_radius:
+                break
+
+        best = archive.best_index()
+        results = evaluator.task_results(archive.x[best], archive.results[best], metadata={"surrogate": {
+            "rounds": rounds,
+            "solves": evaluator.solves,
+            "training_points": len(archive),
+            "trust_radius": radius,
+        }})
+        logger.info(f"Surrogate optimization finished in {time.time() - time_start}")
+        logger.info(json.dumps(results.var_values, indent=2, default=float))
+        logger.info(f"objective = {results.objective}")
+        return results
@@ -8,7 +8,7 @@ import multiprocessing
 import pickle
 import threading
 import time
-from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from dataclasses import dataclass
 from typing import Any, Callable, Dict, List, Tuple
 
@@ -16,11 +16,18 @@ import numpy as np
 from scipy.optimize import Bounds
 from scipy.optimize._numdiff import approx_derivative
 
+from optimization_tools.abstract_solver import CachableSolver
+from optimization_tools.evaluation_ledger import EvaluationLedger
+
 logger = logging.getLogger(__name__)
 
 _PROCESS_SOLVER: Any = None
 _PROCESS_CTX: Any = None
 
+# Imaginary step of the complex-step method in normalized variables; any tiny
+# value works since there is no subtraction to lose digits to
+COMPLEX_STEP = 1e-20
+
 
 @dataclass
 class FDEvaluationContext:
@@ -32,9 +39,16 @@ class FDEvaluationContext:
     x_to_model: Callable[..., None]
 
 
+def _as_x_norm(x_norm: Any) -> np.ndarray:
+    """Normalized point as a float array, or a complex one for complex-step points."""
+    return np.asarray(x_norm, dtype=complex if np.iscomplexobj(x_norm) else float)
+
+
 def model_at_x_norm(ctx: FDEvaluationContext, x_norm: np.ndarray) -> Any:
+    x_arr = _as_x_norm(x_norm)
+    scalar = complex if np.iscomplexobj(x_arr) else float
     x_denorm = [
-        float(x_norm[i]) * ctx.denorm_coefficients[i]
+        scalar(x_arr[i]) * ctx.denorm_coefficients[i]
         for i in range(len(ctx.denorm_coefficients))
     ]
     make_eval_copy = getattr(ctx.model, "make_eval_copy", None)
@@ -60,7 +74,7 @@ def _fd_solve_context(opt_task: Any, x_norm: np.ndarray | None) -> Tuple[Dict[st
     if x_norm is not None:
         kwargs_fn = getattr(opt_task, "fd_solve_kwargs_for_x_norm", None)
         if callable(kwargs_fn):
-            solve_kwargs = dict(kwargs_fn(np.asarray(x_norm, dtype=float)))
+            solve_kwargs = dict(kwargs_fn(np.real(_as_x_norm(x_norm))))
     baseline_payload = None
     baseline_fn = getattr(opt_task, "level2_baseline_payload_for_fd", None)
     if callable(baseline_fn):
@@ -76,21 +90,48 @@ def _apply_level2_baseline_payload(solver: Any, baseline_payload: Any) -> None:
         apply_fn(baseline_payload)
 
 
+def _ledger_lookup(opt_task: Any, signature: Any) -> Dict[str, Any] | None:
+    """Results from the task ledger, or from the main solver cache (then recorded in the ledger)."""
+    ledger = getattr(opt_task, "ledger", None)
+    results = ledger.get(signature) if ledger is not None else None
+    if results is None:
+        results = getattr(getattr(opt_task, "solver", None), "cache_map", {}).get(signature)
+        if results is not None and ledger is not None:
+            ledger.record(signature, results)
+    return results
+
+
+def _ledger_record(opt_task: Any, signature: Any, results: Dict[str, Any]) -> None:
+    ledger = getattr(opt_task, "ledger", None)
+    if ledger is not None:
+        ledger.record(signature, results)
+
+
 def _solver_solve_for_fd(
     opt_task: Any,
     solver: Any,
     model: Any,
     x_norm: np.ndarray | None,
 ) -> Dict[str, Any]:
+    """Solve through the task's evaluation ledger so points already seen this run are reused."""
+    signature = model.signature()
+    results = _ledger_lookup(opt_task, signature)
+    if results is not None:
+        return results
     solve_kwargs, baseline_payload = _fd_solve_context(opt_task, x_norm)
     _apply_level2_baseline_payload(solver, baseline_payload)
     unique_id = getattr(opt_task, "unique_id", "")
-    return solver.solve(model, unique_id, res_type=None, **solve_kwargs)
+    results = solver.solve(model, unique_id, res_type=None, **solve_kwargs)
+    _ledger_record(opt_task, signature, results)
+    ledger = getattr(opt_task, "ledger", None)
+    if ledger is not None:
+        ledger.misses += 1
+    return results
 
 
 def _make_fd_job(opt_task: Any, x_norm: np.ndarray) -> Tuple[List[float], Dict[str, Any], Any]:
     solve_kwargs, baseline_payload = _fd_solve_context(opt_task, x_norm)
-    return (np.asarray(x_norm, dtype=float).tolist(), solve_kwargs, baseline_payload)
+    return (_as_x_norm(x_norm).tolist(), solve_kwargs, baseline_payload)
 
 
 def _maybe_capture_level2_baseline(opt_task: Any, x_norm: np.ndarray) -> None:
@@ -113,26 +154,35 @@ def _process_worker_init(
     _PROCESS_SOLVER, _PROCESS_CTX = payloads[slot]
 
 
-def _process_eval_job(job: Tuple[Any, ...]) -> Tuple[Any, Dict[str, Any]]:
-    if _PROCESS_SOLVER is None or _PROCESS_CTX is None:
-        raise RuntimeError("FD process worker is not initialized")
+def _eval_job(solver: Any, ctx: FDEvaluationContext, job: Tuple[Any, ...]) -> Tuple[Any, Dict[str, Any]]:
     x_norm_list = job[0]
     solve_kwargs = job[1] if len(job) > 1 else {}
     baseline_payload = job[2] if len(job) > 2 else None
-    x_norm = np.asarray(x_norm_list, dtype=float)
-    model = model_at_x_norm(_PROCESS_CTX, x_norm)
+    model = model_at_x_norm(ctx, _as_x_norm(x_norm_list))
     signature = model.signature()
-    _apply_level2_baseline_payload(_PROCESS_SOLVER, baseline_payload)
-    results = _PROCESS_SOLVER.solve(
+    _apply_level2_baseline_payload(solver, baseline_payload)
+    results = solver.solve(
         model,
-        _PROCESS_CTX.unique_id,
+        ctx.unique_id,
         res_type=None,
         **_normalize_level2_changed_vars(solve_kwargs),
     )
     return signature, results
 
 
-def _approx_grad(fun, x_arr: np.ndarray, rel_step: float, f0: float, bounds) -> np.ndarray:
+def _process_eval_job(job: Tuple[Any, ...]) -> Tuple[Any, Dict[str, Any]]:
+    if _PROCESS_SOLVER is None or _PROCESS_CTX is None:
+        raise RuntimeError("FD process worker is not initialized")
+    return _eval_job(_PROCESS_SOLVER, _PROCESS_CTX, job)
+
+
+def needs_thread_isolation(solver: Any) -> bool:
+    """True when the solver overrides on_parallel_clone, i.e. its clones need their own state."""
+    hook = getattr(type(solver), "on_parallel_clone", None)
+    return hook is not None and hook is not CachableSolver.on_parallel_clone
+
+
+def _approx_grad(fun, x_arr: np.ndarray, rel_step: float | np.ndarray, f0: float, bounds) -> np.ndarray:
     result = approx_derivative(
         fun,
         x_arr,
@@ -151,7 +201,7 @@ def _approx_grad(fun, x_arr: np.ndarray, rel_step: float, f0: float, bounds) ->
 def _approx_jac(
     fun,
     x_arr: np.ndarray,
-    rel_step: float,
+    rel_step: float | np.ndarray,
     f0: np.ndarray,
     bounds,
 ) -> np.ndarray:
@@ -206,7 +256,7 @@ def _log_fd_design_point(
     results: Dict[str, Any],
 ) -> None:
     log_fn = getattr(opt_task, "log_fd_design_point", None)
-    if callable(log_fn):
+    if callable(log_fn) and not np.iscomplexobj(x_norm):
         log_fn(x_norm, results)
 
 
@@ -222,9 +272,25 @@ def _dedupe_points(points: List[np.ndarray]) -> List[np.ndarray]:
     return unique
 
 
+def supports_complex_step(solver: Any) -> bool:
+    """True when the solver declares its calculation complex-safe (complex_step_safe)."""
+    return bool(getattr(solver, "complex_step_safe", False))
+
+
+def complex_step_points(x0: np.ndarray, step: float = COMPLEX_STEP) -> List[np.ndarray]:
+    """Points x0 + i*step*e_k, one per variable: each gives a full Jacobian column."""
+    x0_arr = np.asarray(x0, dtype=float)
+    points: List[np.ndarray] = []
+    for k in range(x0_arr.size):
+        point = x0_arr.astype(complex)
+        point[k] += 1j * step
+        points.append(point)
+    return points
+
+
 def collect_fd_stencil_points(
     x0: np.ndarray,
-    rel_step: float,
+    rel_step: float | np.ndarray,
     bounds: Bounds | Tuple[np.ndarray, np.ndarray] | None,
 ) -> List[np.ndarray]:
     """Collect normalized x points that scipy 3-point FD would evaluate."""
@@ -247,30 +313,65 @@ def collect_fd_stencil_points(
 
 
 class ParallelFiniteDifferences:
-    """Parallel 3-point FD with cache prefill; one long-lived solver clone per process."""
+    """
+    Parallel 3-point FD with cache prefill; one long-lived solver clone per process.
+
+    Stencil results are kept in the task's EvaluationLedger, the same store the
+    objective, constraints and SLSQP callback read, so a line-search trial
+    point that coincides with an earlier stencil point (or the reverse) is a
+    hit whichever path solved it first.
+
+    The workers are chosen by config.parallel_fd_backend: "process" pickles a
+    solver clone into each worker process, "thread" solves on a thread pool
+    that shares the main solver and its cache_map, which suits solvers that
+    wait on subprocesses or run GIL-releasing NumPy code. Solvers overriding
+    on_parallel_clone (e.g. for unique work directories) get one clone per
+    thread instead.
+
+    method="cs" replaces the 3-point stencil with the complex-step method for
+    solvers whose calculation is complex-safe: the n points x + i*h*e_k are
+    solved (in parallel like a stencil) and d f / d x_k = Im f(x + i*h*e_k) / h
+    to machine precision, with n solves instead of 2n and no step to tune;
+    rel_step is not used then.
+    """
 
     def __init__(
         self,
         opt_task: Any,
         config: Any,
-        rel_step: float,
+        rel_step: float | np.ndarray,
         bounds: Bounds,
+        method: str = "3-point",
+        complex_step: float = COMPLEX_STEP,
     ) -> None:
+        if method not in ("3-point", "cs"):
+            raise ValueError(f"Unknown finite-difference method {method!r}, expected '3-point' or 'cs'")
         self.opt_task = opt_task
         self.config = config
         self.rel_step = rel_step
         self.bounds = bounds
-        self._executor: ProcessPoolExecutor | None = None
+        self.method = method
+        self.complex_step = complex_step
+        self._executor: Executor | None = None
         self._mp_manager: multiprocessing.managers.SyncManager | None = None
+        self._thread_state = threading.local()
+        self._thread_clones: List[Any] = []
+        self._free_thread_clones: List[Any] = []
+        self._thread_clones_lock = threading.Lock()
         self._prefill_lock = threading.Lock()
         self._prefill_memo_key: Tuple[float, ...] | None = None
-        self._fd_cache_map: Dict[Any, Dict[str, Any]] = {}
+        if getattr(opt_task, "ledger", None) is None:
+            opt_task.ledger = EvaluationLedger()
         self._jac_center_key: Tuple[float, ...] | None = None
         self._objective_grad: np.ndarray | None = None
         self._constraint_jac: np.ndarray | None = None
         self._last_prefill_points: List[np.ndarray] = []
         self._ctx = self._build_context()
 
+    @property
+    def _fd_cache_map(self) -> EvaluationLedger:
+        return self.opt_task.ledger
+
     def _build_context(self) -> FDEvaluationContext:
         return FDEvaluationContext(
             model=self.opt_task.model,
@@ -283,19 +384,28 @@ class ParallelFiniteDifferences:
             x_to_model=self.opt_task.x_to_model,
         )
 
+    def _fd_backend(self) -> str:
+        """"process", "thread" or "main" (no workers)."""
+        backend = getattr(self.config, "parallel_fd_backend", None)
+        if backend is None:
+            return "process" if bool(getattr(self.config, "parallel_fd_workers", False)) else "main"
+        if backend not in ("process", "thread"):
+            raise ValueError(f"Unknown parallel_fd_backend {backend!r}, expected 'process' or 'thread'")
+        return backend
+
     def _use_fd_workers(self) -> bool:
-        return bool(getattr(self.config, "parallel_fd_workers", False))
+        return self._fd_backend() != "main"
 
     def setup(self) -> None:
-        """Create a persistent process pool for the whole SLSQP run."""
+        """Create a persistent worker pool for the whole SLSQP run."""
         if self._use_fd_workers():
-            self._ensure_process_pool()
+            self._ensure_worker_pool()
         else:
             logger.info(
                 "parallel FD: main-thread stencil prefill (parallel_fd_workers=False)"
             )
 
-    def _ensure_process_pool(self) -> None:
+    def _ensure_worker_pool(self) -> None:
         if not self._use_fd_workers():
             return
         if self.config.num_proc <= 1:
@@ -303,6 +413,26 @@ class ParallelFiniteDifferences:
         if self._executor is not None:
             return
         worker_count = int(self.config.num_proc)
+        if self._fd_backend() == "thread":
+            isolated = needs_thread_isolation(self.opt_task.solver)
+            if isolated:
+                # Cloned here, before any job can write to the main cache_map
+                self._thread_clones = [
+                    self.opt_task.solver.clone_for_parallel_eval(f"thread{index}")
+                    for index in range(worker_count)
+                ]
+                self._free_thread_clones = list(self._thread_clones)
+            self._executor = ThreadPoolExecutor(
+                max_workers=worker_count,
+                thread_name_prefix="parallel-fd",
+                initializer=self._bind_thread_clone if isolated else None,
+            )
+            logger.info(
+                "parallel FD: persistent ThreadPool with %s worker thread(s), %s solver",
+                worker_count,
+                "per-thread" if isolated else "shared",
+            )
+            return
         self._mp_manager = multiprocessing.Manager()
         slot_counter = self._mp_manager.Value("i", 0)
         slot_lock = self._mp_manager.Lock()
@@ -324,10 +454,25 @@ class ParallelFiniteDifferences:
             worker_count,
         )
 
+    def _bind_thread_clone(self) -> None:
+        """Thread pool initializer: give the new worker thread one of the prepared clones."""
+        with self._thread_clones_lock:
+            self._thread_state.solver = self._free_thread_clones.pop()
+
+    def _thread_solver(self) -> Any:
+        """Main solver, or this thread's long-lived clone when the solver needs isolation."""
+        return getattr(self._thread_state, "solver", self.opt_task.solver)
+
+    def _thread_eval_job(self, job: Tuple[Any, ...]) -> Tuple[Any, Dict[str, Any]]:
+        return _eval_job(self._thread_solver(), self._ctx, job)
+
     def close(self) -> None:
         if self._executor is not None:
             self._executor.shutdown(wait=True)
             self._executor = None
+        self._thread_clones = []
+        self._free_thread_clones = []
+        self._thread_state = threading.local()
         if self._mp_manager is not None:
             self._mp_manager.shutdown()
             self._mp_manager = None
@@ -347,14 +492,18 @@ class ParallelFiniteDifferences:
             if key == self._prefill_memo_key:
                 return
             self._prefill_memo_key = key
-            self._fd_cache_map.clear()
             self._invalidate_jacobian_memo()
-        points = _dedupe_points(
-            [x_arr] + collect_fd_stencil_points(x_arr, self.rel_step, self.bounds)
-        )
+        if self.method == "cs":
+            points = [x_arr] + complex_step_points(x_arr, self.complex_step)
+        else:
+            points = _dedupe_points(
+                [x_arr] + collect_fd_stencil_points(x_arr, self.rel_step, self.bounds)
+            )
         self._prefill_points(points, x_arr)
-        self._last_prefill_points = [np.asarray(point, dtype=float).copy() for point in points]
-        self._maybe_validate_prefilled_stencils(x_arr, points)
+        self._last_prefill_points = [np.array(point, copy=True) for point in points]
+        if self.method != "cs":
+            # Retry hooks judge real 3-point stencils only
+            self._maybe_validate_prefilled_stencils(x_arr, points)
 
     def _prefill_points(
         self,
@@ -369,42 +518,72 @@ class ParallelFiniteDifferences:
         ]
         self._anchor_center_from_main_cache(center_arr)
 
-        missing: List[np.ndarray] = []
-        for point in perturbations:
-            model = model_at_x_norm(self._ctx, point)
-            signature = model.signature()
-            if signature not in self._fd_cache_map:
-                missing.append(point)
+        missing = [
+            point
+            for point in perturbations
+            if _ledger_lookup(self.opt_task, model_at_x_norm(self._ctx, point).signature()) is None
+        ]
         if missing:
-            if self._use_fd_workers():
-                self._ensure_process_pool()
-                if self._executor is None:
-                    for point in missing:
-                        self._eval_and_cache_on_main(point)
-                else:
-                    jobs = [_make_fd_job(self.opt_task, point) for point in missing]
-                    started = time.perf_counter()
-                    for point, (signature, results) in zip(
-                        missing,
-                        self._executor.map(_process_eval_job, jobs),
-                    ):
-                        self._fd_cache_map[signature] = results
-                        _log_fd_design_point(self.opt_task, point, results)
-                    logger.info(
-                        "parallel FD prefill: %s worker point(s) in %.3fs",
-                        len(missing),
-                        time.perf_counter() - started,
-                    )
-            else:
-                started = time.perf_counter()
+            self._solve_missing(missing)
+
+    def _solve_missing(self, missing: List[np.ndarray]) -> None:
+        """Solve points absent from the caches on the worker pool or the main thread."""
+        if self._use_fd_workers():
+            self._ensure_worker_pool()
+            if self._executor is None:
                 for point in missing:
                     self._eval_and_cache_on_main(point)
+            else:
+                jobs = [_make_fd_job(self.opt_task, point) for point in missing]
+                threads = self._fd_backend() == "thread"
+                eval_job = self._thread_eval_job if threads else _process_eval_job
+                main_cache = getattr(self.opt_task.solver, "cache_map", None)
+                started = time.perf_counter()
+                for point, (signature, results) in zip(
+                    missing,
+                    self._executor.map(eval_job, jobs),
+                ):
+                    _ledger_record(self.opt_task, signature, results)
+                    if threads and main_cache is not None:
+                        # Same process: per-thread clones feed the main cache too
+                        main_cache[signature] = results
+                    _log_fd_design_point(self.opt_task, point, results)
+                self._fd_cache_map.misses += len(missing)
                 logger.info(
-                    "parallel FD prefill: %s main-thread point(s) in %.3fs",
+                    "parallel FD prefill: %s worker %s point(s) in %.3fs",
                     len(missing),
+                    self._fd_backend(),
                     time.perf_counter() - started,
                 )
-        _invalidate_task_eval_cache(self.opt_task)
+        else:
+            started = time.perf_counter()
+            for point in missing:
+                self._eval_and_cache_on_main(point)
+            logger.info(
+                "parallel FD prefill: %s main-thread point(s) in %.3fs",
+                len(missing),
+                time.perf_counter() - started,
+            )
+
+    def evaluate_points(self, points: List[np.ndarray]) -> List[Dict[str, Any]]:
+        """Results at arbitrary normalized points, solved in parallel like a stencil prefill."""
+        points = [np.asarray(point, dtype=float) for point in points]
+        missing = [
+            point
+            for point in _dedupe_points(points)
+            if _ledger_lookup(self.opt_task, model_at_x_norm(self._ctx, point).signature()) is None
+        ]
+        if missing:
+            self._solve_missing(missing)
+        return [self._results_at_x_norm(point) for point in points]
+
+    def output_vector(self, results: Dict[str, Any]) -> np.ndarray:
+        """Normalized objective followed by the constraint values SLSQP sees."""
+        values = [float(results["objective"]) / self._ctx.cost_function_normalization]
+        for parameter, limit in self._constraint_specs():
+            if parameter is not None:
+                values.append(self._normalized_constraint_value(float(results[parameter]), limit))
+        return np.asarray(values, dtype=float)
 
     def _maybe_validate_prefilled_stencils(
         self,
@@ -434,6 +613,7 @@ class ParallelFiniteDifferences:
             model = model_at_x_norm(self._ctx, point_arr)
             self._fd_cache_map[model.signature()] = update["results"]
 
+        # Retried stencils replace results the task may hold in its own eval cache
         _invalidate_task_eval_cache(self.opt_task)
         self._invalidate_jacobian_memo()
 
@@ -442,7 +622,7 @@ class ParallelFiniteDifferences:
         center_arr = np.asarray(center, dtype=float)
         model = model_at_x_norm(self._ctx, center_arr)
         signature = model.signature()
-        main_cache = self.opt_task.solver.cache_map
+        main_cache = getattr(self.opt_task.solver, "cache_map", {})
         if signature in main_cache:
             self._fd_cache_map[signature] = main_cache[signature]
         else:
@@ -452,16 +632,14 @@ class ParallelFiniteDifferences:
                 model,
                 center_arr,
             )
-            self._fd_cache_map[signature] = results
             _log_fd_design_point(self.opt_task, center_arr, results)
         _maybe_capture_level2_baseline(self.opt_task, center_arr)
 
     def _eval_and_cache_on_main(self, x_norm: np.ndarray) -> None:
         """Match serial scipy FD: main-thread solve() with the task unique_id."""
-        x_arr = np.asarray(x_norm, dtype=float)
+        x_arr = _as_x_norm(x_norm)
         model = model_at_x_norm(self._ctx, x_arr)
-        signature = model.signature()
-        if signature in self._fd_cache_map:
+        if model.signature() in self._fd_cache_map:
             return
         results = _solver_solve_for_fd(
             self.opt_task,
@@ -469,13 +647,13 @@ class ParallelFiniteDifferences:
             model,
             x_arr,
         )
-        self._fd_cache_map[signature] = results
         _log_fd_design_point(self.opt_task, x_arr, results)
 
     def _lookup_results(self, model: Any, x_norm: np.ndarray | None = None) -> Dict[str, Any]:
-        signature = model.signature()
-        if signature in self._fd_cache_map:
-            return self._fd_cache_map[signature]
+        results = _ledger_lookup(self.opt_task, model.signature())
+        if results is not None:
+            self._fd_cache_map.hits += 1
+            return results
         results = _solver_solve_for_fd(
             self.opt_task,
             self.opt_task.solver,
@@ -486,6 +664,25 @@ class ParallelFiniteDifferences:
             _log_fd_design_point(self.opt_task, x_norm, results)
         return results
 
+    def jacobian_memo(self) -> Dict[str, Any]:
+        """Picklable snapshot of the stencil results and Jacobians for checkpoints."""
+        return {
+            "center_key": self._jac_center_key,
+            "objective_grad": self._objective_grad,
+            "constraint_jac": self._constraint_jac,
+            "fd_cache_map": dict(self._fd_cache_map.items()),
+        }
+
+    def restore_jacobian_memo(self, memo: Dict[str, Any] | None) -> None:
+        if not memo:
+            return
+        for signature, results in (memo.get("fd_cache_map") or {}).items():
+            self._fd_cache_map.record(signature, results)
+        self._jac_center_key = memo.get("center_key")
+        self._objective_grad = memo.get("objective_grad")
+        self._constraint_jac = memo.get("constraint_jac")
+        self._prefill_memo_key = self._jac_center_key
+
     def _invalidate_jacobian_memo(self) -> None:
         self._jac_center_key = None
         self._objective_grad = None
@@ -508,7 +705,7 @@ class ParallelFiniteDifferences:
         return value
 
     def _results_at_x_norm(self, x_norm: np.ndarray) -> Dict[str, Any]:
-        x_arr = np.asarray(x_norm, dtype=float)
+        x_arr = _as_x_norm(x_norm)
         model = model_at_x_norm(self._ctx, x_arr)
         return self._lookup_results(model, x_arr)
 
@@ -531,6 +728,10 @@ class ParallelFiniteDifferences:
         if key == self._jac_center_key:
             return
         self.prefill(x_arr)
+        if self.method == "cs":
+            self._build_complex_step_jacobians(x_arr)
+            self._jac_center_key = key
+            return
         objective_f0 = self._objective_fun(x_arr)
         self._objective_grad = _approx_grad(
             self._objective_fun,
@@ -558,6 +759,30 @@ class ParallelFiniteDifferences:
             0 if self._constraint_jac is None else self._constraint_jac.shape[0],
         )
 
+    def _build_complex_step_jacobians(self, x_arr: np.ndarray) -> None:
+        constraint_specs = self._constraint_specs()
+        jac = np.empty((1 + len(constraint_specs), x_arr.size), dtype=float)
+        for k, point in enumerate(complex_step_points(x_arr, self.complex_step)):
+            results = self._results_at_x_norm(point)
+            if not np.iscomplexobj(results["objective"]):
+                raise RuntimeError(
+                    "Complex-step point solved to a real objective; the solver is not complex-safe"
+                )
+            column = [np.imag(results["objective"]) / self._ctx.cost_function_normalization]
+            for parameter, limit in constraint_specs:
+                if parameter is None:
+                    raise RuntimeError("Complex-step constraint Jacobian requires constraint parameters")
+                scale = float(limit) if limit not in (None, 0) else 1.0
+                column.append(np.imag(results[parameter]) / scale)
+            jac[:, k] = np.asarray(column, dtype=float) / self.complex_step
+        self._objective_grad = jac[0]
+        self._constraint_jac = jac[1:]
+        logger.info(
+            "complex-step jacobians: n=%s m=%s built",
+            x_arr.size,
+            self._constraint_jac.shape[0],
+        )
+
     def _objective_fun(self, x_norm: np.ndarray) -> float:
         x_arr = np.asarray(x_norm, dtype=float)
         model = model_at_x_norm(self._ctx, x_arr)
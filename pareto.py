@@ -0,0 +1,103 @@
+"""Non-dominated sorting and Pareto archives for multi-objective optimizers."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, List
+
+import numpy as np
+
+
+def domination_matrix(objectives: np.ndarray, violation: np.ndarray | None = None) -> np.ndarray:
+    """
+    Boolean matrix D with D[i, j] True when design i dominates design j (all
+    objectives minimized). With violation given, Deb's constrained domination
+    is used: a feasible design dominates an infeasible one, and of two
+    infeasible designs the smaller violation dominates.
+    """
+    objectives = np.atleast_2d(np.asarray(objectives, dtype=float))
+    less_equal = np.all(objectives[:, None, :] <= objectives[None, :, :], axis=-1)
+    less = np.any(objectives[:, None, :] < objectives[None, :, :], axis=-1)
+    dominates = less_equal & less
+    if violation is None:
+        return dominates
+    violation = np.asarray(violation, dtype=float)
+    feasible = violation <= 0
+    both_feasible = feasible[:, None] & feasible[None, :]
+    return np.where(
+        both_feasible,
+        dominates,
+        (feasible[:, None] & ~feasible[None, :])
+        | (~feasible[:, None] & ~feasible[None, :] & (violation[:, None] < violation[None, :])),
+    )
+
+
+def non_dominated_ranks(objectives: np.ndarray, violation: np.ndarray | None = None) -> np.ndarray:
+    """Front index of every design (0 for the non-dominated front)."""
+    dominates = domination_matrix(objectives, violation)
+    n = len(dominates)
+    ranks = np.full(n, -1, dtype=int)
+    dominated_by = dominates.sum(axis=0)
+    front = np.flatnonzero(dominated_by == 0)
+    rank = 0
+    while front.size:
+        ranks[front] = rank
+        # Designs whose every dominator is in the current front form the next one
+        dominated_by = dominated_by - dominates[front].sum(axis=0)
+        dominated_by[ranks >= 0] = -1
+        front = np.flatnonzero(dominated_by == 0)
+        rank += 1
+    return ranks
+
+
+def crowding_distance(objectives: np.ndarray, ranks: np.ndarray) -> np.ndarray:
+    """NSGA-II crowding distance within each front; boundary designs get inf."""
+    objectives = np.atleast_2d(np.asarray(objectives, dtype=float))
+    distance = np.zeros(len(objectives))
+    for rank in np.unique(ranks):
+        members = np.flatnonzero(ranks == rank)
+        if len(members) <= 2:
+            distance[members] = np.inf
+            continue
+        values = objectives[members]
+        order = np.argsort(values, axis=0)
+        sorted_values = np.take_along_axis(values, order, axis=0)
+        span = sorted_values[-1] - sorted_values[0]
+        span = np.where(span > 0, span, 1.0)
+        gaps = np.zeros_like(values)
+        inner = (sorted_values[2:] - sorted_values[:-2]) / span
+        np.put_along_axis(gaps, order[1:-1], inner, axis=0)
+        np.put_along_axis(gaps, order[[0, -1]], np.inf, axis=0)
+        distance[members] = gaps.sum(axis=1)
+    return distance
+
+
+@dataclass
+class ParetoArchive:
+    """
+    Non-dominated feasible designs of a multi-objective run as arrays: x in
+    conversion_map order, objectives in the order of objective_names (in the
+    solver's sense, not negated for maximization) and constraint margins
+    (>= 0 when satisfied). models holds the task models when requested.
+    """
+    var_names: List[str]
+    objective_names: List[str]
+    x: np.ndarray
+    objectives: np.ndarray
+    margins: np.ndarray
+    models: List[Any] | None = field(default=None, repr=False)
+
+    def __len__(self) -> int:
+        return len(self.x)
+
+    def sorted_by(self, objective_name: str) -> "ParetoArchive":
+        """Copy of the archive ordered along one objective."""
+        order = np.argsort(self.objectives[:, self.objective_names.index(objective_name)], kind="stable")
+        return ParetoArchive(
+            list(self.var_names),
+            list(self.objective_names),
+            self.x[order],
+            self.objectives[order],
+            self.margins[order],
+            None if self.models is None else [self.models[k] for k in order],
+        )
@@ -0,0 +1,96 @@
+"""Branch-and-bound pruning of brute-force points from user-declared bounds."""
+
+from __future__ import annotations
+
+from typing import Callable, Dict, List, Tuple
+
+from optimization_tools.utils import constraints_are_satisfied
+
+OBJECTIVE = "objective"
+PRUNED_DOMINATED = "dominated"
+PRUNED_INFEASIBLE = "infeasible"
+PRUNED_BOUND = "bound"
+
+
+class BoxPruner:
+    """
+    Decides whether a box of designs (lower/upper value per variable) can still
+    beat the incumbent, using evaluated designs and user knowledge:
+
+    monotonicity - {"objective" or constraint name: {variable: +1 | -1}}, the sign
+    of the effect of increasing the variable. A box is dominated when its most
+    favourable corner is no better than an evaluated design whose objective is
+    not below the incumbent, and infeasible when its most favourable corner is
+    no better than a design that violates a monotone constraint. Variables
+    without a declared sign must be fixed to the same value in both.
+
+    objective_lower_bound(lower, upper) - lower bound of the objective over the
+    box; the box is pruned when it is not below the incumbent.
+    """
+
+    def __init__(
+        self,
+        limits: Dict[str, float],
+        monotonicity: Dict[str, Dict[str, int]] | None = None,
+        objective_lower_bound: Callable[[Dict[str, float], Dict[str, float]], float] | None = None,
+        tolerance: float = 1e-9,
+    ) -> None:
+        self.limits = limits
+        self.monotonicity = monotonicity or {}
+        self.objective_lower_bound = objective_lower_bound
+        self.tolerance = tolerance
+        self.evaluated: List[Tuple[Dict[str, float], Dict[str, float], float]] = []
+        self.incumbent: float | None = None
+
+    def add_result(self, design: Dict[str, float], constr_values: Dict[str, float] | None,
+                   objective: float | None) -> None:
+        if objective is None or constr_values is None:
+            return
+        self.evaluated.append((design, constr_values, objective))
+        if constraints_are_satisfied(constr_values, self.limits) and (
+                self.incumbent is None or objective < self.incumbent):
+            self.incumbent = objective
+
+    def _corner_no_better(self, signs: Dict[str, int], lower: Dict[str, float], upper: Dict[str, float],
+                          design: Dict[str, float], larger_is_worse: bool) -> bool:
+        """
+        True when the whole box is no better than design for a quantity with the
+        given signs; larger_is_worse for the objective, smaller for constraints.
+        """
+        for name in lower:
+            value = design.get(name)
+            if value is None:
+                return False
+            sign = signs.get(name, 0)
+            if sign == 0:
+                if abs(lower[name] - value) > self.tolerance or abs(upper[name] - value) > self.tolerance:
+                    return False
+                continue
+            # Direction in which the quantity gets worse
+            increases_badness = (sign > 0) == larger_is_worse
+            if increases_badness and lower[name] < value - self.tolerance:
+                return False
+            if not increases_badness and upper[name] > value + self.tolerance:
+                return False
+        return True
+
+    def prune_reason(self, lower: Dict[str, float], upper: Dict[str, float]) -> str | None:
+        """Why the box can be skipped, or None when it has to be evaluated."""
+        objective_signs = self.monotonicity.get(OBJECTIVE)
+        for design, constr_values, objective in self.evaluated:
+            if (objective_signs and self.incumbent is not None and objective >= self.incumbent
+                    and self._corner_no_better(objective_signs, lower, upper, design, larger_is_worse=True)):
+                return PRUNED_DOMINATED
+            for constraint_name, signs in self.monotonicity.items():
+                if constraint_name == OBJECTIVE or constraint_name not in constr_values:
+                    continue
+                limit = self.limits.get(constraint_name)
+                if limit is None or constraints_are_satisfied({constraint_name: constr_values[constraint_name]},
+                                                              {constraint_name: limit}):
+                    continue
+                if self._corner_no_better(signs, lower, upper, design, larger_is_worse=False):
+                    return PRUNED_INFEASIBLE
+        if (self.objective_lower_bound is not None and self.incumbent is not None
+                and self.objective_lower_bound(lower, upper) >= self.incumbent):
+            return PRUNED_BOUND
+        return None
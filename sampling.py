@@ -0,0 +1,46 @@
+"""Quasi-random sampling of design spaces described by OptConditions.vars."""
+
+from __future__ import annotations
+
+from typing import Any, Dict, List
+
+import numpy as np
+from scipy.stats import qmc
+
+SAMPLING_METHODS = ("sobol", "halton", "lhs", "random")
+
+
+def draw_unit_samples(method: str, n: int, d: int, seed: int | None = None) -> np.ndarray:
+    """n points in [0, 1)^d from scipy.stats.qmc (or plain uniform for "random")."""
+    if method == "sobol":
+        sampler = qmc.Sobol(d, scramble=True, seed=seed)
+        # Sobol balance properties need a power of two; draw extra and truncate.
+        m = int(np.ceil(np.log2(max(n, 1))))
+        return sampler.random_base2(m)[:n]
+    if method == "halton":
+        return qmc.Halton(d, scramble=True, seed=seed).random(n)
+    if method == "lhs":
+        return qmc.LatinHypercube(d, seed=seed).random(n)
+    if method == "random":
+        return np.random.default_rng(seed).random((n, d))
+    raise ValueError(f"Unknown sampling method {method!r}, expected one of {SAMPLING_METHODS}")
+
+
+def scale_unit_samples(unit: np.ndarray, var_names: List[str], opt_vars: Dict[str, Any]) -> List[List[Any]]:
+    """
+    Map unit-cube samples onto variable ranges. Continuous {"min", "max"} ranges
+    are scaled linearly; list-valued discrete variables pick the list element
+    whose equal-width bin contains the sample.
+    """
+    points: List[List[Any]] = []
+    for row in np.atleast_2d(unit):
+        point = []
+        for value, name in zip(row, var_names):
+            var_range = opt_vars[name]
+            if isinstance(var_range, list):
+                index = min(int(value * len(var_range)), len(var_range) - 1)
+                point.append(var_range[index])
+            else:
+                point.append(float(var_range["min"] + value * (var_range["max"] - var_range["min"])))
+        points.append(point)
+    return points
@@ -0,0 +1,159 @@
+"""Cost-aware longest-job-first scheduling of executor tasks."""
+
+from __future__ import annotations
+
+import json
+import logging
+import math
+import os
+from typing import Any, Callable, Dict, List, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def default_task_key(task: Any) -> str | None:
+    optimized_object = getattr(task, "optimized_object", None)
+    return getattr(optimized_object, "unique_id", None)
+
+
+def default_task_features(task: Any) -> List[float] | None:
+    """Numeric model attributes sorted by name; used for neighbour-based prediction."""
+    optimized_object = getattr(task, "optimized_object", None)
+    model = getattr(optimized_object, "_model", None)
+    if model is None:
+        return None
+    features = []
+    for name in sorted(vars(model)):
+        value = getattr(model, name)
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            features.append(float(value))
+    return features or None
+
+
+class CostModel:
+    """
+    Predicted task cost in seconds (or any consistent unit).
+
+    Sources, in priority order: user hook cost_function(task), persistent
+    history of past runs keyed by task_key(task), the mean cost of the
+    nearest tasks in history by task_features(task), default_cost.
+    """
+
+    def __init__(
+        self,
+        cost_function: Callable[[Any], float] | None = None,
+        history_path: str | None = None,
+        neighbours: int = 3,
+        default_cost: float = 1.0,
+        task_key: Callable[[Any], str | None] = default_task_key,
+        task_features: Callable[[Any], List[float] | None] = default_task_features,
+    ) -> None:
+        self.cost_function = cost_function
+        self.history_path = history_path
+        self.neighbours = neighbours
+        self.default_cost = default_cost
+        self.task_key = task_key
+        self.task_features = task_features
+        self.history: Dict[str, Dict[str, Any]] = {}
+        self._load_history()
+
+    def _load_history(self) -> None:
+        if self.history_path is None or not os.path.exists(self.history_path):
+            return
+        try:
+            with open(self.history_path, "r", encoding="utf-8") as f:
+                self.history = json.load(f)
+        except (OSError, ValueError) as exc:
+            logger.warning("Could not load cost history %s: %s", self.history_path, exc)
+
+    def save_history(self) -> None:
+        if self.history_path is None:
+            return
+        directory = os.path.dirname(self.history_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.history_path, "w", encoding="utf-8") as f:
+            json.dump(self.history, f, indent=2)
+
+    def _neighbour_cost(self, features: List[float] | None) -> float | None:
+        if features is None:
+            return None
+        known = [
+            (entry["features"], entry["cost"])
+            for entry in self.history.values()
+            if entry.get("features") is not None and len(entry["features"]) == len(features)
+        ]
+        if not known:
+            return None
+        points = np.asarray([item[0] for item in known], dtype=float)
+        costs = np.asarray([item[1] for item in known], dtype=float)
+        scale = np.ptp(points, axis=0)
+        scale[scale == 0] = 1.0
+        distances = np.linalg.norm((points - np.asarray(features, dtype=float)) / scale, axis=1)
+        nearest = np.argsort(distances)[: self.neighbours]
+        return float(np.mean(costs[nearest]))
+
+    def predict(self, task: Any) -> float:
+        if self.cost_function is not None:
+            return float(self.cost_function(task))
+        key = self.task_key(task)
+        if key is not None and key in self.history:
+            return float(self.history[key]["cost"])
+        neighbour_cost = self._neighbour_cost(self.task_features(task))
+        if neighbour_cost is not None:
+            return neighbour_cost
+        return self.default_cost
+
+    def record(self, task: Any, cost: float) -> None:
+        key = self.task_key(task)
+        if key is None:
+            return
+        self.history[key] = {"cost": float(cost), "features": self.task_features(task)}
+
+
+class LongestJobFirstScheduler:
+    """
+    Orders tasks by predicted cost (longest first) and groups them into
+    chunks for dispatch. Chunks are cost-guided: a chunk is closed once its
+    predicted cost reaches remaining_cost / (chunk_factor * num_workers), so
+    expensive tasks go alone and the cheap tail is batched into shrinking chunks.
+    """
+
+    def __init__(
+        self,
+        cost_model: CostModel | None = None,
+        num_workers: int = 1,
+        chunk_factor: float = 2.0,
+    ) -> None:
+        self.cost_model = cost_model if cost_model is not None else CostModel()
+        self.num_workers = max(1, int(num_workers))
+        self.chunk_factor = chunk_factor
+
+    def plan(self, tasks: Sequence[Any]) -> List[List[int]]:
+        costs = [max(0.0, self.cost_model.predict(task)) for task in tasks]
+        order = sorted(range(len(tasks)), key=lambda index: -costs[index])
+        remaining_cost = sum(costs)
+        chunks: List[List[int]] = []
+        chunk: List[int] = []
+        chunk_cost = 0.0
+        threshold = 0.0
+        for index in order:
+            if not chunk:
+                threshold = remaining_cost / (self.chunk_factor * self.num_workers)
+            chunk.append(index)
+            chunk_cost += costs[index]
+            remaining_cost -= costs[index]
+            if chunk_cost >= threshold or math.isclose(chunk_cost, threshold):
+                chunks.append(chunk)
+                chunk = []
+                chunk_cost = 0.0
+        if chunk:
+            chunks.append(chunk)
+        return chunks
+
+    def record(self, tasks: Sequence[Any], durations: Sequence[float]) -> None:
+        for task, duration in zip(tasks, durations):
+            self.cost_model.record(task, duration)
+        self.cost_model.save_history()
@@ -0,0 +1,136 @@
+"""Cheap surrogate models of solver outputs for screening and surrogate-based optimizers."""
+
+from __future__ import annotations
+
+from typing import Dict, List
+
+import numpy as np
+from scipy.interpolate import RBFInterpolator
+from scipy.optimize import minimize
+
+
+def maximin_subset(points: np.ndarray, n: int) -> List[int]:
+    """
+    Indices of n points spread over the set: start at the point nearest to
+    the centroid, then repeatedly add the point farthest from those chosen.
+    """
+    points = np.atleast_2d(np.asarray(points, dtype=float))
+    n = min(n, len(points))
+    if n <= 0:
+        return []
+    chosen = [int(np.argmin(np.linalg.norm(points - points.mean(axis=0), axis=1)))]
+    distances = np.linalg.norm(points - points[chosen[0]], axis=1)
+    while len(chosen) < n:
+        index = int(np.argmax(distances))
+        chosen.append(index)
+        distances = np.minimum(distances, np.linalg.norm(points - points[index], axis=1))
+    return chosen
+
+
+class RBFSurrogate:
+    """
+    Radial basis function interpolant of several outputs over normalized
+    coordinates; a thin wrapper over scipy.interpolate.RBFInterpolator.
+    Coordinates are scaled to the unit box given at construction so that
+    variables of different magnitude weigh equally.
+    """
+
+    def __init__(self, lower: np.ndarray, upper: np.ndarray, kernel: str = "thin_plate_spline",
+                 smoothing: float = 0.0) -> None:
+        self.lower = np.asarray(lower, dtype=float)
+        span = np.asarray(upper, dtype=float) - self.lower
+        self.span = np.where(span > 0, span, 1.0)
+        self.kernel = kernel
+        self.smoothing = smoothing
+        self._models: Dict[str, RBFInterpolator] = {}
+        self.scale: Dict[str, float] = {}
+
+    def _unit(self, x: np.ndarray) -> np.ndarray:
+        return (np.atleast_2d(np.asarray(x, dtype=float)) - self.lower) / self.span
+
+    def fit(self, x: np.ndarray, outputs: Dict[str, np.ndarray]) -> "RBFSurrogate":
+        """Fit one interpolant per output; scale[name] is the spread of observed values."""
+        unit = self._unit(x)
+        self._models = {}
+        self.scale = {}
+        for name, values in outputs.items():
+            values = np.asarray(values, dtype=float)
+            self._models[name] = RBFInterpolator(unit, values, kernel=self.kernel, smoothing=self.smoothing)
+            self.scale[name] = float(np.std(values)) or 1.0
+        return self
+
+    def predict(self, x: np.ndarray) -> Dict[str, np.ndarray]:
+        unit = self._unit(x)
+        return {name: model(unit) for name, model in self._models.items()}
+
+
+class GaussianProcess:
+    """
+    Gaussian process regression with a Matern 5/2 ARD kernel on the unit box.
+    Outputs are standardized; length scales and signal variance are fitted by
+    maximizing the log marginal likelihood (L-BFGS-B from a few starts).
+    """
+
+    def __init__(self, lower: np.ndarray, upper: np.ndarray, noise: float = 1e-6, restarts: int = 3,
+                 seed: int | None = None) -> None:
+        self.lower = np.asarray(lower, dtype=float)
+        span = np.asarray(upper, dtype=float) - self.lower
+        self.span = np.where(span > 0, span, 1.0)
+        self.noise = noise
+        self.restarts = restarts
+        self.rng = np.random.default_rng(seed)
+        self.log_params: np.ndarray | None = None
+
+    def _unit(self, x: np.ndarray) -> np.ndarray:
+        return (np.atleast_2d(np.asarray(x, dtype=float)) - self.lower) / self.span
+
+    @staticmethod
+    def _kernel(a: np.ndarray, b: np.ndarray, log_params: np.ndarray) -> np.ndarray:
+        length_scales = np.exp(log_params[:-1])
+        variance = np.exp(log_params[-1])
+        diff = (a[:, None, :] - b[None, :, :]) / length_scales
+        r = np.sqrt(5.0) * np.sqrt(np.sum(diff ** 2, axis=-1))
+        return variance * (1.0 + r + r ** 2 / 3.0) * np.exp(-r)
+
+    def _factor(self, log_params: np.ndarray):
+        k = self._kernel(self._x, self._x, log_params)
+        k[np.diag_indices_from(k)] += self.noise + 1e-10 * np.exp(log_params[-1])
+        return np.linalg.cholesky(k)
+
+    def _negative_log_likelihood(self, log_params: np.ndarray) -> float:
+        try:
+            chol = self._factor(log_params)
+        except np.linalg.LinAlgError:
+            return 1e10
+        alpha = np.linalg.solve(chol.T, np.linalg.solve(chol, self._y))
+        return float(0.5 * self._y @ alpha + np.log(np.diag(chol)).sum())
+
+    def fit(self, x: np.ndarray, y: np.ndarray, optimize: bool = True) -> "GaussianProcess":
+        """Fit to observations; optimize=False keeps the current hyperparameters."""
+        self._x = self._unit(x)
+        y = np.asarray(y, dtype=float)
+        self.y_mean = float(np.mean(y))
+        self.y_std = float(np.std(y)) or 1.0
+        self._y = (y - self.y_mean) / self.y_std
+        d = self._x.shape[1]
+        if self.log_params is None:
+            self.log_params = np.append(np.full(d, np.log(0.3)), 0.0)
+        if optimize:
+            bounds = [(np.log(1e-2), np.log(10.0))] * d + [(np.log(1e-2), np.log(1e2))]
+            starts = [self.log_params] + [
+                np.array([self.rng.uniform(low, high) for low, high in bounds]) for _ in range(self.restarts)]
+            best = min((minimize(self._negative_log_likelihood, start, method="L-BFGS-B", bounds=bounds)
+                        for start in starts), key=lambda res: res.fun)
+            self.log_params = best.x
+        self._chol = self._factor(self.log_params)
+        self._alpha = np.linalg.solve(self._chol.T, np.linalg.solve(self._chol, self._y))
+        return self
+
+    def predict(self, x: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Posterior mean and standard deviation in the original output units."""
+        unit = self._unit(x)
+        k_star = self._kernel(unit, self._x, self.log_params)
+        mean = k_star @ self._alpha
+        v = np.linalg.solve(self._chol, k_star.T)
+        variance = np.clip(np.exp(self.log_params[-1]) - np.sum(v ** 2, axis=0), 1e-16, None)
+        return mean * self.y_std + self.y_mean, np.sqrt(variance) * self.y_std
@@ -0,0 +1,107 @@
+"""Tests for forward-mode dual-number gradients."""
+
+from __future__ import annotations
+
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+from scipy.optimize import approx_fprime
+
+from optimization_tools.abstract_object import CachableObject
+from optimization_tools.abstract_solver import CachableSolver
+from optimization_tools.autodiff import DualNumber, ForwardModeGradientsMixin
+from optimization_tools.config import OptimizationConfig
+from optimization_tools.opt_conditions import OptConditions
+from optimization_tools.optimizers.gradient_optimizer import (
+    GradientOptimizer,
+    OptimizationTaskWithNormalization,
+)
+
+
+class Plate(CachableObject):
+    def __init__(self, thickness: float, width: float) -> None:
+        super().__init__()
+        self.thickness = thickness
+        self.width = width
+
+
+def plate_outputs(thickness, width):
+    """Buckling-like formulas written against NumPy."""
+    area = thickness * width
+    stress = 1000.0 / area
+    critical = 3.6e4 * (thickness / width) ** 2 * np.exp(-0.1 * width)
+    return {
+        "mass": 2.7 * area,
+        "objective": 2.7 * area,
+        "stress_margin": 1.0 - stress / 250.0,
+        "buckling_margin": critical / np.maximum(stress, 1.0) - 1.0,
+        "eccentricity": np.arctan2(thickness, width) + np.sqrt(width) * np.sin(thickness),
+    }
+
+
+class PlateSolver(ForwardModeGradientsMixin, CachableSolver):
+    solves = 0
+
+    def non_cached_calculation(self, calc_task: Plate, unique_id: str):
+        PlateSolver.solves += 1
+        return plate_outputs(calc_task.thickness, calc_task.width)
+
+    def configure(self, configure_dict):
+        return None
+
+
+class TestDualNumber(unittest.TestCase):
+    def test_gradients_match_finite_differences(self):
+        point = np.array([1.7, 12.0])
+        duals = DualNumber.seed(point)
+        outputs = plate_outputs(*duals)
+        for key, value in outputs.items():
+            with self.subTest(key=key):
+                expected = approx_fprime(point, lambda x: plate_outputs(*x)[key], 1e-7)
+                self.assertAlmostEqual(value.value, plate_outputs(*point)[key])
+                np.testing.assert_allclose(value.grad, expected, rtol=1e-5, atol=1e-7)
+
+    def test_float_conversion_is_refused(self):
+        with self.assertRaises(TypeError):
+            float(DualNumber(1.0, [1.0]))
+
+    def test_object_arrays(self):
+        x, y = DualNumber.seed([2.0, 3.0])
+        total = np.sum(np.sqrt(np.array([x, y])) * np.array([1.0, 2.0]))
+        np.testing.assert_allclose(total.grad, [0.5 / np.sqrt(2.0), 1.0 / np.sqrt(3.0)])
+
+
+class TestForwardModeSolver(unittest.TestCase):
+    def setUp(self):
+        PlateSolver.solves = 0
+        self.logging_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.logging_dir, ignore_errors=True)
+
+    def make_optimizer(self, **config_kwargs) -> GradientOptimizer:
+        config = OptimizationConfig(logging_dir=self.logging_dir, max_iter=100, **config_kwargs)
+        task = OptimizationTaskWithNormalization(
+            Plate(3.0, 20.0),
+            "plate",
+            OptConditions(
+                {"thickness": {"min": 0.5, "max": 5.0}, "width": {"min": 5.0, "max": 40.0}},
+                {"stress_margin": 0.0, "buckling_margin": 0.0},
+            ),
+            PlateSolver(config),
+            config,
+        )
+        return GradientOptimizer(task, config)
+
+    def test_same_optimum_with_fewer_solves(self):
+        result = self.make_optimizer().run_optimization()
+        dual_solves = PlateSolver.solves
+        PlateSolver.solves = 0
+        reference = self.make_optimizer(analytic_gradients=False).run_optimization()
+        self.assertAlmostEqual(result.objective, reference.objective, places=4)
+        self.assertGreaterEqual(result.constr_values["stress_margin"], -1e-6)
+        self.assertLess(dual_solves, PlateSolver.solves)
+
+
+if __name__ == "__main__":
+    unittest.main()
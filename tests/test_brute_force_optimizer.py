@@ -0,0 +1,272 @@
+"""Tests for BruteForceOptimizer."""
+
+from __future__ import annotations
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from optimization_tools.abstract_object import CachableObject
+from optimization_tools.abstract_solver import CachableSolver
+from optimization_tools.config import OptimizationConfig
+from optimization_tools.opt_conditions import OptConditions
+from optimization_tools.optimization_executors import MultiprocessExecutorCF
+from optimization_tools.optimizers.brute_force_optimizer import BruteForceOptimizer
+from optimization_tools.optimizers.gradient_optimizer import GradientOptimizer, OptimizationTaskWithNormalization
+from optimization_tools.pruning import PRUNED_INFEASIBLE, BoxPruner
+from optimization_tools.surrogates import maximin_subset
+from optimization_tools.simple_optimization_task import OptimizationTaskWithInnerOptimizer
+
+
+class SimpleVector(CachableObject):
+    def __init__(self, x1: float, x2: float) -> None:
+        super().__init__()
+        self.x1 = x1
+        self.x2 = x2
+
+
+class BowlSolver(CachableSolver):
+    eval_count = 0
+
+    def non_cached_calculation(self, calc_task: SimpleVector, unique_id: str):
+        BowlSolver.eval_count += 1
+        mass = (calc_task.x1 - 0.3) ** 2 + (calc_task.x2 - 0.2) ** 2
+        return {
+            "mass": mass,
+            "objective": mass,
+            "ineq1": 1 - calc_task.x1 - 2 * calc_task.x2,
+        }
+
+    def configure(self, configure_dict):
+        return None
+
+
+class ValleySolver(CachableSolver):
+    """Curved valley: inner SLSQP runs need several iterations per grid cell."""
+
+    def non_cached_calculation(self, calc_task: SimpleVector, unique_id: str):
+        objective = (1 - calc_task.x1) ** 2 + 10 * (calc_task.x2 - calc_task.x1 ** 2) ** 2 + 0.1
+        return {
+            "mass": objective,
+            "objective": objective,
+            "ineq1": 1.6 - calc_task.x1 - calc_task.x2,
+        }
+
+    def configure(self, configure_dict):
+        return None
+
+
+class MonotoneSolver(CachableSolver):
+    """Objective and constraint both increase with x1 and x2."""
+
+    eval_count = 0
+
+    def non_cached_calculation(self, calc_task: SimpleVector, unique_id: str):
+        MonotoneSolver.eval_count += 1
+        objective = calc_task.x1 + calc_task.x2
+        return {
+            "mass": objective,
+            "objective": objective,
+            "ineq1": calc_task.x1 + 2 * calc_task.x2 - 1,
+        }
+
+    def configure(self, configure_dict):
+        return None
+
+
+class BudgetRecordingOptimizer(GradientOptimizer):
+    """Reports the max_iter it actually ran with (in a worker process as well)."""
+
+    def optimize(self, **kwargs):
+        results = super().optimize(**kwargs)
+        results.metadata["max_iter"] = self.config.max_iter
+        return results
+
+
+class BudgetRecordingExecutor(MultiprocessExecutorCF):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.budgets = []
+
+    def __call__(self, tasks, on_result=None):
+        results = super().__call__(tasks, on_result)
+        self.budgets.append(sorted({result.metadata["max_iter"] for result in results}))
+        return results
+
+
+class BruteForceTestCase(unittest.TestCase):
+    seed_map = {"x1": 4, "x2": 4}
+
+    def setUp(self):
+        BowlSolver.eval_count = 0
+        self.logging_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.logging_dir, ignore_errors=True)
+        self.config = OptimizationConfig(logging_dir=self.logging_dir)
+        self.sweep_dir = os.path.join(self.logging_dir, "bf")
+
+    def make_optimizer(self, solver_class=BowlSolver, **kwargs) -> BruteForceOptimizer:
+        task = OptimizationTaskWithInnerOptimizer(
+            SimpleVector(0.5, 0.5),
+            "bf",
+            OptConditions(
+                {"x1": {"min": 0.0, "max": 1.0}, "x2": {"min": 0.0, "max": 1.0}},
+                {"ineq1": 0.0},
+            ),
+            solver_class(self.config),
+            self.config,
+        )
+        kwargs.setdefault("seed_map", self.seed_map)
+        return BruteForceOptimizer(task, 5, self.config, **kwargs)
+
+
+class TestBruteForceCheckpoint(BruteForceTestCase):
+    def test_resume_skips_completed_points(self):
+        first = self.make_optimizer(checkpoint=True).run_optimization()
+        self.assertEqual(BowlSolver.eval_count, 16)
+        self.assertTrue(os.path.exists(os.path.join(self.sweep_dir, "point_1", "point_result.pkl")))
+
+        BowlSolver.eval_count = 0
+        resumed = self.make_optimizer(checkpoint=True, resume=True).run_optimization()
+        self.assertEqual(BowlSolver.eval_count, 0)
+        self.assertAlmostEqual(resumed.objective, first.objective)
+        self.assertEqual(resumed.var_values, first.var_values)
+
+    def test_resume_dispatches_only_missing_codes(self):
+        self.make_optimizer(checkpoint=True).run_optimization()
+        for code in (3, 7):
+            os.remove(os.path.join(self.sweep_dir, f"point_{code}", "point_result.pkl"))
+
+        BowlSolver.eval_count = 0
+        self.make_optimizer(checkpoint=True, resume=True).run_optimization()
+        self.assertEqual(BowlSolver.eval_count, 2)
+
+
+class TestBruteForceSampling(BruteForceTestCase):
+    def test_sobol_sampling_evaluates_n_samples(self):
+        result = self.make_optimizer(seed_map={}, sampling="sobol", n_samples=8, sampling_seed=1).run_optimization()
+        self.assertEqual(BowlSolver.eval_count, 8)
+        self.assertIsNotNone(result.objective)
+        for name in ("x1", "x2"):
+            self.assertTrue(0.0 <= result.var_values[name] <= 1.0)
+
+    def test_list_valued_variable_takes_listed_values(self):
+        optimizer = self.make_optimizer(seed_map={}, sampling="lhs", n_samples=6, sampling_seed=3)
+        optimizer.optimized_object.opt_conditions.vars["x2"] = [0.1, 0.2, 0.4]
+        points, bounds = optimizer._sample_points()
+        self.assertEqual(len(points), 6)
+        for point, point_bounds in zip(points, bounds):
+            self.assertIn(point[1], [0.1, 0.2, 0.4])
+            self.assertEqual(point_bounds[1], [point[1], point[1]])
+            self.assertLessEqual(point_bounds[0][0], point[0])
+            self.assertGreaterEqual(point_bounds[0][1], point[0])
+
+    def test_unknown_method_rejected(self):
+        with self.assertRaises(ValueError):
+            self.make_optimizer(sampling="grid", n_samples=4)
+
+
+class TestBruteForceSuccessiveHalving(BruteForceTestCase):
+    opt_vars = {"x1": {"min": 0.1, "max": 1.5}, "x2": {"min": 0.1, "max": 1.5}}
+
+    def make_nested_optimizer(self, inner_class=GradientOptimizer, **kwargs) -> BruteForceOptimizer:
+        config = OptimizationConfig(logging_dir=self.logging_dir, max_iter=40)
+        inner = inner_class(
+            OptimizationTaskWithNormalization(
+                SimpleVector(0.5, 0.5), "inner",
+                OptConditions(dict(self.opt_vars), {"ineq1": 0.0}),
+                ValleySolver(config), config),
+            config,
+        )
+        task = OptimizationTaskWithInnerOptimizer(
+            SimpleVector(0.5, 0.5), "bf",
+            OptConditions(dict(self.opt_vars), {"ineq1": 0.0}),
+            ValleySolver(config), config, inner_optimizer=inner,
+        )
+        return BruteForceOptimizer(task, 5, config, seed_map=self.seed_map, **kwargs)
+
+    def test_only_survivors_get_full_budget(self):
+        full = self.make_nested_optimizer().run_optimization()
+        optimizer = self.make_nested_optimizer(halving_eta=3, halving_min_iter=3)
+        result = optimizer.run_optimization()
+
+        rungs = result.metadata["successive_halving"]
+        self.assertEqual([rung["points"] for rung in rungs], [16, 6, 2, 1])
+        self.assertEqual(rungs[-1]["max_iter"], 40)
+        self.assertAlmostEqual(result.objective, full.objective, places=5)
+
+    def test_rung_budgets_survive_process_executor_config(self):
+        optimizer = self.make_nested_optimizer(BudgetRecordingOptimizer, halving_eta=3, halving_min_iter=3)
+        # The executor ships its own config (max_iter=100) to every worker
+        executor = BudgetRecordingExecutor(
+            config=OptimizationConfig(logging_dir=self.logging_dir, num_proc=2, max_iter=100))
+        self.addCleanup(executor.close)
+        optimizer.set_executor(executor)
+        result = optimizer.run_optimization()
+        self.assertEqual(executor.budgets, [[3], [9], [27], [40]])
+        self.assertEqual([rung["max_iter"] for rung in result.metadata["successive_halving"]], [3, 9, 27, 40])
+
+    def test_rejects_eta_below_two(self):
+        with self.assertRaises(ValueError):
+            self.make_optimizer(halving_eta=1)
+
+
+class TestBruteForcePruning(BruteForceTestCase):
+    monotonicity = {"objective": {"x1": 1, "x2": 1}, "ineq1": {"x1": 1, "x2": 1}}
+
+    def setUp(self):
+        super().setUp()
+        MonotoneSolver.eval_count = 0
+
+    def test_monotone_pruning_keeps_optimum(self):
+        full = self.make_optimizer(MonotoneSolver).run_optimization()
+        self.assertEqual(MonotoneSolver.eval_count, 16)
+
+        MonotoneSolver.eval_count = 0
+        result = self.make_optimizer(MonotoneSolver, monotonicity=self.monotonicity).run_optimization()
+        self.assertAlmostEqual(result.objective, full.objective)
+        self.assertLess(MonotoneSolver.eval_count, 16)
+        stats = result.metadata["pruning"]
+        self.assertEqual(stats["evaluated"], MonotoneSolver.eval_count)
+        self.assertGreater(stats.get("dominated", 0), 0)
+
+    def test_box_below_violating_design_is_infeasible(self):
+        pruner = BoxPruner({"ineq1": 0.0}, self.monotonicity)
+        pruner.add_result({"x1": 0.3, "x2": 0.3}, {"ineq1": -0.1}, 0.6)
+        self.assertEqual(pruner.prune_reason({"x1": 0.1, "x2": 0.2}, {"x1": 0.3, "x2": 0.3}), PRUNED_INFEASIBLE)
+        self.assertIsNone(pruner.prune_reason({"x1": 0.1, "x2": 0.2}, {"x1": 0.4, "x2": 0.3}))
+
+    def test_objective_lower_bound(self):
+        def lower_bound(lower, upper):
+            return lower["x1"] + lower["x2"]
+
+        full = self.make_optimizer(MonotoneSolver).run_optimization()
+        MonotoneSolver.eval_count = 0
+        result = self.make_optimizer(MonotoneSolver, objective_lower_bound=lower_bound).run_optimization()
+        self.assertAlmostEqual(result.objective, full.objective)
+        self.assertGreater(result.metadata["pruning"].get("bound", 0), 0)
+        self.assertEqual(result.metadata["pruning"]["evaluated"], MonotoneSolver.eval_count)
+
+
+class TestBruteForceScreening(BruteForceTestCase):
+    seed_map = {"x1": 8, "x2": 8}
+
+    def test_screening_finds_grid_optimum_with_fewer_solves(self):
+        full = self.make_optimizer().run_optimization()
+        self.assertEqual(BowlSolver.eval_count, 64)
+
+        BowlSolver.eval_count = 0
+        result = self.make_optimizer(screening_initial=12, screening_batch=4).run_optimization()
+        self.assertAlmostEqual(result.objective, full.objective)
+        self.assertLess(BowlSolver.eval_count, 40)
+        self.assertEqual(result.metadata["screening"]["evaluated"], BowlSolver.eval_count)
+
+    def test_maximin_subset_spreads_points(self):
+        grid = [[x, y] for x in range(5) for y in range(5)]
+        chosen = maximin_subset(grid, 5)
+        self.assertEqual(chosen[0], 12)
+        self.assertEqual({tuple(grid[i]) for i in chosen[1:]}, {(0, 0), (0, 4), (4, 0), (4, 4)})
+
+
+if __name__ == "__main__":
+    unittest.main()
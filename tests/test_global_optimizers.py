@@ -0,0 +1,320 @@
+"""Tests for global and multi-start optimizers."""
+
+from __future__ import annotations
+
+import shutil
+import tempfile
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from optimization_tools.abstract_object import CachableObject
+from optimization_tools.abstract_solver import CachableSolver
+from optimization_tools.batch_evaluation import BatchEvaluator
+from optimization_tools.config import OptimizationConfig
+from optimization_tools.exceptions import SolverError
+from optimization_tools.opt_conditions import OptConditions
+from optimization_tools.optimization_executors import ForLoopExecutor, MultiprocessExecutorCF
+from optimization_tools.optimizers.bayesian_optimizer import BayesianOptimizer
+from optimization_tools.optimizers.cmaes_optimizer import CMAESOptimizer
+from optimization_tools.optimizers.differential_evolution_optimizer import DifferentialEvolutionOptimizer
+from optimization_tools.optimizers.gradient_optimizer import GradientOptimizer, OptimizationTaskWithNormalization
+from optimization_tools.optimizers.multistart_optimizer import MultiStartOptimizer
+from optimization_tools.optimizers.nsga2_optimizer import NSGA2Optimizer
+from optimization_tools.optimizers.surrogate_optimizer import SurrogateOptimizer
+
+
+class SimpleVector(CachableObject):
+    def __init__(self, x1: float, x2: float) -> None:
+        super().__init__()
+        self.x1 = x1
+        self.x2 = x2
+
+
+class TwoBasinSolver(CachableSolver):
+    """Two local minima in x1 (near 1.0 and 2.5); the one near 1.0 is global."""
+
+    eval_count = 0
+
+    def non_cached_calculation(self, calc_task: SimpleVector, unique_id: str):
+        TwoBasinSolver.eval_count += 1
+        x1, x2 = calc_task.x1, calc_task.x2
+        objective = (x1 - 1.0) ** 2 * (x1 - 2.5) ** 2 + 0.1 * x1 + (x2 - 1.0) ** 2
+        return {
+            "objective": objective,
+            "mass": objective,
+            "ineq1": 3.5 - x1 - x2,
+        }
+
+    def configure(self, configure_dict):
+        return None
+
+
+class BatchTwoBasinSolver(TwoBasinSolver):
+    batch_calls = 0
+
+    def solve_batch(self, models, unique_ids):
+        BatchTwoBasinSolver.batch_calls += 1
+        return [self.solve(model, unique_id, None) for model, unique_id in zip(models, unique_ids)]
+
+
+class FailingRegionSolver(TwoBasinSolver):
+    """Solver that does not converge past x1 = 2.7."""
+
+    def non_cached_calculation(self, calc_task: SimpleVector, unique_id: str):
+        if calc_task.x1 > 2.7:
+            raise SolverError("no convergence")
+        return super().non_cached_calculation(calc_task, unique_id)
+
+
+class AlwaysFailingSolver(TwoBasinSolver):
+    def non_cached_calculation(self, calc_task: SimpleVector, unique_id: str):
+        raise SolverError("no convergence")
+
+
+class RecordingExecutor(ForLoopExecutor):
+    """ForLoopExecutor that remembers the size of every batch it ran."""
+
+    def __init__(self, config):
+        super().__init__(config)
+        self.batch_sizes = []
+
+    def __call__(self, tasks, on_result=None):
+        self.batch_sizes.append(len(tasks))
+        return super().__call__(tasks, on_result)
+
+
+class GlobalOptimizerTestCase(unittest.TestCase):
+    opt_vars = {"x1": {"min": 0.2, "max": 3.0}, "x2": {"min": 0.5, "max": 2.0}}
+    constraints = {"ineq1": 0.0}
+
+    def setUp(self):
+        TwoBasinSolver.eval_count = 0
+        self.logging_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.logging_dir, ignore_errors=True)
+        self.config = OptimizationConfig(logging_dir=self.logging_dir, max_iter=100)
+
+    def make_task(self, x1: float = 2.8, x2: float = 1.5, solver_class=TwoBasinSolver) -> OptimizationTaskWithNormalization:
+        return OptimizationTaskWithNormalization(
+            SimpleVector(x1, x2),
+            "global",
+            OptConditions(dict(self.opt_vars), dict(self.constraints)),
+            solver_class(self.config),
+            self.config,
+        )
+
+    def assert_found_global_basin(self, result, places: int = 2):
+        self.assertAlmostEqual(result.var_values["x1"], 0.979, places=places)
+        self.assertAlmostEqual(result.var_values["x2"], 1.0, places=places)
+
+
+class TestMultiStartOptimizer(GlobalOptimizerTestCase):
+    def test_finds_global_basin_and_prunes_duplicates(self):
+        optimizer = MultiStartOptimizer(
+            self.make_task(), self.config, n_starts=8, seed=0, wave_size=2, basin_radius=0.1)
+        result = optimizer.run_optimization()
+        self.assert_found_global_basin(result)
+        info = result.metadata["multistart"]
+        self.assertEqual(info["distinct_optima"], 2)
+        self.assertGreater(info["skipped_starts"] + info["stopped_starts"], 0)
+
+    def test_user_starting_points(self):
+        optimizer = MultiStartOptimizer(
+            self.make_task(), self.config,
+            starting_points=[{"x1": 2.9, "x2": 1.0}, {"x1": 0.5, "x2": 1.0}],
+        )
+        result = optimizer.run_optimization()
+        self.assertEqual(result.metadata["multistart"]["best_start"], 1)
+        self.assert_found_global_basin(result)
+
+    def test_same_wave_sees_finished_optima_in_process(self):
+        optimizer = MultiStartOptimizer(
+            self.make_task(), self.config, wave_size=2, basin_radius=0.1,
+            starting_points=[{"x1": 2.9, "x2": 1.0}, {"x1": 2.8, "x2": 1.2}],
+        )
+        result = optimizer.run_optimization()
+        self.assertEqual(result.metadata["multistart"]["stopped_starts"], 1)
+        self.assertEqual(result.metadata["multistart"]["distinct_optima"], 1)
+
+    def test_process_executor_results_merge_into_shared_state(self):
+        pool = ProcessPoolExecutor(2)
+        self.addCleanup(pool.shutdown)
+        optimizer = MultiStartOptimizer(
+            self.make_task(), self.config, wave_size=2, basin_radius=0.1,
+            starting_points=[{"x1": 2.9, "x2": 1.0}, {"x1": 0.5, "x2": 1.0},
+                             {"x1": 2.8, "x2": 1.2}, {"x1": 0.4, "x2": 0.8}],
+        )
+        optimizer.set_executor(MultiprocessExecutorCF(pool, self.config))
+        result = optimizer.run_optimization()
+        self.assert_found_global_basin(result)
+        # Workers solved everything; their cache entries came back with the results
+        self.assertEqual(TwoBasinSolver.eval_count, 0)
+        self.assertGreater(len(optimizer.shared_cache), 4)
+        self.assertIs(optimizer.shared_cache, optimizer.optimized_object.solver.cache_map)
+        self.assertNotIn("solver_cache", result.metadata)
+        # Second-wave starts stopped on first-wave optima
+        self.assertEqual(result.metadata["multistart"]["stopped_starts"], 2)
+
+    def test_stopped_flag_does_not_leak_into_next_run(self):
+        optimizer = GradientOptimizer(self.make_task(2.9, 1.0), self.config)
+        optimizer.basin_radius = 0.1
+        optimizer.known_optima = [np.array([2.5, 1.0]) * optimizer.optimized_object.normalization_coefficients]
+        self.assertTrue(optimizer.run_optimization().metadata.get("stopped_in_known_basin"))
+        optimizer.known_optima = []
+        self.assertNotIn("stopped_in_known_basin", optimizer.run_optimization().metadata)
+
+
+class TestBatchEvaluator(GlobalOptimizerTestCase):
+    points = [[0.5, 1.0], [2.5, 1.0], [0.5, 1.0]]
+
+    def test_executor_path_solves_duplicates_once_and_fills_cache(self):
+        task = self.make_task()
+        evaluator = BatchEvaluator(task, self.config, ForLoopExecutor(self.config))
+        results = evaluator.evaluate(self.points)
+        self.assertEqual(evaluator.solves, 2)
+        self.assertIs(results[0], results[2])
+        self.assertAlmostEqual(results[1]["ineq1"], 0.0)
+        self.assertEqual(len(task.solver.cache_map), 2)
+
+        evaluator.evaluate(self.points[:2])
+        self.assertEqual(evaluator.solves, 2)
+
+    def test_solver_batch_api_preferred(self):
+        BatchTwoBasinSolver.batch_calls = 0
+        evaluator = BatchEvaluator(self.make_task(solver_class=BatchTwoBasinSolver), self.config,
+                                   ForLoopExecutor(self.config))
+        evaluator.evaluate(self.points)
+        self.assertEqual(BatchTwoBasinSolver.batch_calls, 1)
+
+
+class TestSurrogateOptimizer(GlobalOptimizerTestCase):
+    def test_converges_and_reuses_solver_cache(self):
+        task = self.make_task(1.5, 1.5)
+        result = SurrogateOptimizer(task, self.config, batch_size=4, seed=0).run_optimization()
+        self.assert_found_global_basin(result)
+        self.assertEqual(result.metadata["surrogate"]["solves"], TwoBasinSolver.eval_count)
+
+        TwoBasinSolver.eval_count = 0
+        rerun = SurrogateOptimizer(task, self.config, batch_size=4, seed=0, max_solves=4).run_optimization()
+        self.assertLessEqual(TwoBasinSolver.eval_count, 4)
+        self.assertGreater(rerun.metadata["surrogate"]["training_points"], 4)
+        self.assertLessEqual(rerun.objective, result.objective)
+
+    def test_no_solved_initial_design_gives_failed_result(self):
+        optimizer = SurrogateOptimizer(self.make_task(solver_class=AlwaysFailingSolver), self.config,
+                                       batch_size=4, seed=0)
+        result = optimizer.run_optimization()
+        self.assertEqual(result.optimizer_status, 1)
+        self.assertIsNone(result.var_values)
+
+
+class TestBayesianOptimizer(GlobalOptimizerTestCase):
+    def test_batch_rounds_find_global_basin(self):
+        optimizer = BayesianOptimizer(self.make_task(), self.config, batch_size=4, max_solves=24, seed=0)
+        result = optimizer.run_optimization()
+        self.assertEqual(TwoBasinSolver.eval_count, 24)
+        self.assertEqual(result.metadata["bayesian"]["rounds"], 5)
+        self.assert_found_global_basin(result, places=1)
+        self.assertGreaterEqual(result.constr_values["ineq1"], 0.0)
+
+    def test_no_solved_initial_design_gives_failed_result(self):
+        optimizer = BayesianOptimizer(self.make_task(solver_class=AlwaysFailingSolver), self.config,
+                                      batch_size=4, max_solves=12, seed=0)
+        result = optimizer.run_optimization()
+        self.assertEqual(result.optimizer_status, 1)
+        self.assertIsNone(result.var_values)
+
+
+class TestDifferentialEvolutionOptimizer(GlobalOptimizerTestCase):
+    def test_generations_dispatched_as_batches(self):
+        executor = RecordingExecutor(self.config)
+        optimizer = DifferentialEvolutionOptimizer(self.make_task(), self.config, popsize=8, seed=0)
+        optimizer.set_executor(executor)
+        result = optimizer.run_optimization()
+
+        self.assert_found_global_basin(result, places=1)
+        self.assertGreaterEqual(result.constr_values["ineq1"], 0.0)
+        # The start point, then one population of 8 * d per generation
+        self.assertEqual(executor.batch_sizes[0], 1)
+        self.assertEqual(max(executor.batch_sizes), 16)
+        self.assertEqual(len(executor.batch_sizes), result.metadata["differential_evolution"]["generations"] + 2)
+        self.assertEqual(sum(executor.batch_sizes), TwoBasinSolver.eval_count)
+
+    def test_failed_final_solve_gives_failed_result(self):
+        config = OptimizationConfig(logging_dir=self.logging_dir, max_iter=3)
+        optimizer = DifferentialEvolutionOptimizer(self.make_task(solver_class=AlwaysFailingSolver), config,
+                                                   popsize=4, seed=0)
+        result = optimizer.run_optimization()
+        self.assertEqual(result.optimizer_status, 1)
+        self.assertIsNone(result.var_values)
+
+
+class TestCMAESOptimizer(GlobalOptimizerTestCase):
+    def test_generations_dispatched_as_batches(self):
+        executor = RecordingExecutor(self.config)
+        optimizer = CMAESOptimizer(self.make_task(), self.config, popsize=8, sigma0=0.5, tol_x=1e-4, seed=0)
+        optimizer.set_executor(executor)
+        result = optimizer.run_optimization()
+
+        self.assert_found_global_basin(result)
+        self.assertGreaterEqual(result.constr_values["ineq1"], 0.0)
+        self.assertEqual(executor.batch_sizes[0], 1)
+        self.assertLessEqual(max(executor.batch_sizes), 8)
+        self.assertEqual(len(executor.batch_sizes), result.metadata["cmaes"]["generations"] + 1)
+
+    def test_failed_solves_rank_last(self):
+        executor = RecordingExecutor(self.config)
+        optimizer = CMAESOptimizer(self.make_task(x1=2.0, solver_class=FailingRegionSolver), self.config,
+                                   popsize=8, sigma0=0.5, tol_x=1e-4, seed=0)
+        optimizer.set_executor(executor)
+        result = optimizer.run_optimization()
+
+        self.assert_found_global_basin(result)
+        self.assertGreater(len(executor.batch_sizes), 1)
+
+    def test_respects_solve_budget(self):
+        optimizer = CMAESOptimizer(self.make_task(), self.config, popsize=6, max_solves=30, seed=1)
+        result = optimizer.run_optimization()
+        self.assertLessEqual(TwoBasinSolver.eval_count, 30 + 6)
+        self.assertEqual(result.metadata["cmaes"]["solves"], TwoBasinSolver.eval_count)
+
+
+class TestNSGA2Optimizer(GlobalOptimizerTestCase):
+    def test_mass_against_margin_front(self):
+        config = OptimizationConfig(logging_dir=self.logging_dir, max_iter=15)
+        executor = RecordingExecutor(config)
+        optimizer = NSGA2Optimizer(self.make_task(), config, objectives=["mass", "ineq1"], maximize=["ineq1"],
+                                   popsize=16, keep_models=True, seed=0)
+        optimizer.set_executor(executor)
+        result = optimizer.run_optimization()
+
+        archive = result.metadata["pareto"]
+        self.assertGreater(len(archive), 5)
+        self.assertEqual(archive.var_names, ["x1", "x2"])
+        self.assertEqual(len(archive.models), len(archive))
+        self.assertTrue(np.all(archive.margins >= 0))
+        # Mass grows along the front while the margin grows with it: no design dominates another
+        self.assertTrue(np.all(np.diff(archive.objectives[:, 0]) > 0))
+        self.assertTrue(np.all(np.diff(archive.objectives[:, 1]) > 0))
+        self.assertAlmostEqual(result.objective, archive.objectives[0, 0])
+        # One batch per generation; children equal to known designs are not solved again
+        self.assertEqual(len(executor.batch_sizes), 16)
+        self.assertLessEqual(max(executor.batch_sizes), 16)
+        self.assertEqual(sum(executor.batch_sizes), TwoBasinSolver.eval_count)
+
+    def test_unknown_maximize_key(self):
+        with self.assertRaises(ValueError):
+            NSGA2Optimizer(self.make_task(), self.config, objectives=["mass"], maximize=["cost"])
+
+    def test_all_solves_failed_gives_failed_result(self):
+        config = OptimizationConfig(logging_dir=self.logging_dir, max_iter=2)
+        optimizer = NSGA2Optimizer(self.make_task(solver_class=AlwaysFailingSolver), config,
+                                   objectives=["mass", "ineq1"], popsize=8, seed=0)
+        result = optimizer.run_optimization()
+        self.assertEqual(result.optimizer_status, 1)
+        self.assertIsNone(result.var_values)
+
+
+if __name__ == "__main__":
+    unittest.main()
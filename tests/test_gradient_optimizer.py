@@ -0,0 +1,279 @@
+"""Tests for GradientOptimizer."""
+
+from __future__ import annotations
+
+import json
+import os
+import pickle
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+from scipy.optimize import approx_fprime
+
+from optimization_tools.abstract_object import CachableObject
+from optimization_tools.abstract_solver import AbstractSolver, CachableSolver
+from optimization_tools.config import OptimizationConfig
+from optimization_tools.gradients import SolverGradients
+from optimization_tools.history import OptimizationHistory
+from optimization_tools.opt_conditions import OptConditions
+from optimization_tools.optimization_executors import ForLoopExecutor
+from optimization_tools.optimizers.cobyla_optimizer import COBYLAOptimizer
+from optimization_tools.optimizers.gradient_optimizer import (
+    GradientOptimizer,
+    OptimizationTaskWithNormalization,
+)
+
+
+class SimpleVector(CachableObject):
+    def __init__(self, x1: float, x2: float) -> None:
+        super().__init__()
+        self.x1 = x1
+        self.x2 = x2
+
+
+class RosenSolver(CachableSolver):
+    eval_count = 0
+
+    def non_cached_calculation(self, calc_task: SimpleVector, unique_id: str):
+        RosenSolver.eval_count += 1
+        mass = 100.0 * (calc_task.x2 - calc_task.x1**2) ** 2 + (1 - calc_task.x1) ** 2
+        return {
+            "ineq1": 1 - calc_task.x1 - 2 * calc_task.x2,
+            "ineq2": 1 - calc_task.x1**2 - calc_task.x2,
+            "mass": mass,
+            "objective": mass,
+        }
+
+    def configure(self, configure_dict):
+        return None
+
+
+class PlainRosenSolver(AbstractSolver):
+    """Solver without its own cache: every solve() call is a full evaluation."""
+
+    solved_signatures: list = []
+
+    def solve(self, calc_task: SimpleVector, unique_id: str, res_type: str | None):
+        PlainRosenSolver.solved_signatures.append(calc_task.signature())
+        results = RosenSolver.non_cached_calculation(self, calc_task, unique_id)
+        return results if res_type is None else results[res_type]
+
+    def configure(self, configure_dict):
+        return None
+
+
+class AnalyticRosenSolver(PlainRosenSolver):
+    """Rosenbrock solver that also returns exact sensitivities."""
+
+    def solve_with_gradients(self, calc_task: SimpleVector, unique_id: str, var_names: list):
+        results = self.solve(calc_task, unique_id, None)
+        x1, x2 = calc_task.x1, calc_task.x2
+        mass = {"x1": -400.0 * x1 * (x2 - x1**2) - 2 * (1 - x1), "x2": 200.0 * (x2 - x1**2)}
+        gradients = {
+            "objective": mass,
+            "mass": mass,
+            "ineq1": {"x1": -1.0, "x2": -2.0},
+            "ineq2": {"x1": -2 * x1, "x2": -1.0},
+        }
+        return results, {key: [value[name] for name in var_names] for key, value in gradients.items()}
+
+
+class GradientTestCase(unittest.TestCase):
+    opt_vars = {"x1": {"min": 0.0, "max": 1.0}, "x2": {"min": -0.5, "max": 2.0}}
+    constraints = {"ineq1": 0.0, "ineq2": 0.0}
+
+    def setUp(self):
+        RosenSolver.eval_count = 0
+        self.logging_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.logging_dir, ignore_errors=True)
+
+    def make_optimizer(self, solver_class=RosenSolver, optimizer_class=GradientOptimizer,
+                       **config_kwargs) -> GradientOptimizer:
+        config_kwargs.setdefault("max_iter", 100)
+        config = OptimizationConfig(logging_dir=self.logging_dir, **config_kwargs)
+        task = OptimizationTaskWithNormalization(
+            SimpleVector(0.4, 0.1),
+            "rosen",
+            OptConditions(dict(self.opt_vars), dict(self.constraints)),
+            solver_class(config),
+            config,
+        )
+        return optimizer_class(task, config)
+
+
+class TestGradientCheckpoint(GradientTestCase):
+    def test_warm_restart_continues_from_checkpoint(self):
+        reference = self.make_optimizer().run_optimization()
+
+        interrupted = self.make_optimizer(max_iter=2, checkpoint_every=1).run_optimization()
+        self.assertGreaterEqual(len(interrupted.history), 1)
+
+        optimizer = self.make_optimizer(resume_from_checkpoint=True)
+        RosenSolver.eval_count = 0
+        resumed = optimizer.run_optimization()
+        self.assertGreater(len(resumed.history), len(interrupted.history))
+        self.assertEqual(resumed.history[: len(interrupted.history)], list(interrupted.history))
+        self.assertAlmostEqual(resumed.objective, reference.objective, places=4)
+
+    def test_checkpoint_prewarms_solver_cache(self):
+        self.make_optimizer(max_iter=2, checkpoint_every=1, num_proc=2).run_optimization()
+        optimizer = self.make_optimizer(resume_from_checkpoint=True, num_proc=2)
+        state = optimizer._load_checkpoint()
+        self.assertIsNotNone(state)
+        self.assertIsNotNone(state["fd_memo"])
+        self.assertGreater(len(optimizer.optimized_object.solver.cache_map), 0)
+
+    def test_checkpoints_append_only_new_cache_entries(self):
+        optimizer = self.make_optimizer(max_iter=4, checkpoint_every=1)
+        optimizer.run_optimization()
+        checkpoint = optimizer._checkpoint()
+        self.assertNotIn("solver_cache", checkpoint.load())
+        records = []
+        with open(checkpoint.cache_path, "rb") as f:
+            while True:
+                try:
+                    records.append(pickle.load(f))
+                except EOFError:
+                    break
+        self.assertGreater(len(records), 1)
+        written = [signature for record in records for signature in record]
+        self.assertEqual(len(written), len(set(written)))
+        self.assertLessEqual(set(written), set(optimizer.optimized_object.solver.cache_map))
+        self.assertEqual(checkpoint.load_cache().keys(), set(written))
+
+
+class TestEvaluationLedger(GradientTestCase):
+    def test_each_design_is_solved_once_without_solver_cache(self):
+        for config_kwargs in ({}, {"num_proc": 2, "parallel_fd": True}):
+            with self.subTest(**config_kwargs):
+                PlainRosenSolver.solved_signatures = []
+                optimizer = self.make_optimizer(PlainRosenSolver, **config_kwargs)
+                result = optimizer.run_optimization()
+                solved = PlainRosenSolver.solved_signatures
+                self.assertEqual(len(solved), len(set(solved)))
+                self.assertGreater(optimizer.optimized_object.ledger.hits, 0)
+                self.assertAlmostEqual(result.objective, 0.2489, places=3)
+
+
+class TestAdaptiveFDStep(GradientTestCase):
+    def test_serial_and_parallel_probes_agree(self):
+        steps = []
+        for config_kwargs in ({}, {"num_proc": 2, "parallel_fd": True}):
+            with self.subTest(**config_kwargs):
+                optimizer = self.make_optimizer(finite_diff_rel_step="adaptive", **config_kwargs)
+                result = optimizer.run_optimization()
+                steps.append(result.metadata["fd_rel_step"])
+                self.assertAlmostEqual(result.objective, 0.2489, places=3)
+        # Rosenbrock is exactly quadratic in x2, so the largest step is as good as any
+        self.assertEqual(steps[0], steps[1])
+        self.assertEqual(steps[0]["x2"], 0.1)
+
+    def test_probe_is_kept_in_checkpoint(self):
+        self.make_optimizer(finite_diff_rel_step="adaptive", max_iter=2, checkpoint_every=1).run_optimization()
+        optimizer = self.make_optimizer(finite_diff_rel_step="adaptive", resume_from_checkpoint=True)
+        state = optimizer._load_checkpoint()
+        self.assertIsNotNone(state["adaptive_rel_step"])
+        RosenSolver.eval_count = 0
+        result = optimizer.run_optimization()
+        np.testing.assert_array_equal(list(result.metadata["fd_rel_step"].values()), state["adaptive_rel_step"])
+
+
+class TestSolverGradients(GradientTestCase):
+    def test_one_solve_per_point_with_solver_gradients(self):
+        PlainRosenSolver.solved_signatures = []
+        optimizer = self.make_optimizer(AnalyticRosenSolver)
+        result = optimizer.run_optimization()
+        solved = PlainRosenSolver.solved_signatures
+        self.assertEqual(len(solved), len(set(solved)))
+        self.assertAlmostEqual(result.objective, 0.2489, places=3)
+
+        PlainRosenSolver.solved_signatures = []
+        self.make_optimizer(AnalyticRosenSolver, analytic_gradients=False).run_optimization()
+        self.assertLess(len(solved), len(PlainRosenSolver.solved_signatures) / 2)
+
+    def test_chain_rule_matches_finite_differences(self):
+        optimizer = self.make_optimizer(AnalyticRosenSolver)
+        task = optimizer.optimized_object
+        task.cost_function_normalization = 2.0
+        task.cons[0]["fun"].limit = 0.5
+        gradients = SolverGradients(task)
+        x_norm = np.array([0.7, 0.4])
+        np.testing.assert_allclose(
+            gradients.objective_jac(x_norm), approx_fprime(x_norm, task.objective, 1e-7), rtol=1e-5)
+        for index, constraint in enumerate(task.cons):
+            np.testing.assert_allclose(
+                gradients.make_constraint_jac(index)(x_norm),
+                approx_fprime(x_norm, constraint["fun"], 1e-7), rtol=1e-5, atol=1e-6)
+
+
+class TestCOBYLAOptimizer(GradientTestCase):
+    def test_objective_and_constraints_share_one_solve(self):
+        PlainRosenSolver.solved_signatures = []
+        optimizer = self.make_optimizer(PlainRosenSolver, COBYLAOptimizer, max_iter=500)
+        result = optimizer.run_optimization()
+        solved = PlainRosenSolver.solved_signatures
+        self.assertEqual(len(solved), len(set(solved)))
+        self.assertEqual(result.metadata["cobyla"]["solves"], len(solved))
+        self.assertAlmostEqual(result.objective, 0.2489, places=2)
+        self.assertGreaterEqual(result.constr_values["ineq2"], -1e-3)
+
+    def test_initial_simplex_is_one_batch(self):
+        optimizer = self.make_optimizer(optimizer_class=COBYLAOptimizer, max_iter=500)
+        batches = []
+
+        def executor(tasks, on_result=None):
+            batches.append(len(tasks))
+            return ForLoopExecutor(optimizer.config)(tasks, on_result)
+
+        optimizer.set_executor(executor)
+        result = optimizer.run_optimization()
+        self.assertEqual(batches, [3])
+        # Start point and both simplex steps are served from the ledger
+        self.assertGreaterEqual(optimizer.optimized_object.ledger.hits, 3)
+        self.assertAlmostEqual(result.objective, 0.2489, places=2)
+
+
+class TestOptimizationHistory(GradientTestCase):
+    def test_columnar_queries_match_records(self):
+        history = OptimizationHistory(initial_capacity=2)
+        limits = {"ineq1": 0.0}
+        rows = [
+            ({"x1": 0.1}, {"ineq1": -0.5, "objective": 1.0}),
+            ({"x1": 0.2}, {"ineq1": 0.5, "objective": 3.0}),
+            ({"x1": 0.3}, {"ineq1": 0.1, "objective": 2.0, "extra": 7.0}),
+            ({"x1": 0.4}, {"ineq1": -0.1, "objective": 0.5}),
+        ]
+        for vars_dict, results in rows:
+            history.append(vars_dict, results)
+        self.assertEqual(len(history), 4)
+        np.testing.assert_array_equal(history.feasible_mask(limits), [False, True, True, False])
+        self.assertEqual(history.best_feasible_index(limits), 2)
+        self.assertEqual(history.last_feasible_index(limits), 2)
+        self.assertEqual(history[0], {"vars": {"x1": 0.1}, "constraints": {"ineq1": -0.5, "objective": 1.0}})
+        self.assertEqual(history[2]["constraints"]["extra"], 7.0)
+        np.testing.assert_array_equal(history.iteration, [1, 2, 3, 4])
+
+    def test_run_dumps_history_npz(self):
+        optimizer = self.make_optimizer()
+        result = optimizer.run_optimization()
+        path = os.path.join(self.logging_dir, "rosen", "history.npz")
+        restored = OptimizationHistory.load_npz(path)
+        self.assertEqual(len(restored), len(result.history))
+        np.testing.assert_allclose(restored.x, result.history.x)
+        self.assertEqual(restored.var_names, ["x1", "x2"])
+
+    def test_task_history_type_and_list_records(self):
+        optimizer = self.make_optimizer()
+        self.assertIsInstance(optimizer.optimized_object.history, OptimizationHistory)
+        result = optimizer.run_optimization()
+        self.assertIs(optimizer.optimized_object.history, result.history)
+        records = result.history.records()
+        self.assertIsInstance(records, list)
+        self.assertEqual(records, list(result.history))
+        self.assertEqual(json.loads(json.dumps(records)), records)
+
+
+if __name__ == "__main__":
+    unittest.main()
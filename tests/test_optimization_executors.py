@@ -0,0 +1,392 @@
+"""Tests for optimization executors."""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import pickle
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from types import SimpleNamespace
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from unittest import mock
+
+from pathos.multiprocessing import ProcessingPool
+
+from optimization_tools import optimization_executors
+from optimization_tools.abstract_object import CachableObject
+from optimization_tools.abstract_solver import AsyncSubprocessSolver
+from optimization_tools.batch_evaluation import BatchEvaluator
+from optimization_tools.config import OptimizationConfig
+from optimization_tools.exceptions import SolverError
+from optimization_tools.opt_conditions import OptConditions
+from optimization_tools.optimization_executors import (
+    AsyncioExecutor,
+    ForLoopExecutor,
+    MultiprocessExecutor,
+    MultiprocessExecutorCF,
+    OptimizationBatch,
+    RabbitExecutor,
+    RetryPolicy,
+    WorkerCrashError,
+    handle_rpc_request,
+)
+from optimization_tools.optimizers.gradient_optimizer import OptimizationTaskWithNormalization
+
+
+class SquareTask:
+    """Minimal optimizer stand-in: run_optimization returns x**2."""
+
+    def __init__(self, x: float) -> None:
+        self.x = x
+
+    def run_optimization(self, **kwargs):
+        return self.x * self.x
+
+
+class FlakyTask(SquareTask):
+    """Raises on the first `failures` runs of this instance."""
+
+    def __init__(self, x: float, failures: int) -> None:
+        super().__init__(x)
+        self.failures = failures
+
+    def run_optimization(self, **kwargs):
+        if self.failures > 0:
+            self.failures -= 1
+            raise ValueError("bad design")
+        return super().run_optimization()
+
+
+class ConfigurableSquareTask(SquareTask):
+    """SquareTask with the attributes run_single_optimization sets from config_dict."""
+
+    def __init__(self, x: float) -> None:
+        super().__init__(x)
+        self.config = None
+        self.optimized_object = SimpleNamespace(config=None, solver=SimpleNamespace(config=None))
+
+
+class CrashOnceTask(ConfigurableSquareTask):
+    """Kills its worker process the first time it runs (marker file on disk)."""
+
+    def __init__(self, x: float, marker_path: str) -> None:
+        super().__init__(x)
+        self.marker_path = marker_path
+
+    def run_optimization(self, **kwargs):
+        if not os.path.exists(self.marker_path):
+            with open(self.marker_path, "w", encoding="utf-8") as f:
+                f.write("crashed")
+            os._exit(1)
+        return super().run_optimization()
+
+
+class SlowSquareTask(ConfigurableSquareTask):
+    def __init__(self, x: float, seconds: float) -> None:
+        super().__init__(x)
+        self.seconds = seconds
+
+    def run_optimization(self, **kwargs):
+        time.sleep(self.seconds)
+        return super().run_optimization()
+
+
+class SleepyAsyncTask(SquareTask):
+    """Async task that records how many of its kind run at once and on which thread."""
+    running = 0
+    peak = 0
+    threads: set = set()
+
+    async def run_optimization_async(self, **kwargs):
+        SleepyAsyncTask.running += 1
+        SleepyAsyncTask.peak = max(SleepyAsyncTask.peak, SleepyAsyncTask.running)
+        SleepyAsyncTask.threads.add(threading.get_ident())
+        await asyncio.sleep(0.02)
+        SleepyAsyncTask.running -= 1
+        return self.run_optimization()
+
+
+class Point(CachableObject):
+    def __init__(self, x1: float, x2: float) -> None:
+        super().__init__()
+        self.x1 = x1
+        self.x2 = x2
+
+
+class PythonSquareSolver(AsyncSubprocessSolver):
+    """External 'solver': a Python child process printing x1**2 + x2**2."""
+
+    def make_command(self, calc_task, unique_id):
+        return [sys.executable, "-c", f"print({calc_task.x1!r} ** 2 + {calc_task.x2!r} ** 2)"]
+
+    def read_results(self, calc_task, unique_id, stdout):
+        value = float(stdout.decode())
+        return {"objective": value, "margin": 10.0 - value}
+
+    def configure(self, configure_dict):
+        return None
+
+
+class HangingSolver(PythonSquareSolver):
+    def make_command(self, calc_task, unique_id):
+        return [sys.executable, "-c", "import time; time.sleep(30)"]
+
+
+class FakeCluster:
+    """Emulates the RPC round-trip: pickle the message and run it like a worker."""
+
+    def __init__(self) -> None:
+        self.messages: list[int] = []
+
+    def __call__(self, task):
+        self.messages.append(len(task) if isinstance(task, OptimizationBatch) else 1)
+        response = handle_rpc_request(pickle.dumps(task))
+        return pickle.loads(response)
+
+
+class TestOptimizationBatch(unittest.TestCase):
+    def test_batch_runs_serially(self):
+        batch = OptimizationBatch([SquareTask(x) for x in range(4)])
+        self.assertEqual(batch.run_optimization(), [0, 1, 4, 9])
+
+    def test_batch_runs_in_worker_processes(self):
+        batch = OptimizationBatch([SquareTask(x) for x in range(5)], max_workers=2)
+        self.assertEqual(batch.run_optimization(), [0, 1, 4, 9, 16])
+
+
+class TestRabbitExecutorBatching(unittest.TestCase):
+    def setUp(self):
+        self.cluster = FakeCluster()
+        patcher = mock.patch.object(
+            optimization_executors,
+            "run_single_optimization_on_cluster",
+            self.cluster,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.pool = ThreadPoolExecutor(2)
+        self.addCleanup(self.pool.shutdown)
+
+    def test_default_sends_one_task_per_message(self):
+        executor = RabbitExecutor(self.pool)
+        self.assertEqual(executor([SquareTask(x) for x in range(3)]), [0, 1, 4])
+        self.assertEqual(self.cluster.messages, [1, 1, 1])
+
+    def test_batch_size_packs_tasks_and_keeps_order(self):
+        executor = RabbitExecutor(self.pool, batch_size=4)
+        result = executor([SquareTask(x) for x in range(10)])
+        self.assertEqual(result, [x * x for x in range(10)])
+        self.assertEqual(sorted(self.cluster.messages), [2, 4, 4])
+
+    def test_target_duration_probes_then_batches(self):
+        executor = RabbitExecutor(self.pool, target_batch_duration=1e9)
+        result = executor([SquareTask(x) for x in range(6)])
+        self.assertEqual(result, [x * x for x in range(6)])
+        self.assertEqual(self.cluster.messages, [1, 5])
+
+
+class BarrierTask(SquareTask):
+    """Blocks its thread until all tasks sharing the barrier run at once."""
+
+    def __init__(self, x: float, barrier: threading.Barrier) -> None:
+        super().__init__(x)
+        self.barrier = barrier
+
+    def run_optimization(self, **kwargs):
+        self.barrier.wait()
+        return super().run_optimization(**kwargs)
+
+
+class TestCompletionOrder(unittest.TestCase):
+    """on_result follows task completion, so a slow first task holds nothing back."""
+
+    def tasks(self):
+        return [SlowSquareTask(1, 0.5), SlowSquareTask(2, 0.0), SlowSquareTask(3, 0.0)]
+
+    def assert_head_reported_last(self, executor):
+        seen = []
+        self.assertEqual(executor(self.tasks(), on_result=lambda index, result: seen.append(index)), [1, 4, 9])
+        self.assertEqual(sorted(seen), [0, 1, 2])
+        self.assertEqual(seen[-1], 0)
+
+    def test_thread_executor(self):
+        with ThreadPoolExecutor(3) as pool:
+            self.assert_head_reported_last(optimization_executors.ThreadExecutor(pool))
+
+    def test_process_executor_with_retry_policy(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            config = OptimizationConfig(num_proc=2, logging_dir=tmp)
+            with MultiprocessExecutorCF(config=config, retry_policy=RetryPolicy()) as executor:
+                self.assert_head_reported_last(executor)
+
+    def test_own_process_pool_is_kept_until_closed(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            executor = MultiprocessExecutorCF(config=OptimizationConfig(num_proc=2, logging_dir=tmp))
+            pool = executor.pool
+            self.assertEqual(executor([ConfigurableSquareTask(2)]), [4])
+            self.assertEqual(executor([ConfigurableSquareTask(3)]), [9])
+            self.assertIs(executor.pool, pool)
+            executor.close()
+            with self.assertRaises(RuntimeError):
+                pool.submit(abs, -1)
+            self.assertEqual(executor([ConfigurableSquareTask(4)]), [16])
+            self.assertIsNot(executor.pool, pool)
+            executor.close()
+
+    def test_pathos_executor(self):
+        pool = ProcessingPool(2)
+        self.addCleanup(pool.clear)
+        self.addCleanup(pool.terminate)
+        executor = MultiprocessExecutor(pool)
+        executor.poll_interval = 0.05
+        self.assert_head_reported_last(executor)
+
+
+class TestRetryPolicy(unittest.TestCase):
+    def test_default_propagates_task_errors(self):
+        with self.assertRaises(ValueError):
+            ForLoopExecutor(None)([FlakyTask(1, failures=1)])
+
+    def test_retry_recovers_flaky_task(self):
+        executor = ForLoopExecutor(None, retry_policy=RetryPolicy(max_retries=1))
+        self.assertEqual(executor([SquareTask(2), FlakyTask(3, failures=1)]), [4, 9])
+        self.assertEqual(executor.failures, [])
+
+    def test_exhausted_retries_give_partial_results(self):
+        executor = ForLoopExecutor(None, retry_policy=RetryPolicy(max_retries=1))
+        result = executor([SquareTask(2), FlakyTask(3, failures=5), SquareTask(4)])
+        self.assertEqual(result, [4, None, 16])
+        self.assertEqual(len(executor.failures), 1)
+        failure = executor.failures[0]
+        self.assertEqual(failure.task_index, 1)
+        self.assertEqual(failure.attempts, 2)
+        self.assertIn("bad design", failure.error)
+
+    def test_failures_are_per_executor(self):
+        failing = ForLoopExecutor(None, retry_policy=RetryPolicy())
+        failing([FlakyTask(3, failures=1)])
+        fresh = ForLoopExecutor(None)
+        self.assertEqual(len(failing.failures), 1)
+        self.assertEqual(fresh.failures, [])
+        self.assertIsNot(fresh.failures, ForLoopExecutor(None).failures)
+
+    def test_worker_crash_is_retried_on_fresh_pool(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            config = OptimizationConfig(num_proc=2, logging_dir=tmp)
+            executor = MultiprocessExecutorCF(
+                config=config,
+                retry_policy=RetryPolicy(max_retries=2),
+            )
+            self.addCleanup(executor.close)
+            tasks = [ConfigurableSquareTask(2), CrashOnceTask(3, os.path.join(tmp, "crash.marker"))]
+            self.assertEqual(executor(tasks), [4, 9])
+            self.assertEqual(executor.failures, [])
+
+    def test_crashes_are_charged_only_to_the_lost_chunk(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            config = OptimizationConfig(num_proc=2, logging_dir=tmp)
+            executor = MultiprocessExecutorCF(config=config, retry_policy=RetryPolicy(max_retries=1))
+            self.addCleanup(executor.close)
+            # Two crashes in a row; the slow healthy tasks are lost with the pool both times
+            tasks = [
+                CrashOnceTask(1, os.path.join(tmp, "first.marker")),
+                SlowSquareTask(2, 0.3),
+                SlowSquareTask(3, 1.0),
+                CrashOnceTask(4, os.path.join(tmp, "second.marker")),
+            ]
+            self.assertEqual(executor(tasks), [1, 4, 9, 16])
+            self.assertEqual(executor.failures, [])
+
+    def test_worker_crash_in_caller_pool_is_not_restarted(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            config = OptimizationConfig(num_proc=2, logging_dir=tmp)
+            pool = ProcessPoolExecutor(2)
+            self.addCleanup(pool.shutdown)
+            executor = MultiprocessExecutorCF(pool, config, retry_policy=RetryPolicy(max_retries=2))
+            with self.assertRaises(WorkerCrashError):
+                executor([CrashOnceTask(3, os.path.join(tmp, "crash.marker"))])
+            self.assertIs(executor.pool, pool)
+
+    def make_pathos_executor(self, **kwargs) -> MultiprocessExecutor:
+        pool = ProcessingPool(2)
+        self.addCleanup(pool.clear)
+        self.addCleanup(pool.terminate)
+        executor = MultiprocessExecutor(pool, **kwargs)
+        executor.poll_interval = 0.05
+        return executor
+
+    def test_pathos_worker_crash_is_retried_on_fresh_pool(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            executor = self.make_pathos_executor(retry_policy=RetryPolicy(max_retries=2))
+            tasks = [SquareTask(2), CrashOnceTask(3, os.path.join(tmp, "crash.marker")), SquareTask(4)]
+            self.assertEqual(executor(tasks), [4, 9, 16])
+            self.assertEqual(executor.failures, [])
+
+    def test_pathos_worker_crash_without_policy_raises(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            executor = self.make_pathos_executor()
+            with self.assertRaises(WorkerCrashError):
+                executor([CrashOnceTask(3, os.path.join(tmp, "crash.marker"))])
+
+
+class TestAsyncioExecutor(unittest.TestCase):
+    def setUp(self):
+        SleepyAsyncTask.running = 0
+        SleepyAsyncTask.peak = 0
+        SleepyAsyncTask.threads = set()
+
+    def test_concurrency_limit_on_a_single_thread(self):
+        executor = AsyncioExecutor(max_concurrency=3)
+        seen = []
+        result = executor([SleepyAsyncTask(x) for x in range(12)], on_result=lambda i, r: seen.append(i))
+        self.assertEqual(result, [x * x for x in range(12)])
+        self.assertEqual(sorted(seen), list(range(12)))
+        self.assertEqual(SleepyAsyncTask.peak, 3)
+        self.assertEqual(SleepyAsyncTask.threads, {threading.get_ident()})
+
+    def test_sync_tasks_and_retries(self):
+        executor = AsyncioExecutor(max_concurrency=2, retry_policy=RetryPolicy(max_retries=1))
+        result = executor([SquareTask(2), FlakyTask(3, failures=1), FlakyTask(4, failures=5)])
+        self.assertEqual(result, [4, 9, None])
+        self.assertEqual([(f.task_index, f.attempts) for f in executor.failures], [(2, 2)])
+        with self.assertRaises(ValueError):
+            AsyncioExecutor(max_concurrency=2)([FlakyTask(1, failures=1)])
+
+    def test_sync_tasks_are_not_capped_by_default_thread_pool(self):
+        # The standard default executor has at most 32 threads
+        barrier = threading.Barrier(40, timeout=10)
+        result = AsyncioExecutor(max_concurrency=40)([BarrierTask(x, barrier) for x in range(40)])
+        self.assertEqual(result, [x * x for x in range(40)])
+
+    def test_subprocess_solver_batch(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            config = OptimizationConfig(num_proc=4, logging_dir=tmp, calculation_dir=tmp)
+            task = OptimizationTaskWithNormalization(
+                Point(1.0, 1.0), "async_batch",
+                OptConditions({"x1": {"min": 0.0, "max": 3.0}, "x2": {"min": 0.0, "max": 3.0}}, {"margin": 0.0}),
+                PythonSquareSolver(config), config,
+            )
+            evaluator = BatchEvaluator(task, config, AsyncioExecutor(config=config))
+            points = [[0.5 * i, 1.0] for i in range(6)]
+            results = evaluator.evaluate(points + points[:2])
+            self.assertEqual([r["objective"] for r in results],
+                             [x1 ** 2 + x2 ** 2 for x1, x2 in points + points[:2]])
+            self.assertEqual(evaluator.solves, 6)
+
+    def test_timeout_kills_the_process(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            config = OptimizationConfig(single_fem_task_timeout=0.3, logging_dir=tmp, calculation_dir=tmp)
+            solver = HangingSolver(config)
+            started = time.perf_counter()
+            with self.assertRaises(SolverError):
+                asyncio.run(solver.solve_async(Point(1.0, 2.0), "hang"))
+            self.assertLess(time.perf_counter() - started, 10.0)
+            self.assertEqual(solver.cache_map, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -4,6 +4,9 @@ from __future__ import annotations
 
 import copy
 import pickle
+import shutil
+import tempfile
+import threading
 import unittest
 
 import numpy as np
@@ -11,6 +14,7 @@ import numpy as np
 from optimization_tools.abstract_object import CachableObject
 from optimization_tools.abstract_solver import CachableSolver
 from optimization_tools.config import OptimizationConfig
+from optimization_tools.fd_steps import DEFAULT_STEP_LADDER, adaptive_rel_steps, probe_points
 from optimization_tools.opt_conditions import OptConditions
 from optimization_tools.optimizers.gradient_optimizer import (
     GradientOptimizer,
@@ -23,6 +27,7 @@ from optimization_tools.parallel_fd import (
     _invalidate_task_eval_cache,
     clip_to_bounds,
     collect_fd_stencil_points,
+    complex_step_points,
     model_at_x_norm,
 )
 from scipy.optimize import Bounds
@@ -56,6 +61,22 @@ class RosenSolver(CachableSolver):
         return None
 
 
+class ComplexRosenSolver(RosenSolver):
+    complex_step_safe = True
+
+
+class WorkdirRosenSolver(RosenSolver):
+    """Needs isolated clones (like a solver with per-worker work directories)."""
+
+    def on_parallel_clone(self, worker_tag: str) -> None:
+        self.worker_tag = worker_tag
+        self.solve_threads = set()
+
+    def non_cached_calculation(self, calc_task, unique_id):
+        getattr(self, "solve_threads", set()).add(threading.get_ident())
+        return super().non_cached_calculation(calc_task, unique_id)
+
+
 class EvalCacheConstraint:
     def __init__(self, task, parameter: str, limit: float) -> None:
         self.task = task
@@ -206,6 +227,20 @@ class TestParallelFD(unittest.TestCase):
         fd.prefill(x_bad)
         self.assertGreater(len(fd._fd_cache_map), 0)
 
+    def test_stencil_and_trial_points_share_the_ledger(self):
+        stencil = collect_fd_stencil_points(self.x0, 0.01, self.bounds)
+        self.task.objective(stencil[0])
+        fd = ParallelFiniteDifferences(self.task, self.config, 0.01, self.bounds)
+        fd.prefill(self.x0)
+        ledger = self.task.ledger
+        # Center and the stencil points, minus the one the objective already solved
+        self.assertEqual(ledger.misses, len(_dedupe_points([self.x0] + stencil)))
+        misses = ledger.misses
+        for point in stencil:
+            self.task.objective(point)
+        self.assertEqual(ledger.misses, misses)
+        self.assertGreaterEqual(ledger.hits, len(stencil))
+
 
 class TestParallelFDEvalCache(unittest.TestCase):
     def setUp(self):
@@ -248,7 +283,7 @@ class TestParallelFDEvalCache(unittest.TestCase):
         task.cost_function_normalization = 1.0
         return task
 
-    def test_prefill_invalidates_stale_eval_cache(self):
+    def test_prefill_refreshes_stale_center_and_keeps_eval_cache(self):
         task = self._make_task(num_proc=1)
         task.objective(self.x0)
         fd = ParallelFiniteDifferences(task, task.config, 0.01, self.bounds)
@@ -264,7 +299,8 @@ class TestParallelFDEvalCache(unittest.TestCase):
 
         fd._prefill_memo_key = None
         fd.prefill(self.x0)
-        self.assertIsNone(task._eval_cache_results)
+        # Stencil results share the ledger, the task eval cache is not dropped
+        self.assertIsNotNone(task._eval_cache_results)
 
         constraint_fun = fd._constraint_fun(0)
         self.assertAlmostEqual(constraint_fun(self.x0), original_value)
@@ -425,5 +461,160 @@ class TestParallelFDEvalCache(unittest.TestCase):
             self.assertEqual(jac.shape, (2,))
 
 
+
+class RosenTaskFactory:
+    """Fresh Rosenbrock tasks with their own logging dir."""
+
+    def setUp(self):
+        RosenSolver.eval_count = 0
+        self.logging_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.logging_dir, ignore_errors=True)
+
+    def make_task(self, solver_class=ComplexRosenSolver, **config_kwargs) -> OptimizationTaskWithNormalization:
+        config = OptimizationConfig(logging_dir=self.logging_dir, calculation_dir=self.logging_dir,
+                                    max_iter=100, **config_kwargs)
+        model = SimpleVector(0.4, 0.1)
+        model.cache_signature_fields = ("x1", "x2")
+        task = OptimizationTaskWithNormalization(
+            model,
+            "rosen_complex_step",
+            OptConditions({"x1": {"min": 0.0, "max": 1.0}, "x2": {"min": -0.5, "max": 2.0}},
+                          {"ineq1": 0.0, "ineq2": 0.0}),
+            solver_class(config),
+            config,
+        )
+        task.cost_function_normalization = 1.0
+        return task
+
+    @staticmethod
+    def bounds_of(task) -> Bounds:
+        return Bounds(
+            [b * coeff for b, coeff in zip(task.lower_bounds, task.normalization_coefficients)],
+            [b * coeff for b, coeff in zip(task.upper_bounds, task.normalization_coefficients)],
+        )
+
+
+class TestComplexStep(RosenTaskFactory, unittest.TestCase):
+    def test_points_are_imaginary_perturbations(self):
+        points = complex_step_points(np.array([0.8, 0.1]), 1e-20)
+        self.assertEqual(len(points), 2)
+        np.testing.assert_array_equal(points[0].real, [0.8, 0.1])
+        np.testing.assert_array_equal(points[1].imag, [0.0, 1e-20])
+
+    def test_jacobians_are_exact_with_one_solve_per_variable(self):
+        task = self.make_task()
+        x0 = np.array([0.8, 0.16])
+        x1, x2 = x0 * task.denorm_coefficients
+        fd = ParallelFiniteDifferences(task, task.config, 0.01, self.bounds_of(task), method="cs")
+        grad = fd.objective_jac(x0)
+        ineq2_jac = fd.make_constraint_jac(1)(x0)
+        expected = np.array([-400 * x1 * (x2 - x1**2) - 2 * (1 - x1), 200 * (x2 - x1**2)])
+        np.testing.assert_allclose(grad, expected * task.denorm_coefficients, rtol=1e-14)
+        np.testing.assert_allclose(ineq2_jac, np.array([-2 * x1, -1.0]) * task.denorm_coefficients, rtol=1e-14)
+        # Center plus one complex point per variable
+        self.assertEqual(RosenSolver.eval_count, 3)
+
+    def test_worker_pool_matches_main_thread(self):
+        serial_task = self.make_task()
+        parallel_task = self.make_task(num_proc=2, parallel_fd_workers=True)
+        x0 = np.array([0.8, 0.16])
+        serial_fd = ParallelFiniteDifferences(serial_task, serial_task.config, 0.01,
+                                              self.bounds_of(serial_task), method="cs")
+        with ParallelFiniteDifferences(parallel_task, parallel_task.config, 0.01,
+                                       self.bounds_of(parallel_task), method="cs") as parallel_fd:
+            parallel_jac = parallel_fd.make_constraint_jac(0)(x0)
+            parallel_grad = parallel_fd.objective_jac(x0)
+        np.testing.assert_array_equal(parallel_jac, serial_fd.make_constraint_jac(0)(x0))
+        np.testing.assert_array_equal(parallel_grad, serial_fd.objective_jac(x0))
+
+    def test_solver_dropping_imaginary_part_is_refused(self):
+        task = self.make_task()
+        task.solver.non_cached_calculation = lambda calc_task, unique_id: {
+            "objective": np.real(calc_task.x1), "ineq1": 0.0, "ineq2": 0.0, "mass": 0.0}
+        fd = ParallelFiniteDifferences(task, task.config, 0.01, self.bounds_of(task), method="cs")
+        with self.assertRaises(RuntimeError):
+            fd.objective_jac(np.array([0.8, 0.16]))
+
+    def test_gradient_optimizer_uses_complex_step_for_flagged_solvers(self):
+        task = self.make_task()
+        result = GradientOptimizer(task, task.config).run_optimization()
+        cs_solves = RosenSolver.eval_count
+        RosenSolver.eval_count = 0
+        task = self.make_task(complex_step=False, num_proc=2, parallel_fd=True)
+        reference = GradientOptimizer(task, task.config).run_optimization()
+        self.assertAlmostEqual(result.objective, reference.objective, places=5)
+        self.assertLess(cs_solves, RosenSolver.eval_count)
+
+
+class TestThreadBackend(RosenTaskFactory, unittest.TestCase):
+    x0 = np.array([0.8, 0.16])
+
+    def jacobians(self, task):
+        with ParallelFiniteDifferences(task, task.config, 0.01, self.bounds_of(task)) as fd:
+            return fd.objective_jac(self.x0), fd.make_constraint_jac(1)(self.x0), fd
+
+    def test_threads_share_the_main_solver_cache(self):
+        task = self.make_task(solver_class=RosenSolver, num_proc=3, parallel_fd_backend="thread")
+        grad, jac, fd = self.jacobians(task)
+        serial_grad, serial_jac, _ = self.jacobians(self.make_task(solver_class=RosenSolver))
+        np.testing.assert_array_equal(grad, serial_grad)
+        np.testing.assert_array_equal(jac, serial_jac)
+        self.assertEqual(fd._thread_clones, [])
+        # Center plus four stencil points, all in the main solver cache
+        self.assertEqual(len(task.solver.cache_map), 5)
+        self.assertEqual(task.ledger.misses, 5)
+
+    def test_isolated_solvers_get_one_clone_per_thread(self):
+        task = self.make_task(solver_class=WorkdirRosenSolver, num_proc=2, parallel_fd_backend="thread")
+        fd = ParallelFiniteDifferences(task, task.config, 0.01, self.bounds_of(task))
+        with fd:
+            fd.prefill(self.x0)
+            clones = list(fd._thread_clones)
+        self.assertTrue(1 <= len(clones) <= 2)
+        self.assertEqual(len({clone.worker_tag for clone in clones}), len(clones))
+        self.assertNotIn(threading.get_ident(), set().union(*(clone.solve_threads for clone in clones)))
+        self.assertEqual(len(task.solver.cache_map), 5)
+
+    def test_isolated_clones_are_built_before_jobs_and_skip_the_cache(self):
+        task = self.make_task(solver_class=WorkdirRosenSolver, num_proc=4, parallel_fd_backend="thread")
+        task.solver.cache_map.update({("stale", index): {"objective": 0.0} for index in range(50000)})
+        fd = ParallelFiniteDifferences(task, task.config, 0.01, self.bounds_of(task))
+        with fd:
+            clones = list(fd._thread_clones)
+            self.assertEqual(len(clones), 4)
+            self.assertTrue(all(clone.cache_map == {} for clone in clones))
+            fd.prefill(self.x0)
+        self.assertEqual(len(task.solver.cache_map), 50000 + 5)
+        self.assertTrue(all(("stale", 0) not in clone.cache_map for clone in clones))
+
+    def test_unknown_backend_is_rejected(self):
+        task = self.make_task(solver_class=RosenSolver, num_proc=2, parallel_fd_backend="gpu")
+        with self.assertRaises(ValueError):
+            ParallelFiniteDifferences(task, task.config, 0.01, self.bounds_of(task)).setup()
+
+
+class TestAdaptiveRelStep(unittest.TestCase):
+    @staticmethod
+    def outputs(points):
+        # x1: smooth cubic; x2: cubic plus solver noise of amplitude 1e-6
+        return np.array([[x1**3 + x2**3 + 1e-6 * np.sin(1e6 * x2), 2 * x1 - x2] for x1, x2 in points])
+
+    def test_noise_pushes_step_up(self):
+        bounds = Bounds([0.0, 0.0], [2.0, 2.0])
+        steps = adaptive_rel_steps(np.array([1.0, 1.0]), bounds, self.outputs)
+        # Truncation error alone favours small steps; noise/h balances near (1e-6)^(1/3)
+        self.assertEqual(steps[0], 1e-3)
+        self.assertEqual(steps[1], 1e-2)
+
+    def test_probe_is_one_sided_at_bounds(self):
+        bounds = Bounds([0.0, 0.0], [2.0, 2.0])
+        points, stencils = probe_points(np.array([2.0, 1.0]), bounds)
+        self.assertEqual(len(points), 1 + 2 * 2 * len(DEFAULT_STEP_LADDER))
+        self.assertTrue(all(np.all(point <= 2.0) and np.all(point >= 0.0) for point in points))
+        self.assertFalse(any(stencil.central for stencil in stencils if stencil.variable == 0))
+        steps = adaptive_rel_steps(np.array([2.0, 1.0]), bounds, self.outputs)
+        self.assertEqual(steps[0], 1e-3)
+
+
 if __name__ == "__main__":
     unittest.main()
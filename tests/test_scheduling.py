@@ -0,0 +1,77 @@
+"""Tests for cost-aware task scheduling."""
+
+from __future__ import annotations
+
+import os
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from optimization_tools.optimization_executors import ForLoopExecutor, ThreadExecutor
+from optimization_tools.scheduling import CostModel, LongestJobFirstScheduler
+
+
+class CostTask:
+    def __init__(self, name: str, cost: float, features=None) -> None:
+        self.name = name
+        self.cost = cost
+        self.features = features
+
+    def run_optimization(self, **kwargs):
+        return self.name
+
+
+def by_name(task):
+    return task.name
+
+
+class TestLongestJobFirstScheduler(unittest.TestCase):
+    def test_plan_orders_longest_first_and_batches_cheap_tail(self):
+        tasks = [CostTask(str(index), cost) for index, cost in enumerate([0.5, 10, 0.5, 8] + [0.5] * 6)]
+        scheduler = LongestJobFirstScheduler(
+            CostModel(cost_function=lambda task: task.cost),
+            num_workers=2,
+        )
+        chunks = scheduler.plan(tasks)
+        self.assertEqual(chunks[0], [1])
+        self.assertEqual(chunks[1], [3])
+        self.assertEqual(sorted(index for chunk in chunks for index in chunk), list(range(10)))
+        self.assertLess(len(chunks), len(tasks))
+
+    def test_history_and_neighbour_prediction(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            history_path = os.path.join(tmp, "cost_history.json")
+            model = CostModel(
+                history_path=history_path,
+                neighbours=1,
+                task_key=by_name,
+                task_features=lambda task: task.features,
+            )
+            model.record(CostTask("a", 0, [0.0]), 5.0)
+            model.record(CostTask("b", 0, [1.0]), 50.0)
+            model.save_history()
+
+            reloaded = CostModel(
+                history_path=history_path,
+                neighbours=1,
+                task_key=by_name,
+                task_features=lambda task: task.features,
+            )
+            self.assertEqual(reloaded.predict(CostTask("a", 0, [0.0])), 5.0)
+            self.assertEqual(reloaded.predict(CostTask("c", 0, [0.9])), 50.0)
+            self.assertEqual(reloaded.predict(CostTask("d", 0, None)), reloaded.default_cost)
+
+    def test_executors_keep_task_order(self):
+        tasks = [CostTask(str(index), cost) for index, cost in enumerate([1, 5, 2, 9])]
+        scheduler = LongestJobFirstScheduler(
+            CostModel(cost_function=lambda task: task.cost),
+            num_workers=2,
+        )
+        expected = [task.name for task in tasks]
+        self.assertEqual(ForLoopExecutor(None, scheduler=scheduler)(tasks), expected)
+        with ThreadPoolExecutor(2) as pool:
+            self.assertEqual(ThreadExecutor(pool, scheduler=scheduler)(tasks), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()